@@ -271,6 +271,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Log temizleme hatası: {e}")
     
+    # İndikatör JIT kernel'lerini derle - ilk strateji tick'i derleme beklemesin
+    try:
+        from core.indicators import warmup_kernels
+        await asyncio.to_thread(warmup_kernels)
+        logger.info("✅ İndikatör kernel'leri hazır")
+    except Exception as e:
+        logger.warning(f"İndikatör kernel ısınma hatası: {e}")
+    
     # Background task manager'ı başlat
     logger.info("🔧 DEBUG: Task manager başlatılıyor...")
     try:
@@ -289,11 +297,17 @@ async def lifespan(app: FastAPI):
     # Background task manager'ı durdur
     await task_manager.stop()
     
+    # Bekleyen emir WAL'larını snapshot'a katla
+    await strategy_engine.close_order_managers()
+    
     # Tüm stratejileri temizle
     strategies = await storage.load_strategies()
     for strategy in strategies:
         if strategy.active:
             await strategy_engine.cleanup_strategy(strategy.id)
+    
+    # Ertelenmiş state/strateji yazımlarını diske indir
+    await storage.flush_now()
 
 # FastAPI uygulaması
 app = FastAPI(
@@ -411,43 +425,38 @@ async def calculate_profit_status():
         profitable_count = 0
         losing_count = 0
         
+        # Güncel fiyatları topla - PnL tüm stratejiler için tek geçişte hesaplanır
+        current_prices = {}
         for strategy in strategies:
             try:
-                # Güncel fiyat bilgisini al
-                current_price = 0.0
-                try:
-                    # Binance'den güncel fiyat al
-                    ticker = await binance_client.get_symbol_ticker(strategy.symbol.value)
-                    if ticker:
-                        current_price = float(ticker['price'])
-                    else:
-                        current_price = 0.0
-                except Exception as price_error:
-                    logger.warning(f"Fiyat alma hatası {strategy.symbol}: {price_error}")
-                    # Fiyat alınamazsa 0 kullan (sadece realized PnL hesaplanır)
-                    current_price = 0.0
-                
-                # Strateji için PnL hesapla
-                pnl_data = await storage.calculate_new_pnl(strategy.id, current_price)
-                
-                if 'error' not in pnl_data:
-                    strategy_realized = pnl_data.get('realized_pnl', 0.0)
-                    strategy_unrealized = pnl_data.get('unrealized_pnl', 0.0)
-                    strategy_total = strategy_realized + strategy_unrealized
-                    
-                    # Toplam kar = realized + unrealized
-                    total_profit += strategy_total
-                    realized_profit += strategy_realized
-                    unrealized_profit += strategy_unrealized
-                    
-                    if strategy_total > 0:
-                        profitable_count += 1
-                    elif strategy_total < 0:
-                        losing_count += 1
-                        
-            except Exception as e:
-                logger.warning(f"Strateji kar hesaplama hatası {strategy.id}: {e}")
-                continue
+                # Binance'den güncel fiyat al
+                ticker = await binance_client.get_symbol_ticker(strategy.symbol.value)
+                current_prices[strategy.id] = float(ticker['price']) if ticker else 0.0
+            except Exception as price_error:
+                logger.warning(f"Fiyat alma hatası {strategy.symbol}: {price_error}")
+                # Fiyat alınamazsa 0 kullan (sadece realized PnL hesaplanır)
+                current_prices[strategy.id] = 0.0
+        
+        try:
+            pnl_by_strategy = await storage.calculate_new_pnl_many(current_prices)
+        except Exception as e:
+            logger.warning(f"Toplu kar hesaplama hatası: {e}")
+            pnl_by_strategy = {}
+        
+        for pnl_data in pnl_by_strategy.values():
+            strategy_realized = pnl_data.get('realized_pnl', 0.0)
+            strategy_unrealized = pnl_data.get('unrealized_pnl', 0.0)
+            strategy_total = strategy_realized + strategy_unrealized
+            
+            # Toplam kar = realized + unrealized
+            total_profit += strategy_total
+            realized_profit += strategy_realized
+            unrealized_profit += strategy_unrealized
+            
+            if strategy_total > 0:
+                profitable_count += 1
+            elif strategy_total < 0:
+                losing_count += 1
         
         # Toplam getiri yüzdesi hesapla (1000 USD başlangıç sermayesi)
         initial_capital = 1000.0 * len(strategies)
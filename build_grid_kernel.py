@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Grid kernel AOT build script
+
+core/grid_kernel.py içindeki saf Python kernel'i Numba pycc ile native modüle
+derler (core/_grid_kernel_aot.*.so). Bot açılışında JIT ısınması olmaz; modül
+yoksa core.grid_kernel otomatik olarak Python sürümünü kullanır.
+
+Kullanım:
+    pip install numba
+    python build_grid_kernel.py
+"""
+
+import os
+import sys
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    print("numba not installed. Install with: pip install numba")
+    sys.exit(1)
+
+from core.grid_kernel import compute_grid_level_py
+
+cc = CC('_grid_kernel_aot')
+cc.output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core')
+cc.export(
+    'compute',
+    'Tuple((float64, int64, float64))(float64, float64, float64, float64, boolean)'
+)(compute_grid_level_py)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Grid kernel derlendi: {cc.output_dir}")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Indicator kernel AOT build script
+
+core/indicators.py içindeki @njit kernel'leri Numba pycc ile native modüle
+derler (core/_indicator_kernels_aot.*.so). Deploy sonrası ilk OTT hesabı JIT
+derlemesi ya da cache okuması beklemez; modül yoksa core.indicators JIT
+sürümlerini kullanır.
+
+Paralel kernel'ler (_ott_grid_kernel, _ema_gufunc) pycc ile derlenemez, JIT kalır.
+
+Kullanım:
+    pip install numba
+    python build_indicator_kernels.py
+"""
+
+import os
+import sys
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    print("numba not installed. Install with: pip install numba")
+    sys.exit(1)
+
+from core.indicators import _ema_kernel, _rsi_kernel, _sliding_sum_kernel, _vidya_kernel
+
+cc = CC('_indicator_kernels_aot')
+cc.output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core')
+
+# Diziler contiguous (C düzeni) - _to_float64 bunu garanti eder
+cc.export('vidya_kernel', 'f8[::1](f8[::1], f8[::1], f8, i8, f8, f8[::1])')(_vidya_kernel.py_func)
+cc.export('ema_kernel', 'f8[::1](f8[::1], i8, f8[::1])')(_ema_kernel.py_func)
+cc.export('sliding_sum_kernel', 'f8[::1](f8[::1], i8, f8[::1])')(_sliding_sum_kernel.py_func)
+cc.export('rsi_kernel', 'f8[::1](f8[::1], f8[::1], i8)')(_rsi_kernel.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Indicator kernel'leri derlendi: {cc.output_dir}")
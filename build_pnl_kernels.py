@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+PnL kernel AOT build script
+
+core/pnl_calculator.py içindeki @njit kernel'leri (fill ve unrealized PnL
+aritmetiği) Numba pycc ile native modüle derler (core/_pnl_kernels_aot.*.so).
+Deploy sonrası ilk fill / dashboard PnL hesabı JIT derlemesi ya da cache
+okuması beklemez; modül yoksa core.pnl_calculator JIT sürümlerini kullanır.
+
+Kullanım:
+    pip install numba
+    python build_pnl_kernels.py
+"""
+
+import os
+import sys
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    print("numba not installed. Install with: pip install numba")
+    sys.exit(1)
+
+from core.pnl_calculator import _fill_kernel, _unrealized_kernel
+
+cc = CC('_pnl_kernels_aot')
+cc.output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core')
+
+cc.export('fill_kernel', 'UniTuple(f8, 4)(f8, f8, f8, f8)')(_fill_kernel.py_func)
+cc.export('unrealized_kernel', 'UniTuple(f8, 5)(f8, f8, f8, f8)')(_unrealized_kernel.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ PnL kernel'leri derlendi: {cc.output_dir}")
@@ -641,24 +641,61 @@ class BinanceClient:
                 ccxt_symbol = self._convert_symbol_to_ccxt(symbol)
                 order = self.client.fetch_order(order_id, ccxt_symbol)
                 
-                order_details.append({
-                    'order_id': order_id,
-                    'status': order['status'],  # open, closed, canceled, partially_filled
-                    'filled_qty': float(order['filled']),
-                    'remaining_qty': float(order['remaining']),
-                    'original_qty': float(order['amount']),
-                    'price': float(order['price']),
-                    'average_price': float(order['average']) if order['average'] else None,
-                    'timestamp': datetime.fromtimestamp(order['timestamp'] / 1000, tz=timezone.utc),
-                    'side': order['side'],
-                    'is_partial': order['status'] == 'partially_filled' and float(order['filled']) > 0
-                })
+                order_details.append(self._order_status_detail(order_id, order))
                 
             except Exception as e:
                 logger.warning(f"Order detailed status kontrol hatası {order_id}: {e}")
         
         return order_details
     
+    @staticmethod
+    def _order_status_detail(order_id: str, order: Dict) -> Dict:
+        """ccxt emir yanıtını detaylı durum sözlüğüne çevir"""
+        return {
+            'order_id': order_id,
+            'status': order['status'],  # open, closed, canceled, partially_filled
+            'filled_qty': float(order['filled']),
+            'remaining_qty': float(order['remaining']),
+            'original_qty': float(order['amount']),
+            'price': float(order['price']),
+            'average_price': float(order['average']) if order['average'] else None,
+            'timestamp': datetime.fromtimestamp(order['timestamp'] / 1000, tz=timezone.utc),
+            'side': order['side'],
+            'is_partial': order['status'] == 'partially_filled' and float(order['filled']) > 0
+        }
+    
+    async def fetch_order_statuses(self, symbol: str, order_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Birden çok emrin detaylı durumunu sembol başına tek openOrders çağrısıyla al
+        
+        Açık listede bulunan emirler ek istek gerektirmez; listede olmayanlar
+        (dolmuş / iptal edilmiş) check_order_status_detailed ile tek tek sorgulanır.
+        
+        Returns:
+            order_id -> check_order_status_detailed ile aynı formatta durum sözlüğü
+        """
+        if not self.api_key or not self.api_secret:
+            return {}
+        
+        wanted = set(order_ids)
+        statuses: Dict[str, Dict] = {}
+        try:
+            await self._rate_limit()
+            ccxt_symbol = self._convert_symbol_to_ccxt(symbol)
+            for order in self.client.fetch_open_orders(ccxt_symbol):
+                order_id = str(order['id'])
+                if order_id in wanted:
+                    statuses[order_id] = self._order_status_detail(order_id, order)
+        except Exception as e:
+            logger.warning(f"Open orders durum sorgusu hatası {symbol}, emirler tek tek sorgulanacak: {e}")
+        
+        missing = [order_id for order_id in order_ids if order_id not in statuses]
+        if missing:
+            for detail in await self.check_order_status_detailed(symbol, missing):
+                statuses[str(detail['order_id'])] = detail
+        
+        return statuses
+    
     async def cancel_orders_batch(self, symbol: str, order_ids: List[str]) -> int:
         """Toplu emir iptali"""
         if not self.api_key or not self.api_secret:
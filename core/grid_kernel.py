@@ -0,0 +1,109 @@
+"""
+Grid seviye hesaplama çekirdeği
+
+build_grid_kernel.py ile Numba AOT derlenmiş `_grid_kernel_aot` modülü varsa
+onu kullanır (JIT ısınması yok, native hız); yoksa saf Python sürümüne düşer.
+"""
+
+from .utils import calculate_quantity, get_precision
+
+
+def compute_grid_level_py(current_price: float, gf: float, y: float, inv_y: float, is_buy: bool):
+    """
+    Grid seviyesini hesapla
+    
+    inv_y = 1 / y çağıran tarafta bir kez hesaplanır. Δ > y > 0 garanti
+    olduğundan int() kesmesi floor ile aynı sonucu verir.
+    
+    Returns:
+        (delta, z, target_price): Δ <= y ise z = 0 döner
+    """
+    if is_buy:
+        delta = gf - current_price
+    else:
+        delta = current_price - gf
+    
+    if delta <= y:
+        return delta, 0, gf
+    
+    z = int(delta * inv_y)
+    if is_buy:
+        target_price = gf - z * y
+    else:
+        target_price = gf + z * y
+    return delta, z, target_price
+
+
+try:
+    from ._grid_kernel_aot import compute as compute_grid_level
+except ImportError:
+    compute_grid_level = compute_grid_level_py
+
+
+def make_grid_computer(tick_size: float, step_size: float, min_qty: float, y: float, usdt_grid: float):
+    """
+    Market/strateji sabitleri gömülü grid hesaplayıcı üret
+    
+    Sıcak yol sadece (current_price, gf, is_buy) ile çağrılır. y tick_size'ın
+    tam katıysa ve GF ile fiyat tick grid'i üzerindeyse hesap tick cinsinden
+    tamsayı aritmetiğiyle yapılır; FP kayması olmadığı için z ve hedef fiyat
+    doğrudan tick'e oturur. Aksi halde float yolu (round_to_tick ile aşağı) kullanılır.
+    
+    Returns:
+        compute(current_price, gf, is_buy) -> (delta, z, target_price, quantity, is_valid)
+    """
+    kernel = compute_grid_level
+    inv_y = 1.0 / y
+    
+    inv_tick = 1.0 / tick_size if tick_size > 0 else 0.0
+    price_precision = get_precision(tick_size) if tick_size > 0 else 0
+    
+    y_ticks = round(y * inv_tick)
+    use_ticks = y_ticks > 0 and abs(y_ticks * tick_size - y) <= tick_size * 1e-6
+    
+    def compute_float(current_price: float, gf: float, is_buy: bool):
+        delta, z, target_price = kernel(current_price, gf, y, inv_y, is_buy)
+        if z < 1:
+            return delta, z, target_price, 0.0, False
+        
+        if inv_tick and target_price > 0:
+            # round_to_tick ile aynı: tick'e aşağı yuvarla; tam tick'in bir
+            # ulp altına düşen çarpım sonuçları (FP kayması) yukarı kabul edilir
+            ticks = target_price * inv_tick
+            target_ticks = round(ticks)
+            if target_ticks - ticks > ticks * 1e-15:
+                target_ticks -= 1
+            target_price = round(target_ticks * tick_size, price_precision)
+        quantity, is_valid = calculate_quantity(z * usdt_grid, target_price, step_size, min_qty)
+        return delta, z, target_price, quantity, is_valid
+    
+    if not use_ticks:
+        return compute_float
+    
+    # Tick grid'ine oturma toleransı - FP gösterim hatası kadar sapma tam tick sayılır
+    on_tick_tol = tick_size * 1e-6
+    
+    def compute(current_price: float, gf: float, is_buy: bool):
+        price_ticks = round(current_price * inv_tick)
+        gf_ticks = round(gf * inv_tick)
+        # Tick dışı GF/fiyat (ör. kullanıcının girdiği GF) tick'e yuvarlanırsa hedef
+        # gerçek grid seviyesinin güvensiz tarafına kayabilir - float yolu aşağı yuvarlar
+        if (abs(gf_ticks * tick_size - gf) > on_tick_tol
+                or abs(price_ticks * tick_size - current_price) > on_tick_tol):
+            return compute_float(current_price, gf, is_buy)
+        
+        delta_ticks = gf_ticks - price_ticks if is_buy else price_ticks - gf_ticks
+        delta = delta_ticks * tick_size
+        if delta_ticks <= y_ticks:
+            return delta, 0, gf, 0.0, False
+        
+        z = delta_ticks // y_ticks
+        if is_buy:
+            target_ticks = gf_ticks - z * y_ticks
+        else:
+            target_ticks = gf_ticks + z * y_ticks
+        target_price = round(target_ticks * tick_size, price_precision)
+        quantity, is_valid = calculate_quantity(z * usdt_grid, target_price, step_size, min_qty)
+        return delta, z, target_price, quantity, is_valid
+    
+    return compute
@@ -3,18 +3,29 @@ Grid + OTT Strategy Implementation
 Mevcut grid.py'daki logic'i yeni mimariye uyarladık
 """
 
-import math
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime, timezone
 
+import numpy as np
+
 from .base_strategy import BaseStrategy
 from .models import (
     Strategy, State, TradingSignal, OrderSide, OTTMode, OTTResult, 
-    MarketInfo, Trade, GridSignal
-)
-from .utils import (
-    logger, round_to_tick, calculate_quantity
+    MarketInfo, Trade
 )
+from .utils import logger
+from .grid_kernel import make_grid_computer
+
+# Sıcak yolda enum attribute lookup yerine tek seferlik bağlanan üyeler
+# (enum üyeleri singleton olduğu için `is` ile karşılaştırılır)
+_BUY = OrderSide.BUY
+_SELL = OrderSide.SELL
+_AL = OTTMode.AL
+
+
+def _compute_z(delta: float, inv_y: float) -> int:
+    """Fill fiyatının GF'den kaç grid adımı uzakta olduğu (inv_y = 1 / y)"""
+    return int(delta * inv_y) if delta > 0 else 0
 
 
 class GridOTTStrategy(BaseStrategy):
@@ -22,6 +33,17 @@ class GridOTTStrategy(BaseStrategy):
     
     def __init__(self):
         super().__init__("Grid+OTT")
+        # strategy_id -> (market/parametre anahtarı, grid hesaplayıcı)
+        self._grid_computers: Dict[str, tuple] = {}
+    
+    def _get_grid_computer(self, strategy: Strategy, market_info: MarketInfo, y: float, usdt_grid: float):
+        """Strateji için market sabitleri gömülü grid hesaplayıcıyı al/oluştur"""
+        key = (market_info.tick_size, market_info.step_size, market_info.min_qty, y, usdt_grid)
+        cached = self._grid_computers.get(strategy.id)
+        if cached is None or cached[0] != key:
+            cached = (key, make_grid_computer(*key))
+            self._grid_computers[strategy.id] = cached
+        return cached[1]
     
     async def initialize_state(self, strategy: Strategy) -> Dict[str, Any]:
         """Grid+OTT için initial state"""
@@ -40,24 +62,95 @@ class GridOTTStrategy(BaseStrategy):
         ohlcv_data: list = None
     ) -> TradingSignal:
         """Grid+OTT sinyal hesaplama"""
+        signal, gf, y, usdt_grid = self._prepare_grid_inputs(strategy, state, current_price)
+        if signal is not None:
+            return signal
+        
+        # Ön eleme - AL: Δ = GF - price, SAT: Δ = price - GF
+        buy = ott_result.mode is _AL
+        delta = gf - current_price if buy else current_price - gf
+        if delta <= y:
+            return self._below_threshold_signal(buy, current_price, gf, delta, y)
+        
+        return await self._calculate_candidate_signal(
+            strategy, state, current_price, gf, y, usdt_grid, buy, market_info
+        )
+    
+    async def calculate_signals_batch(
+        self,
+        strategies: List[Strategy],
+        states: List[State],
+        prices: List[float],
+        ott_results: List[OTTResult],
+        market_infos: List[MarketInfo]
+    ) -> List[TradingSignal]:
+        """
+        Birden fazla Grid+OTT stratejisi için sinyalleri tek NumPy geçişinde hesapla
+        
+        Delta ve eşik kontrolü (Δ > y) tüm stratejiler için vektörel yapılır; sadece
+        eşiği geçen stratejiler için market hesaplayıcısı (z, hedef fiyat, miktar) ve
+        skaler kontroller (limit, miktar, duplicate) çalışır. Tek strateji için
+        calculate_signal daha hızlıdır - bu yol yalnızca toplu çağrılar içindir.
+        """
+        n = len(strategies)
+        signals: List[TradingSignal] = [None] * n
+        
+        gfs = np.zeros(n, dtype=np.float64)
+        ys = np.ones(n, dtype=np.float64)
+        usdt_grids = np.zeros(n, dtype=np.float64)
+        price_arr = np.asarray(prices, dtype=np.float64)
+        is_buy = np.array([r.mode is _AL for r in ott_results], dtype=bool)
+        
+        # Skaler ön kontroller: fiyat limitleri, parametreler, GF başlatma
+        for i, strategy in enumerate(strategies):
+            signal, gf, y, usdt_grid = self._prepare_grid_inputs(strategy, states[i], prices[i])
+            if signal is not None:
+                signals[i] = signal
+                continue
+            gfs[i] = gf
+            ys[i] = y
+            usdt_grids[i] = usdt_grid
+        
+        # Vektörel ön eleme - AL: Δ = GF - price, SAT: Δ = price - GF
+        delta = np.where(is_buy, gfs - price_arr, price_arr - gfs)
+        mask = delta > ys
+        
+        for i in range(n):
+            if signals[i] is not None:
+                continue
+            
+            buy = bool(is_buy[i])
+            if not mask[i]:
+                signals[i] = self._below_threshold_signal(
+                    buy, prices[i], float(gfs[i]), float(delta[i]), float(ys[i])
+                )
+                continue
+            
+            signals[i] = await self._calculate_candidate_signal(
+                strategies[i], states[i], prices[i], float(gfs[i]), float(ys[i]),
+                float(usdt_grids[i]), buy, market_infos[i]
+            )
+        
+        return signals
+    
+    def _prepare_grid_inputs(self, strategy: Strategy, state: State, current_price: float):
+        """
+        Fiyat limiti ve parametre kontrolleri, GF başlatma
         
-        # Fiyat limitleri kontrolü
+        Returns:
+            (red sinyali veya None, gf, y, usdt_grid)
+        """
         price_valid, price_reason = self._check_price_limits(strategy, current_price)
         if not price_valid:
-            return TradingSignal(
-                should_trade=False,
-                reason=price_reason
-            )
+            return TradingSignal(should_trade=False, reason=price_reason), 0.0, 0.0, 0.0
         
-        # Grid parametrelerini al
         y = self.get_parameter(strategy, 'y')
         usdt_grid = self.get_parameter(strategy, 'usdt_grid')
-        
         if not y or not usdt_grid:
             return TradingSignal(
                 should_trade=False,
                 reason="Grid parametreleri eksik: y ve usdt_grid gerekli"
-            )
+            ), 0.0, 0.0, 0.0
         
         # GF kontrolü - 0 ise ilk fiyatı GF yap
         gf = state.gf if state.gf is not None else 0
@@ -67,230 +160,111 @@ class GridOTTStrategy(BaseStrategy):
             self.set_custom_data(state, "gf_initialized", True)
             self.log_strategy_action(strategy.id, "GF_INIT", f"GF = {gf}")
         
-        # Grid sinyali hesapla (mevcut algoritma)
-        grid_signal = await self._calculate_grid_signal(
-            strategy, state, current_price, gf, ott_result, market_info, y, usdt_grid
-        )
-        
-        # GridSignal'i TradingSignal'e çevir
-        if grid_signal.should_trade:
-            return TradingSignal(
-                should_trade=True,
-                side=grid_signal.side,
-                target_price=grid_signal.target_price,
-                quantity=grid_signal.quantity,
-                reason=grid_signal.reason,
-                strategy_specific_data={
-                    "z": grid_signal.z,
-                    "delta": grid_signal.delta,
-                    "gf": gf
-                }
-            )
-        else:
-            return TradingSignal(
-                should_trade=False,
-                reason=grid_signal.reason
-            )
+        return None, gf, y, usdt_grid
     
-    async def _calculate_grid_signal(
-        self, 
-        strategy: Strategy, 
-        state: State, 
-        current_price: float, 
-        gf: float,
-        ott_result: OTTResult,
-        market_info: MarketInfo,
-        y: float,
-        usdt_grid: float
-    ) -> GridSignal:
-        """Grid sinyal hesaplama (mevcut algoritma)"""
-        
-        # OTT moduna göre işlem yönü
-        if ott_result.mode == OTTMode.AL:
-            return await self._calculate_buy_signal(
-                strategy, state, current_price, gf, market_info, y, usdt_grid
-            )
-        else:  # SAT
-            return await self._calculate_sell_signal(
-                strategy, state, current_price, gf, market_info, y, usdt_grid
-            )
+    @staticmethod
+    def _below_threshold_signal(buy: bool, current_price: float, gf: float, delta: float, y: float) -> TradingSignal:
+        """Ön elemeyi (Δ > y) geçemeyen strateji için red sinyali"""
+        label = "AL" if buy else "SAT"
+        if delta <= 0:
+            # AL kuralı: price < GF, SAT kuralı: price > GF olmalı
+            op = ">=" if buy else "<="
+            reason = f"{label} modu: price ({current_price}) {op} GF ({gf})"
+        else:
+            reason = f"{label} modu: delta ({delta:.6f}) <= y ({y}) - grid aralığı yetersiz"
+        return TradingSignal(should_trade=False, reason=reason)
     
-    async def _calculate_buy_signal(
-        self, 
-        strategy: Strategy, 
-        state: State, 
-        current_price: float, 
+    async def _calculate_candidate_signal(
+        self,
+        strategy: Strategy,
+        state: State,
+        current_price: float,
         gf: float,
-        market_info: MarketInfo,
         y: float,
-        usdt_grid: float
-    ) -> GridSignal:
-        """AL modu - Alım sinyali hesapla"""
-        
-        # AL kuralı: price < GF olmalı
-        if current_price >= gf:
-            return GridSignal(
-                should_trade=False,
-                reason=f"AL modu: price ({current_price}) >= GF ({gf})"
-            )
+        usdt_grid: float,
+        buy: bool,
+        market_info: MarketInfo
+    ) -> TradingSignal:
+        """Ön elemeyi geçen strateji için z, hedef fiyat ve miktarı hesapla"""
+        label = "AL" if buy else "SAT"
         
-        # Delta hesapla
-        delta = gf - current_price
+        # Delta, z, hedef fiyat ve miktar (market'e özel grid hesaplayıcı)
+        compute = self._get_grid_computer(strategy, market_info, y, usdt_grid)
+        d, z, target_price, quantity, is_valid = compute(current_price, gf, buy)
         
-        # Eşik kontrolü: Δ > y (hassas karşılaştırma)
-        if delta <= y:
-            return GridSignal(
+        # Eşik kontrolü: Δ > y (hesaplayıcının tick hassasiyetindeki delta ile)
+        if d <= y:
+            return TradingSignal(
                 should_trade=False,
-                reason=f"AL modu: delta ({delta:.6f}) <= y ({y}) - grid aralığı yetersiz"
+                reason=f"{label} modu: delta ({d:.6f}) <= y ({y}) - grid aralığı yetersiz"
             )
         
-        # z hesapla
-        z = math.floor(delta / y)
+        # z kontrolü
         if z < 1:
-            return GridSignal(
-                should_trade=False,
-                reason=f"AL modu: z ({z}) < 1 - grid seviyesi yetersiz"
-            )
-        
-        # Debug log
-        self.log_strategy_action(
-            strategy.id,
-            "GRID_CALC_AL",
-            f"Delta: {delta:.6f}, y: {y}, z: {z}, target_price: {gf - (z * y):.6f}"
-        )
-        
-        # Hedef fiyat: P_buy = GF - z*y
-        target_price = gf - (z * y)
-        target_price = round_to_tick(target_price, market_info.tick_size)
-        
-        # Hedef fiyat limit kontrolü
-        price_valid, price_reason = self._check_price_limits(strategy, target_price)
-        if not price_valid:
-            return GridSignal(
-                should_trade=False,
-                reason=f"AL modu: {price_reason}"
-            )
-        
-        # Miktar hesapla
-        notional = z * usdt_grid
-        quantity, is_valid = calculate_quantity(
-            notional, target_price, market_info.step_size, market_info.min_qty
-        )
-        
-        if not is_valid:
-            return GridSignal(
+            return TradingSignal(
                 should_trade=False,
-                reason=f"AL modu: miktar geçersiz ({quantity} < {market_info.min_qty})"
+                reason=f"{label} modu: z ({z}) < 1 - grid seviyesi yetersiz"
             )
         
-        # Duplicate kontrol
-        has_duplicate = await self._check_duplicate_order(
-            state, OrderSide.BUY, target_price
+        # Debug log - %-format, sadece DEBUG seviyesinde render edilir
+        logger.debug(
+            "[%s] %s: GRID_CALC_%s Delta: %.6f, y: %s, z: %d, target_price: %.6f",
+            self.strategy_name, strategy.id, label, d, y, z, target_price
         )
         
-        if has_duplicate:
-            return GridSignal(
-                should_trade=False,
-                reason=f"AL modu: duplicate emir mevcut (price: {target_price})"
-            )
-        
-        return GridSignal(
-            should_trade=True,
-            side=OrderSide.BUY,
-            z=z,
-            target_price=target_price,
-            quantity=quantity,
-            delta=delta,
-            reason=f"AL sinyali: z={z}, price={target_price}, qty={quantity}"
+        # Hedef fiyat: P_buy = GF - z*y, P_sell = GF + z*y (hesaplayıcı tarafından)
+        return await self._finalize_grid_signal(
+            strategy, state, _BUY if buy else _SELL, gf, z, d, target_price,
+            quantity, is_valid, market_info.min_qty
         )
     
-    async def _calculate_sell_signal(
-        self, 
-        strategy: Strategy, 
-        state: State, 
-        current_price: float, 
+    async def _finalize_grid_signal(
+        self,
+        strategy: Strategy,
+        state: State,
+        side: OrderSide,
         gf: float,
-        market_info: MarketInfo,
-        y: float,
-        usdt_grid: float
-    ) -> GridSignal:
-        """SAT modu - Satım sinyali hesapla"""
-        
-        # SAT kuralı: price > GF olmalı  
-        if current_price <= gf:
-            return GridSignal(
-                should_trade=False,
-                reason=f"SAT modu: price ({current_price}) <= GF ({gf})"
-            )
-        
-        # Delta hesapla
-        delta = current_price - gf
-        
-        # Eşik kontrolü: Δ > y (hassas karşılaştırma)
-        if delta <= y:
-            return GridSignal(
-                should_trade=False,
-                reason=f"SAT modu: delta ({delta:.6f}) <= y ({y}) - grid aralığı yetersiz"
-            )
-        
-        # z hesapla
-        z = math.floor(delta / y)
-        if z < 1:
-            return GridSignal(
-                should_trade=False,
-                reason=f"SAT modu: z ({z}) < 1 - grid seviyesi yetersiz"
-            )
-        
-        # Debug log
-        self.log_strategy_action(
-            strategy.id,
-            "GRID_CALC_SAT",
-            f"Delta: {delta:.6f}, y: {y}, z: {z}, target_price: {gf + (z * y):.6f}"
-        )
-        
-        # Hedef fiyat: P_sell = GF + z*y
-        target_price = gf + (z * y)
-        target_price = round_to_tick(target_price, market_info.tick_size)
+        z: int,
+        delta: float,
+        target_price: float,
+        quantity: float,
+        is_valid: bool,
+        min_qty: float
+    ) -> TradingSignal:
+        """Yuvarlanmış hedef fiyat için limit/miktar/duplicate kontrollerini yap"""
+        label = "AL" if side is _BUY else "SAT"
         
         # Hedef fiyat limit kontrolü
         price_valid, price_reason = self._check_price_limits(strategy, target_price)
         if not price_valid:
-            return GridSignal(
+            return TradingSignal(
                 should_trade=False,
-                reason=f"SAT modu: {price_reason}"
+                reason=f"{label} modu: {price_reason}"
             )
         
-        # Miktar hesapla
-        notional = z * usdt_grid
-        quantity, is_valid = calculate_quantity(
-            notional, target_price, market_info.step_size, market_info.min_qty
-        )
-        
+        # Miktar kontrolü
         if not is_valid:
-            return GridSignal(
+            return TradingSignal(
                 should_trade=False,
-                reason=f"SAT modu: miktar geçersiz ({quantity} < {market_info.min_qty})"
+                reason=f"{label} modu: miktar geçersiz ({quantity} < {min_qty})"
             )
         
         # Duplicate kontrol
-        has_duplicate = await self._check_duplicate_order(
-            state, OrderSide.SELL, target_price
-        )
+        has_duplicate = await self._check_duplicate_order(state, side, target_price)
         
         if has_duplicate:
-            return GridSignal(
+            return TradingSignal(
                 should_trade=False,
-                reason=f"SAT modu: duplicate emir mevcut (price: {target_price})"
+                reason=f"{label} modu: duplicate emir mevcut (price: {target_price})"
             )
         
-        return GridSignal(
+        return TradingSignal(
             should_trade=True,
-            side=OrderSide.SELL,
-            z=z,
+            side=side,
             target_price=target_price,
             quantity=quantity,
-            delta=delta,
-            reason=f"SAT sinyali: z={z}, price={target_price}, qty={quantity}"
+            reason=f"{label} sinyali: z={z}, price={target_price}, qty={quantity}",
+            strategy_specific_data={"z": z, "delta": delta, "gf": gf}
         )
     
     async def _check_duplicate_order(
@@ -321,31 +295,22 @@ class GridOTTStrategy(BaseStrategy):
         # Grid fill processing - GF güncelleme
         old_gf = state.gf if state.gf is not None else trade.price
         
-        # Z değerini strategy_specific_data'dan al
-        strategy_data = trade.strategy_specific_data or {}
-        z = strategy_data.get('z', 0)
+        # Z değeri sinyal anında hesaplanıp emir kaydıyla trade'e taşınır
+        z = trade.z or (trade.strategy_specific_data or {}).get('z', 0)
+        
+        is_buy = trade.side is _BUY
         
-        # Eğer z değeri yoksa, trade fiyatından hesapla
+        # Nadir yol: z taşınmamışsa (eski emir kayıtları), trade fiyatından hesapla.
+        # Sinyal kernel'i Δ <= y için z=0 döndürdüğünden burada kullanılmaz - tam bir
+        # grid adımı uzaktaki fill de GF'yi güncellemeli
         if z == 0:
-            if trade.side == OrderSide.BUY:
-                # AL: z = (GF - price) / y
-                delta = old_gf - trade.price
-                z = math.floor(delta / y) if delta > 0 else 0
-            else:
-                # SAT: z = (price - GF) / y  
-                delta = trade.price - old_gf
-                z = math.floor(delta / y) if delta > 0 else 0
+            z = _compute_z(old_gf - trade.price if is_buy else trade.price - old_gf, 1.0 / y)
         
         # Trade objesindeki z değerini güncelle
         trade.z = z
         
-        # GF_new hesapla
-        if trade.side == OrderSide.BUY:
-            # AL fill: GF_new = GF_old - z*y
-            new_gf = old_gf - (z * y)
-        else:
-            # SAT fill: GF_new = GF_old + z*y
-            new_gf = old_gf + (z * y)
+        # GF_new hesapla: AL fill GF_old - z*y, SAT fill GF_old + z*y
+        new_gf = old_gf + (-z if is_buy else z) * y
         
         state.gf = new_gf
         
@@ -2,229 +2,405 @@
 OTT (Optimized Trend Tracker) ve diğer teknik indikatör hesaplamaları
 """
 
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional
 from .models import OTTResult, OTTMode
 from .utils import logger
 
+__all__ = [
+    "calculate_cmo",
+    "calculate_vidya",
+    "calculate_ema",
+    "calculate_ema_batch",
+    "calculate_sma",
+    "calculate_ott",
+    "calculate_ott_detailed",
+    "validate_ott_params",
+    "backtest_ott_signals",
+    "backtest_ott_grid",
+    "OTTStreamState",
+    "calculate_rsi",
+    "calculate_bollinger_bands",
+    "compute_panel",
+    "warmup_kernels",
+    "TechnicalIndicators",
+    "indicators",
+]
+
+try:
+    from numba import guvectorize, njit, prange
+except ImportError:
+    # numba yoksa kernel'ler saf Python/NumPy olarak çalışır
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+    
+    prange = range
+    
+    def guvectorize(*args, **kwargs):
+        # Yalnızca '(n),()->(n)' düzeni: son eksen üzerinde satır satır döngü
+        def wrap(func):
+            def gufunc(p, scalar):
+                p = np.asarray(p, dtype=np.float64)
+                out = np.empty_like(p)
+                for idx in np.ndindex(*p.shape[:-1]):
+                    func(p[idx], scalar, out[idx])
+                return out
+            return gufunc
+        return wrap
+
+
+MAX_SAFE_PRICE = 1e15  # 1 katrilyon - çok büyük değerler için limit
+
+
+def _to_float64(prices) -> np.ndarray:
+    """
+    Fiyat serisini contiguous float64 diziye çevir
+    
+    Zaten contiguous float64 ndarray ise kopyasız döner; liste girdiler tek
+    C-seviyesi geçişle dönüştürülür (eleman başına Python float() yok).
+    Kernel'ler (özellikle AOT derlenmiş olanlar) contiguous dizi bekler.
+    """
+    if isinstance(prices, np.ndarray) and prices.dtype == np.float64:
+        return np.ascontiguousarray(prices)
+    return np.fromiter(prices, dtype=np.float64, count=len(prices))
+
+
+def _validate_prices(p: np.ndarray, name: str) -> bool:
+    """Fiyatların sonlu, pozitif ve güvenli aralıkta olduğunu tek geçişte kontrol et"""
+    if not np.isfinite(p).all() or p.min() <= 0 or p.max() > MAX_SAFE_PRICE:
+        logger.warning(f"{name} hesaplama - Geçersiz fiyat (min: {p.min()}, max: {p.max()})")
+        return False
+    return True
+
+
+def _split_gains_losses(d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fiyat farklarını kazanç / kayıp dizilerine ayır - dalsız
+    
+    (d + |d|) / 2 = max(d, 0), (|d| - d) / 2 = max(-d, 0); maske ve karşılaştırma yok.
+    """
+    ad = np.abs(d)
+    return 0.5 * (d + ad), 0.5 * (ad - d)
+
+
+# fastmath (nnan/ninf) yalnızca _validate_prices'tan geçmiş girdiyi işleyen kernel'lerde
+# kullanılır; doğrulanmamış seri görebilen kernel'lerde NaN tanımsız davranış yerine yayılmalı
+@njit(cache=True, boundscheck=False)
+def _sliding_sum_kernel(x, w, out):
+    """
+    Kayan pencere toplamı - tek okuma geçişi, önek (cumsum) dizisi yazılmaz
+    
+    Penceredeki sıfır olmayan eleman sayısı tutulur; pencere tamamen sıfırsa
+    toplam birikmiş yuvarlama artığı yerine tam 0 yazılır. out (n - w + 1) boyutunda.
+    """
+    n = x.shape[0]
+    s = 0.0
+    nz = 0
+    for i in range(w):
+        s += x[i]
+        if x[i] != 0.0:
+            nz += 1
+    out[0] = s if nz > 0 else 0.0
+    for i in range(w, n):
+        s += x[i] - x[i - w]
+        if x[i] != 0.0:
+            nz += 1
+        if x[i - w] != 0.0:
+            nz -= 1
+        out[i - w + 1] = s if nz > 0 else 0.0
+    return out
+
+
+def _calculate_cmo_arr(p: np.ndarray, period: int = 9) -> np.ndarray:
+    """
+    Chande Momentum Oscillator (CMO) - float64 dizi giriş/çıkış
+    
+    Kayan pencere toplamları tek geçişli JIT kernel ile O(N) hesaplanır.
+    """
+    if p.shape[0] < period + 1:
+        return np.empty(0)
+    
+    # Fiyat değişimleri -> kazanç / kayıp
+    d = np.diff(p)
+    gains, losses = _split_gains_losses(d)
+    
+    # Kayan pencere toplamları
+    m = d.shape[0] - period + 1
+    sum_gains = _sliding_sum_kernel(gains, period, np.empty(m))
+    sum_losses = _sliding_sum_kernel(losses, period, np.empty(m))
+    
+    # CMO hesapla
+    denom = sum_gains + sum_losses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denom == 0, 0.0, (sum_gains - sum_losses) / denom * 100)
+
 
 def calculate_cmo(prices: List[float], period: int = 9) -> List[float]:
     """
     Chande Momentum Oscillator (CMO) hesapla
     """
     try:
-        if len(prices) < period + 1:
+        if prices is None or len(prices) < period + 1 or period <= 0:
             return []
         
-        cmo_values = []
-        
-        for i in range(period, len(prices)):
-            # Son period+1 fiyatı al
-            price_slice = prices[i-period:i+1]
-            
-            # Fiyat değişimlerini hesapla
-            gains = []
-            losses = []
-            
-            for j in range(1, len(price_slice)):
-                change = price_slice[j] - price_slice[j-1]
-                if change > 0:
-                    gains.append(change)
-                    losses.append(0)
-                else:
-                    gains.append(0)
-                    losses.append(abs(change))
-            
-            # CMO hesapla
-            sum_gains = sum(gains)
-            sum_losses = sum(losses)
-            
-            if sum_gains + sum_losses == 0:
-                cmo = 0
-            else:
-                cmo = ((sum_gains - sum_losses) / (sum_gains + sum_losses)) * 100
-            
-            cmo_values.append(cmo)
+        p = _to_float64(prices)
+        if not _validate_prices(p, "CMO"):
+            return []
         
-        return cmo_values
+        return _calculate_cmo_arr(p, period).tolist()
         
     except Exception as e:
         logger.error(f"CMO hesaplama hatası: {e}")
         return []
 
 
+@njit(cache=True, boundscheck=False)
+def _vidya_kernel(prices, cmo, alpha, start_idx, vma0, out):
+    """VIDYA özyinelemesi: vma = vma[1] + alpha * |cmo| * (close - vma[1]) - out (n - start_idx) boyutunda"""
+    n = prices.shape[0]
+    m = cmo.shape[0]
+    vma = vma0
+    for i in range(start_idx, n):
+        cmo_idx = i - start_idx
+        if cmo_idx < m:
+            vma += alpha * abs(cmo[cmo_idx]) * 0.01 * (prices[i] - vma)
+        out[cmo_idx] = vma
+    return out
+
+
+def _calculate_vidya_arr(p: np.ndarray, period: int = 20, cmo_period: int = 9,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    VIDYA (Variable Index Dynamic Average) - float64 dizi giriş/çıkış
+    
+    out verilirse (len(p) - max(period, cmo_period)) boyutunda olmalı; sonuç oraya yazılır.
+    """
+    if p.shape[0] < max(period, cmo_period) + 1:
+        return np.empty(0)
+    
+    # CMO hesapla
+    cmo = _calculate_cmo_arr(p, cmo_period)
+    
+    # Alpha değeri
+    alpha = 2.0 / (period + 1)
+    
+    # VIDYA hesaplama - ilk değer period-1. fiyat
+    start_idx = max(period, cmo_period)
+    if out is None:
+        out = np.empty(p.shape[0] - start_idx)
+    return _vidya_kernel(p, cmo, alpha, start_idx, float(p[period - 1]), out)
+
+
 def calculate_vidya(prices: List[float], period: int = 20, cmo_period: int = 9) -> List[float]:
     """
     VIDYA (Variable Index Dynamic Average) hesapla
     """
     try:
-        if len(prices) < max(period, cmo_period) + 1:
-            return []
-        
-        # CMO hesapla
-        cmo_values = calculate_cmo(prices, cmo_period)
-        
-        if not cmo_values:
-            return []
-        
-        # Alpha değeri
-        alpha = 2.0 / (period + 1)
-        
-        # VIDYA hesaplama
-        vidya_values = []
-        vma = prices[period-1]  # İlk değer
-        
-        # CMO değerleri ile VIDYA hesapla
-        start_idx = max(period, cmo_period)
-        
-        for i in range(start_idx, len(prices)):
-            cmo_idx = i - start_idx
-            if cmo_idx < len(cmo_values):
-                cmo = cmo_values[cmo_idx]
-                # VIDYA formülü: vma = vma[1] + alpha * abs(cmo) * (close - vma[1])
-                vma = vma + alpha * abs(cmo) / 100.0 * (prices[i] - vma)
-                vidya_values.append(vma)
-            else:
-                vidya_values.append(vma)
-        
-        return vidya_values
+        return _calculate_vidya_arr(_to_float64(prices), period, cmo_period).tolist()
         
     except Exception as e:
         logger.error(f"VIDYA hesaplama hatası: {e}")
         return []
 
 
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _ema_kernel(p, period, out):
+    """EMA özyinelemesi - ilk değer ilk period fiyatın SMA'sı, out (n - period + 1) boyutunda"""
+    n = p.shape[0]
+    s = 0.0
+    for k in range(period):
+        s += p[k]
+    out[0] = s / period
+    a = 2.0 / (period + 1)
+    one_minus_a = 1.0 - a
+    for i in range(period, n):
+        out[i - period + 1] = a * p[i] + one_minus_a * out[i - period]
+    return out
+
+
+def _ema_rows(p, period, out):
+    """EMA özyinelemesi son eksen üzerinde - ilk period-1 bar NaN, varlık ekseni paralel"""
+    n = p.shape[0]
+    for k in range(min(period - 1, n)):
+        out[k] = np.nan
+    if period <= 0 or n < period:
+        return
+    s = 0.0
+    for k in range(period):
+        s += p[k]
+    out[period - 1] = s / period
+    a = 2.0 / (period + 1)
+    one_minus_a = 1.0 - a
+    for i in range(period, n):
+        out[i] = a * p[i] + one_minus_a * out[i - 1]
+
+
+_ema_gufunc = None
+
+
+def _get_ema_gufunc():
+    """
+    Paralel EMA gufunc'ını ilk kullanımda derle
+    
+    İmzalı guvectorize dekoratörü import anında derler; yalnızca calculate_ema_batch
+    kullandığından derleme ilk toplu çağrıya bırakılır (cache=True ile sonraki
+    süreçler diskten yükler).
+    """
+    global _ema_gufunc
+    if _ema_gufunc is None:
+        _ema_gufunc = guvectorize(
+            ['void(float64[:], int64, float64[:])'], '(n),()->(n)',
+            nopython=True, target='parallel', fastmath=True, cache=True
+        )(_ema_rows)
+    return _ema_gufunc
+
+
+def _calculate_ema_arr(p: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    EMA - float64 dizi giriş/çıkış, geçersiz veride boş dizi
+    
+    out verilirse (len(p) - period + 1) boyutunda olmalı; sonuç oraya yazılır.
+    """
+    if p.shape[0] < period or period <= 0:
+        return np.empty(0)
+    
+    # Fiyat değerlerini güvenli aralıkta kontrol et - tek vektörel geçiş
+    if not _validate_prices(p, "EMA"):
+        return np.empty(0)
+    
+    # JIT kernel ile hesaplama - döngü korumasız çalışır, taşma sonda tek kontrolle yakalanır
+    # (period > 0 olduğundan alpha = 2 / (period + 1) her zaman (0, 1] aralığında)
+    if out is None:
+        out = np.empty(p.shape[0] - period + 1)
+    ema_values = _ema_kernel(p, period, out)
+    
+    if not np.isfinite(ema_values).all() or np.any(np.abs(ema_values) > MAX_SAFE_PRICE) or np.any(ema_values <= 0):
+        logger.warning(f"EMA hesaplama - Overflow riski: period={period}")
+        return np.empty(0)
+    
+    return ema_values
+
+
 def calculate_ema(prices: List[float], period: int) -> List[float]:
     """
     Exponential Moving Average hesapla - OVERFLOW KORUMALI VERSİYON
     """
     try:
-        # Güvenlik kontrolleri - overflow önleme
-        max_safe_value = 1e15  # 1 katrilyon - çok büyük değerler için limit
-        min_safe_value = 1e-15  # Çok küçük değerler için limit
-        
         if len(prices) < period or period <= 0:
             return []
         
-        # Fiyat değerlerini güvenli aralıkta kontrol et
-        safe_prices = []
-        for price in prices:
-            try:
-                price_float = float(price)
-                if abs(price_float) > max_safe_value or price_float <= 0:
-                    logger.warning(f"EMA hesaplama - Geçersiz fiyat: {price_float}")
-                    return []
-                safe_prices.append(price_float)
-            except (ValueError, TypeError, OverflowError):
-                logger.warning(f"EMA hesaplama - Fiyat dönüşüm hatası: {price}")
-                return []
-        
-        # NumPy ile daha hızlı hesaplama - overflow korumalı
         try:
-            prices_array = np.array(safe_prices, dtype=float)
-            alpha = 2.0 / (period + 1)
-            
-            # Alpha değeri kontrolü
-            if alpha <= 0 or alpha > 1:
-                logger.warning(f"EMA hesaplama - Geçersiz alpha: {alpha}")
-                return []
-            
-            # İlk değer SMA - overflow korumalı
-            sma_first = np.mean(prices_array[:period])
-            if abs(sma_first) > max_safe_value or sma_first <= 0:
-                logger.warning(f"EMA hesaplama - Geçersiz SMA: {sma_first}")
-                return []
-            
-            ema_values = [sma_first]
-            
-            # EMA hesaplama - overflow korumalı
-            for i in range(period, len(prices_array)):
-                try:
-                    ema = alpha * prices_array[i] + (1 - alpha) * ema_values[-1]
-                    
-                    # Overflow kontrolü
-                    if abs(ema) > max_safe_value or ema <= 0:
-                        logger.warning(f"EMA hesaplama - Overflow riski: {ema}")
-                        # Son geçerli değeri kullan
-                        ema = ema_values[-1]
-                    
-                    ema_values.append(ema)
-                    
-                except (OverflowError, ValueError) as e:
-                    logger.warning(f"EMA hesaplama - Hesaplama hatası: {e}")
-                    # Son geçerli değeri kullan
-                    ema_values.append(ema_values[-1])
-            
-            return ema_values
-            
-        except (OverflowError, ValueError, ZeroDivisionError) as e:
-            logger.error(f"EMA hesaplama - NumPy hatası: {e}")
+            prices_array = _to_float64(prices)
+        except (ValueError, TypeError, OverflowError):
+            logger.warning("EMA hesaplama - Fiyat dönüşüm hatası")
             return []
+        
+        return _calculate_ema_arr(prices_array, period).tolist()
             
     except Exception as e:
         logger.error(f"EMA hesaplama - Genel hata: {e}")
         return []
 
 
+def _calculate_sma_arr(p: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    SMA - float64 dizi giriş/çıkış, geçersiz veride boş dizi
+    
+    out verilirse (len(p) - period + 1) boyutunda olmalı; sonuç oraya yazılır.
+    """
+    if p.shape[0] < period or period <= 0:
+        return np.empty(0)
+    
+    # Fiyat değerlerini güvenli aralıkta kontrol et - tek vektörel geçiş
+    if not _validate_prices(p, "SMA"):
+        return np.empty(0)
+    
+    # Kayan pencere toplamı - tek geçişli JIT kernel, O(N)
+    if out is None:
+        out = np.empty(p.shape[0] - period + 1)
+    sma_values = _sliding_sum_kernel(p, period, out)
+    sma_values /= period
+    
+    # Overflow kontrolü - tek vektörel geçiş
+    if np.any(np.abs(sma_values) > MAX_SAFE_PRICE) or np.any(sma_values <= 0):
+        logger.warning(f"SMA hesaplama - Overflow riski: period={period}")
+        return np.empty(0)
+    
+    return sma_values
+
+
+def calculate_ema_batch(prices_2d: np.ndarray, period: int) -> np.ndarray:
+    """
+    Çok varlıklı EMA - (n_assets, n_bars) matristen (n_assets, n_bars - period + 1)
+    
+    Tek Python çağrısıyla tüm satırlar hesaplanır; satırlar numba iş parçacıklarına dağıtılır.
+    Geçersiz veride boş dizi döner.
+    """
+    try:
+        p = np.ascontiguousarray(prices_2d, dtype=np.float64)
+        if p.ndim < 1 or p.shape[-1] < period or period <= 0 or p.size == 0:
+            return np.empty(0)
+        if not _validate_prices(p, "EMA batch"):
+            return np.empty(0)
+        
+        return _get_ema_gufunc()(p, period)[..., period - 1:]
+        
+    except Exception as e:
+        logger.error(f"EMA batch hesaplama hatası: {e}")
+        return np.empty(0)
+
+
 def calculate_sma(prices: List[float], period: int) -> List[float]:
     """
     Simple Moving Average hesapla - OVERFLOW KORUMALI VERSİYON
     """
     try:
-        # Güvenlik kontrolleri - overflow önleme
-        max_safe_value = 1e15  # 1 katrilyon - çok büyük değerler için limit
-        min_safe_value = 1e-15  # Çok küçük değerler için limit
-        
         if len(prices) < period or period <= 0:
             return []
         
-        # Fiyat değerlerini güvenli aralıkta kontrol et
-        safe_prices = []
-        for price in prices:
-            try:
-                price_float = float(price)
-                if abs(price_float) > max_safe_value or price_float <= 0:
-                    logger.warning(f"SMA hesaplama - Geçersiz fiyat: {price_float}")
-                    return []
-                safe_prices.append(price_float)
-            except (ValueError, TypeError, OverflowError):
-                logger.warning(f"SMA hesaplama - Fiyat dönüşüm hatası: {price}")
-                return []
-        
-        sma_values = []
-        for i in range(period - 1, len(safe_prices)):
-            window = safe_prices[i - period + 1:i + 1]
-            if len(window) > 0 and period > 0:
-                try:
-                    sma = sum(window) / period
-                    
-                    # Overflow kontrolü
-                    if abs(sma) > max_safe_value or sma <= 0:
-                        logger.warning(f"SMA hesaplama - Overflow riski: {sma}")
-                        # Son geçerli değeri kullan veya varsayılan değer
-                        if sma_values:
-                            sma = sma_values[-1]
-                        else:
-                            sma = safe_prices[i]  # Mevcut fiyatı kullan
-                    
-                    sma_values.append(sma)
-                    
-                except (OverflowError, ValueError, ZeroDivisionError) as e:
-                    logger.warning(f"SMA hesaplama - Hesaplama hatası: {e}")
-                    # Son geçerli değeri kullan veya mevcut fiyatı
-                    if sma_values:
-                        sma_values.append(sma_values[-1])
-                    else:
-                        sma_values.append(safe_prices[i])
-        
-        return sma_values
+        try:
+            p = _to_float64(prices)
+        except (ValueError, TypeError, OverflowError):
+            logger.warning("SMA hesaplama - Fiyat dönüşüm hatası")
+            return []
+        
+        return _calculate_sma_arr(p, period).tolist()
         
     except Exception as e:
         logger.error(f"SMA hesaplama - Genel hata: {e}")
         return []
 
 
+def _ott_from_vma(vma: float, current_price: float, factor: float) -> Tuple[OTTMode, float, float, float]:
+    """
+    Tek bar için VMA'dan OTT çizgisi ve modu hesapla
+    
+    Returns:
+        (mode, ott_line, long_stop, short_stop)
+    """
+    offset = vma * factor / 100.0
+    
+    # Trailing stop hesaplama
+    long_stop = vma - offset
+    short_stop = vma + offset
+    
+    # OTT trend çizgisi: fiyat > vma → uptrend
+    if current_price > vma:
+        ott_line = long_stop * (1 + factor / 200)
+    else:
+        ott_line = short_stop * (1 - factor / 200)
+    
+    # OTT sinyal mantığı: OTT < OTT_SUP → AL, OTT ≥ OTT_SUP → SAT
+    # ott_line = OTT, vma = OTT_SUP
+    mode = OTTMode.AL if ott_line < vma else OTTMode.SAT
+    return mode, ott_line, long_stop, short_stop
+
+
 def calculate_ott(close_prices: List[float], period: int, opt: float, strategy_name: str = "Unknown") -> Optional[OTTResult]:
     """
     OTT (Optimized Trend Tracker) hesapla - PINE SCRIPT MANTĞI
@@ -250,10 +426,13 @@ def calculate_ott(close_prices: List[float], period: int, opt: float, strategy_n
             logger.warning(f"OTT hesaplama için yeterli veri yok. Gerekli: {period + 9}, Mevcut: {len(close_prices)}")
             return None
         
+        # Fiyat serisini bir kez float64 diziye çevir - alt hesaplar kopyasız kullanır
+        close_prices = _to_float64(close_prices)
+        
         # VIDYA (destek çizgisi) hesapla
-        vidya_values = calculate_vidya(close_prices, period, cmo_period=9)
+        vidya_values = _calculate_vidya_arr(close_prices, period, cmo_period=9)
         
-        if not vidya_values:
+        if vidya_values.size == 0:
             logger.warning("VIDYA hesaplanamadı")
             return None
         
@@ -264,23 +443,7 @@ def calculate_ott(close_prices: List[float], period: int, opt: float, strategy_n
         # Factor ve offset hesaplama
         factor = float(opt)  # opt = factor (2.0)
         offset = vma * factor / 100.0
-        
-        # Trailing stop hesaplama
-        long_stop = vma - offset
-        short_stop = vma + offset
-        
-        # Basit trend yönü belirleme (fiyat > vma → uptrend)
-        dir_value = 1 if current_price > vma else -1
-        
-        # OTT trend çizgisi hesaplama
-        if dir_value == 1:
-            ott_line = long_stop * (1 + factor / 200)
-        else:
-            ott_line = short_stop * (1 - factor / 200)
-        
-        # OTT sinyal mantığı: OTT < OTT_SUP → AL, OTT ≥ OTT_SUP → SAT
-        # ott_line = OTT, vma = OTT_SUP
-        mode = OTTMode.AL if ott_line < vma else OTTMode.SAT
+        mode, ott_line, long_stop, short_stop = _ott_from_vma(vma, current_price, factor)
         
         logger.info(f"OTT Pine Script mantığı [{strategy_name}]:")
         logger.info(f"  VMA (OTT_SUP): {vma:.2f}")
@@ -319,22 +482,22 @@ def calculate_ott_detailed(close_prices: List[float], period: int, opt: float) -
         if len(close_prices) < period:
             return result
         
-        # Tüm EMA değerlerini hesapla
-        ema_values = calculate_ema(close_prices, period)
+        # Tüm EMA değerlerini hesapla - ara liste üretmeden dizi olarak
+        price_all = _to_float64(close_prices)
+        ema_arr = _calculate_ema_arr(price_all, period)
         
-        if not ema_values:
+        if ema_arr.size == 0:
             return result
         
-        # Her bar için OTT değerlerini hesapla
-        for i, (ema, price) in enumerate(zip(ema_values, close_prices[period-1:])):
-            upper = ema * (1 + opt / 100)
-            lower = ema * (1 - opt / 100)
-            mode = OTTMode.AL if price > ema else OTTMode.SAT
-            
-            result['baseline_history'].append(ema)
-            result['upper_history'].append(upper)
-            result['lower_history'].append(lower)
-            result['mode_history'].append(mode.value)
+        # Tüm barlar için bantlar ve mod - tek vektörel geçiş
+        ema_values = ema_arr.tolist()
+        price_arr = price_all[period - 1:period - 1 + len(ema_arr)]
+        is_al = price_arr > ema_arr
+        
+        result['baseline_history'] = ema_values
+        result['upper_history'] = (ema_arr * (1 + opt / 100)).tolist()
+        result['lower_history'] = (ema_arr * (1 - opt / 100)).tolist()
+        result['mode_history'] = np.where(is_al, OTTMode.AL.value, OTTMode.SAT.value).tolist()
         
         # Son değerleri current olarak ayarla
         if ema_values:
@@ -387,25 +550,38 @@ def backtest_ott_signals(close_prices: List[float], period: int, opt: float) ->
         if len(close_prices) < period + 1:
             return {'signals': signals, 'stats': stats}
         
-        # Her bar için OTT hesapla
-        for i in range(period, len(close_prices)):
-            window_prices = close_prices[:i+1]
-            ott_result = calculate_ott(window_prices, period, opt, "Backtest")
+        # VIDYA tüm seri için tek seferde hesaplanır; nedensel olduğundan
+        # vidya[i - start_idx], close_prices[:i+1] üzerindeki son değere eşittir
+        p = _to_float64(close_prices)
+        vidya_arr = _calculate_vidya_arr(p, period, cmo_period=9)
+        if vidya_arr.size == 0:
+            return {'signals': signals, 'stats': stats}
+        
+        start_idx = max(period, 9)
+        factor = float(opt)
+        
+        # Skaler döngü için tek C geçişinde Python float listesine - eleman başına float() yok
+        vidya_values = vidya_arr.tolist()
+        price_values = p.tolist()
+        
+        # calculate_ott en az period + 9 bar ister
+        for i in range(period + 8, len(price_values)):
+            vma = vidya_values[i - start_idx]
+            mode, ott_line, long_stop, short_stop = _ott_from_vma(vma, price_values[i], factor)
             
-            if ott_result:
-                signals.append({
-                    'index': i,
-                    'price': close_prices[i],
-                    'mode': ott_result.mode.value,
-                    'baseline': ott_result.baseline,
-                    'upper': ott_result.upper,
-                    'lower': ott_result.lower
-                })
-                
-                if ott_result.mode == OTTMode.AL:
-                    stats['total_al_signals'] += 1
-                else:
-                    stats['total_sat_signals'] += 1
+            signals.append({
+                'index': i,
+                'price': close_prices[i],
+                'mode': mode.value,
+                'baseline': ott_line,
+                'upper': short_stop,
+                'lower': long_stop
+            })
+            
+            if mode == OTTMode.AL:
+                stats['total_al_signals'] += 1
+            else:
+                stats['total_sat_signals'] += 1
         
         # Mod değişikliklerini say
         for i in range(1, len(signals)):
@@ -419,49 +595,228 @@ def backtest_ott_signals(close_prices: List[float], period: int, opt: float) ->
         return {'signals': signals, 'stats': stats}
 
 
-def calculate_rsi(prices: List[float], period: int = 14) -> List[float]:
+@dataclass
+class OTTStreamState:
     """
-    RSI (Relative Strength Index) hesapla - opsiyonel ek indikatör
+    Canlı bar akışı için artımlı OTT - bar başına O(1)
+    
+    calculate_ott her tick'te tüm geçmişi yeniden işler; bu durum son VMA'yı,
+    CMO pencere toplamlarını ve son max(period, 9) + 1 fiyatlık halka tamponu
+    tutar. Önce seed() ile geçmiş üzerinde bir kez toplu hesaplanır, sonra her
+    yeni kapanış update() ile işlenir. Sonuçlar calculate_ott ile aynıdır.
     """
-    if len(prices) < period + 1:
-        return []
+    period: int
+    opt: float
+    cmo_period: int = 9
+    vma: float = 0.0
+    cmo_sg: float = 0.0
+    cmo_sl: float = 0.0
+    # Penceredeki sıfır olmayan kazanç/kayıp sayısı - toplamlar boşalınca tam 0'a oturtmak için
+    cmo_ng: int = 0
+    cmo_nl: int = 0
+    ring: np.ndarray = field(default_factory=lambda: np.empty(0))
+    head: int = 0
+    count: int = 0
+    alpha: float = field(init=False)
+    factor: float = field(init=False)
     
-    gains = []
-    losses = []
+    def __post_init__(self):
+        self.alpha = 2.0 / (self.period + 1)
+        self.factor = float(self.opt)
     
-    # Fiyat değişimlerini hesapla
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
+    @property
+    def ready(self) -> bool:
+        return self.ring.shape[0] > 0
     
-    if len(gains) < period:
-        return []
+    def seed(self, close_prices: List[float]) -> Optional[OTTResult]:
+        """Geçmiş fiyatlarla durumu başlat - toplu VIDYA kernel'i bir kez çalışır"""
+        p = _to_float64(close_prices)
+        n = p.shape[0]
+        if n < self.period + 9:
+            logger.warning(f"OTT stream seed için yeterli veri yok. Gerekli: {self.period + 9}, Mevcut: {n}")
+            return None
+        
+        vidya = _calculate_vidya_arr(p, self.period, self.cmo_period)
+        if vidya.size == 0:
+            return None
+        self.vma = float(vidya[-1])
+        
+        # VIDYA, bar i'de fiyat indeksi i - lag'de biten CMO penceresini kullanır
+        size = max(self.period, self.cmo_period) + 1
+        lag = size - 1 - self.cmo_period
+        changes = np.diff(p[n - size:n - lag])
+        gains, losses = _split_gains_losses(changes)
+        self.cmo_sg = float(gains.sum())
+        self.cmo_sl = float(losses.sum())
+        self.cmo_ng = int(np.count_nonzero(gains))
+        self.cmo_nl = int(np.count_nonzero(losses))
+        
+        self.ring = p[n - size:].copy()
+        self.head = 0
+        self.count = n
+        
+        return self._result(float(p[-1]))
+    
+    def update(self, price: float) -> OTTResult:
+        """Yeni kapanış fiyatını işle - O(1)"""
+        if not self.ready:
+            raise RuntimeError("OTTStreamState.update seed() çağrılmadan kullanıldı")
+        
+        ring = self.ring
+        size = ring.shape[0]
+        head = self.head
+        lag = size - 1 - self.cmo_period
+        price = float(price)
+        
+        # Pencereden çıkan ve giren fiyat değişimleri (halka yazılmadan önce okunur)
+        old_change = ring[(head + 1) % size] - ring[head]
+        newest = price if lag == 0 else ring[(head + size - lag) % size]
+        new_change = newest - ring[(head + size - lag - 1) % size]
+        
+        if old_change > 0:
+            self.cmo_sg -= old_change
+            self.cmo_ng -= 1
+        elif old_change < 0:
+            self.cmo_sl += old_change
+            self.cmo_nl -= 1
+        if new_change > 0:
+            self.cmo_sg += new_change
+            self.cmo_ng += 1
+        elif new_change < 0:
+            self.cmo_sl -= new_change
+            self.cmo_nl += 1
+        if self.cmo_ng == 0:
+            self.cmo_sg = 0.0
+        if self.cmo_nl == 0:
+            self.cmo_sl = 0.0
+        
+        ring[head] = price
+        self.head = (head + 1) % size
+        self.count += 1
+        
+        denom = self.cmo_sg + self.cmo_sl
+        cmo = 0.0 if denom == 0 else (self.cmo_sg - self.cmo_sl) / denom * 100
+        self.vma += self.alpha * abs(cmo) * 0.01 * (price - self.vma)
+        
+        return self._result(price)
     
-    # İlk RS hesapla
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
+    def _result(self, current_price: float) -> OTTResult:
+        mode, ott_line, long_stop, short_stop = _ott_from_vma(self.vma, current_price, self.factor)
+        return OTTResult(
+            mode=mode,
+            baseline=ott_line,
+            upper=short_stop,
+            lower=long_stop,
+            current_price=current_price
+        )
+
+
+@njit(parallel=True, cache=True, boundscheck=False)
+def _ott_grid_kernel(p, cmo, periods, opts, out_mode, out_ott):
+    """
+    (period, opt) ızgarası için OTT - period ekseni çekirdeklere dağıtılır
     
-    rsi_values = []
+    Her period kendi VIDYA özyinelemesini seri yürütür; opt ekseni iç döngüdedir.
+    out_* dizileri (P, N, O) boyutunda önceden ayrılmış olmalı.
+    """
+    n = p.shape[0]
+    m = cmo.shape[0]
+    n_opts = opts.shape[0]
+    for pi in prange(periods.shape[0]):
+        period = periods[pi]
+        first_bar = period + 8
+        if period <= 0 or n <= first_bar:
+            continue
+        start_idx = max(period, 9)
+        alpha = 2.0 / (period + 1)
+        vma = p[period - 1]
+        for i in range(start_idx, n):
+            cmo_idx = i - start_idx
+            if cmo_idx < m:
+                vma += alpha * abs(cmo[cmo_idx]) * 0.01 * (p[i] - vma)
+            if i < first_bar:
+                continue
+            price = p[i]
+            for oi in range(n_opts):
+                factor = opts[oi]
+                offset = vma * factor / 100.0
+                if price > vma:
+                    ott_line = (vma - offset) * (1 + factor / 200)
+                else:
+                    ott_line = (vma + offset) * (1 - factor / 200)
+                out_ott[pi, i, oi] = ott_line
+                out_mode[pi, i, oi] = ott_line < vma
+
+
+def backtest_ott_grid(close_prices: List[float], periods: List[int], opts: List[float]) -> Dict:
+    """
+    Çoklu (period, opt) kombinasyonu için OTT backtest - parametre taraması için
+    
+    CMO seri başına bir kez hesaplanır; periodlar paralel JIT kernel'de çekirdeklere
+    dağıtılır. Bar indeksleri backtest_ott_signals ile hizalıdır: period için ilk
+    geçerli bar period + 8'dir, öncesi NaN / False.
+    
+    Returns:
+        {'periods', 'opts', 'ott': (P, N, O) float64, 'mode_al': (P, N, O) bool}
+    """
+    periods_list = [int(period) for period in periods]
+    opts_arr = np.asarray(opts, dtype=np.float64)
     
-    for i in range(period, len(gains)):
+    try:
+        p = _to_float64(close_prices)
+        ott = np.full((len(periods_list), p.shape[0], opts_arr.shape[0]), np.nan)
+        mode_al = np.zeros(ott.shape, dtype=bool)
+        
+        # CMO(9) tüm periodlar için ortak
+        cmo = _calculate_cmo_arr(p, 9)
+        _ott_grid_kernel(p, cmo, np.asarray(periods_list, dtype=np.int64), opts_arr, mode_al, ott)
+        
+        return {'periods': periods_list, 'opts': opts_arr.tolist(), 'ott': ott, 'mode_al': mode_al}
+        
+    except Exception as e:
+        logger.error(f"OTT grid backtest hatası: {e}")
+        return {
+            'periods': periods_list,
+            'opts': opts_arr.tolist(),
+            'ott': np.empty((0, 0, 0)),
+            'mode_al': np.empty((0, 0, 0), dtype=bool)
+        }
+
+
+@njit(cache=True, boundscheck=False)
+def _rsi_kernel(gains, losses, period):
+    """Wilder yumuşatmalı RSI özyinelemesi"""
+    n = gains.shape[0]
+    out = np.empty(n - period)
+    avg_gain = gains[:period].sum() / period
+    avg_loss = losses[:period].sum() / period
+    for i in range(period, n):
         if avg_loss == 0:
-            rsi = 100
+            out[i - period] = 100.0
         else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-        
-        rsi_values.append(rsi)
+            out[i - period] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
         
         # Sonraki değer için ortalama güncelle
         avg_gain = (avg_gain * (period - 1) + gains[i]) / period
         avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    return out
+
+
+def calculate_rsi(prices: List[float], period: int = 14) -> List[float]:
+    """
+    RSI (Relative Strength Index) hesapla - opsiyonel ek indikatör
+    """
+    if len(prices) < period + 1:
+        return []
+    
+    # Fiyat değişimlerini hesapla
+    d = np.diff(_to_float64(prices))
+    gains, losses = _split_gains_losses(d)
+    
+    if len(gains) < period:
+        return []
     
-    return rsi_values
+    return _rsi_kernel(gains, losses, period).tolist()
 
 
 def calculate_bollinger_bands(prices: List[float], period: int = 20, std_dev: float = 2.0) -> Dict:
@@ -472,55 +827,303 @@ def calculate_bollinger_bands(prices: List[float], period: int = 20, std_dev: fl
         return {'upper': [], 'middle': [], 'lower': []}
     
     try:
-        middle = calculate_sma(prices, period)
-        if not middle:
+        p = _to_float64(prices)
+        mid = _calculate_sma_arr(p, period)
+        if mid.size == 0:
             return {'upper': [], 'middle': [], 'lower': []}
         
-        upper = []
-        lower = []
+        # Kayan pencere std (ddof=0): var = E[x²] - E[x]², iki kümülatif toplamla O(N)
+        # Varyans kaydırmaya duyarsız - seri ortalamasını çıkarmak sayısal kaybı azaltır
+        p = p - p.mean()
+        c1 = np.concatenate(([0.0], np.cumsum(p)))
+        c2 = np.concatenate(([0.0], np.cumsum(p * p)))
+        mean = (c1[period:] - c1[:-period]) / period
+        mean_sq = (c2[period:] - c2[:-period]) / period
+        std = np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
         
-        for i in range(period - 1, len(prices)):
-            window = prices[i - period + 1:i + 1]
-            if len(window) > 0:
-                std = np.std(window)
-                sma_idx = i - period + 1
-                if 0 <= sma_idx < len(middle):
-                    sma = middle[sma_idx]
-                    upper.append(sma + (std_dev * std))
-                    lower.append(sma - (std_dev * std))
+        band = std_dev * std
         
         return {
-            'upper': upper,
-            'middle': middle,
-            'lower': lower
+            'upper': (mid + band).tolist(),
+            'middle': mid.tolist(),
+            'lower': (mid - band).tolist()
         }
     except Exception as e:
         # Hata durumunda boş döndür
         return {'upper': [], 'middle': [], 'lower': []}
 
 
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _panel_kernel(p, ema_p, sma_p, rsi_p, vid_p, bb_p, bb_k, bb_center,
+                  ema_out, sma_out, rsi_out, vid_out, bb_up, bb_mid, bb_lo, cmo_buf):
+    """
+    Birleşik indikatör paneli - fiyat serisi tek geçişte okunur
+    
+    Her bar için tüm açık indikatörlerin özyineleme durumu (EMA önceki değer,
+    SMA/Bollinger pencere toplamları, RSI Wilder ortalamaları, CMO/VIDYA)
+    birlikte ilerletilir. period = 0 olan indikatör kapalıdır. Çıktılar tam
+    uzunluktadır ve her biri kendi calculate_* fonksiyonunun bar hizasını izler.
+    """
+    n = p.shape[0]
+    cmo_p = 9
+    ema_a = 2.0 / (ema_p + 1) if ema_p > 0 else 0.0
+    ema = 0.0
+    sma_s = 0.0
+    bb_s = 0.0
+    bb_s2 = 0.0
+    bb_sma = 0.0
+    rsi_g = 0.0
+    rsi_l = 0.0
+    cmo_g = 0.0
+    cmo_l = 0.0
+    cmo_ng = 0
+    cmo_nl = 0
+    vid_start = max(vid_p, cmo_p)
+    vid_lag = vid_start - cmo_p
+    vid_a = 2.0 / (vid_p + 1) if vid_p > 0 else 0.0
+    vma = p[vid_p - 1] if vid_p > 0 else 0.0
+    
+    for i in range(n):
+        x = p[i]
+        
+        if ema_p > 0:
+            if i < ema_p:
+                ema += x
+                if i == ema_p - 1:
+                    ema = ema / ema_p
+                    ema_out[i] = ema
+            else:
+                ema = ema_a * x + (1.0 - ema_a) * ema
+                ema_out[i] = ema
+        
+        if sma_p > 0:
+            sma_s += x
+            if i >= sma_p:
+                sma_s -= p[i - sma_p]
+            if i >= sma_p - 1:
+                sma_out[i] = sma_s / sma_p
+        
+        if bb_p > 0:
+            xc = x - bb_center
+            bb_s += xc
+            bb_s2 += xc * xc
+            bb_sma += x
+            if i >= bb_p:
+                oc = p[i - bb_p] - bb_center
+                bb_s -= oc
+                bb_s2 -= oc * oc
+                bb_sma -= p[i - bb_p]
+            if i >= bb_p - 1:
+                mean = bb_s / bb_p
+                var = bb_s2 / bb_p - mean * mean
+                band = bb_k * np.sqrt(var if var > 0.0 else 0.0)
+                mid = bb_sma / bb_p
+                bb_mid[i] = mid
+                bb_up[i] = mid + band
+                bb_lo[i] = mid - band
+        
+        if i == 0:
+            continue
+        
+        d = x - p[i - 1]
+        ad = abs(d)
+        gain = 0.5 * (d + ad)
+        loss = 0.5 * (ad - d)
+        
+        if rsi_p > 0:
+            if i <= rsi_p:
+                rsi_g += gain
+                rsi_l += loss
+                if i == rsi_p:
+                    rsi_g /= rsi_p
+                    rsi_l /= rsi_p
+            else:
+                rsi_g = (rsi_g * (rsi_p - 1) + gain) / rsi_p
+                rsi_l = (rsi_l * (rsi_p - 1) + loss) / rsi_p
+            if i >= rsi_p:
+                rsi_out[i] = 100.0 if rsi_l == 0 else 100.0 - 100.0 / (1.0 + rsi_g / rsi_l)
+        
+        if vid_p > 0:
+            # CMO(9) penceresi: fiyat i'de biten son 9 değişim
+            cmo_g += gain
+            cmo_l += loss
+            if gain != 0.0:
+                cmo_ng += 1
+            if loss != 0.0:
+                cmo_nl += 1
+            if i > cmo_p:
+                od = p[i - cmo_p] - p[i - cmo_p - 1]
+                if od > 0:
+                    cmo_g -= od
+                    cmo_ng -= 1
+                elif od < 0:
+                    cmo_l += od
+                    cmo_nl -= 1
+            if cmo_ng == 0:
+                cmo_g = 0.0
+            if cmo_nl == 0:
+                cmo_l = 0.0
+            if i >= cmo_p:
+                denom = cmo_g + cmo_l
+                cmo_buf[i] = 0.0 if denom == 0 else (cmo_g - cmo_l) / denom * 100
+            # calculate_vidya ile aynı gecikmeli CMO hizası
+            if i >= vid_start:
+                vma += vid_a * abs(cmo_buf[i - vid_lag]) * 0.01 * (x - vma)
+                vid_out[i] = vma
+
+
+def compute_panel(prices: List[float], spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aynı fiyat serisi üzerinde birden çok indikatörü tek geçişte hesapla
+    
+    spec örneği: {'ema': 20, 'sma': 50, 'rsi': 14, 'vidya': 20, 'bollinger': (20, 2.0)}
+    Dönen sözlük aynı anahtarları taşır; değerler ilgili calculate_* çıktısıyla
+    aynı uzunlukta float64 dizilerdir ('bollinger' için upper/middle/lower).
+    Yetersiz veri olan indikatör boş dizi döner.
+    """
+    try:
+        p = _to_float64(prices)
+        n = p.shape[0]
+        if n == 0 or not _validate_prices(p, "Panel"):
+            return {}
+        
+        def enabled(key: str, min_len: int, period: int) -> int:
+            return period if key in spec and period > 0 and n >= min_len else 0
+        
+        ema_p = int(spec.get('ema', 0))
+        sma_p = int(spec.get('sma', 0))
+        rsi_p = int(spec.get('rsi', 0))
+        vid_p = int(spec.get('vidya', 0))
+        bb_p, bb_k = spec.get('bollinger', (0, 2.0))
+        bb_p = int(bb_p)
+        
+        ema_p = enabled('ema', ema_p, ema_p)
+        sma_p = enabled('sma', sma_p, sma_p)
+        rsi_p = enabled('rsi', rsi_p + 1, rsi_p)
+        vid_p = enabled('vidya', max(vid_p, 9) + 1, vid_p)
+        bb_p = enabled('bollinger', bb_p, bb_p)
+        
+        def buf(period: int) -> np.ndarray:
+            return np.full(n, np.nan) if period > 0 else np.empty(0)
+        
+        ema_out, sma_out, rsi_out, vid_out = buf(ema_p), buf(sma_p), buf(rsi_p), buf(vid_p)
+        bb_up, bb_mid, bb_lo = buf(bb_p), buf(bb_p), buf(bb_p)
+        
+        _panel_kernel(
+            p, ema_p, sma_p, rsi_p, vid_p, bb_p, float(bb_k), float(p.mean()),
+            ema_out, sma_out, rsi_out, vid_out, bb_up, bb_mid, bb_lo, buf(vid_p)
+        )
+        
+        empty = np.empty(0)
+        result: Dict[str, Any] = {}
+        if 'ema' in spec:
+            result['ema'] = ema_out[ema_p - 1:] if ema_p else empty
+        if 'sma' in spec:
+            result['sma'] = sma_out[sma_p - 1:] if sma_p else empty
+        if 'rsi' in spec:
+            # calculate_rsi son barın değerini üretmez - aynı hiza korunur
+            result['rsi'] = rsi_out[rsi_p:n - 1] if rsi_p else empty
+        if 'vidya' in spec:
+            result['vidya'] = vid_out[max(vid_p, 9):] if vid_p else empty
+        if 'bollinger' in spec:
+            result['bollinger'] = {
+                'upper': bb_up[bb_p - 1:] if bb_p else empty,
+                'middle': bb_mid[bb_p - 1:] if bb_p else empty,
+                'lower': bb_lo[bb_p - 1:] if bb_p else empty,
+            }
+        return result
+        
+    except Exception as e:
+        logger.error(f"İndikatör paneli hesaplama hatası: {e}")
+        return {}
+
+
+# build_indicator_kernels.py ile AOT derlenmiş kernel'ler varsa JIT sürümlerinin yerine geçer
+try:
+    from ._indicator_kernels_aot import (
+        vidya_kernel as _vidya_kernel,
+        ema_kernel as _ema_kernel,
+        sliding_sum_kernel as _sliding_sum_kernel,
+        rsi_kernel as _rsi_kernel,
+    )
+except ImportError:
+    pass
+
+
+def warmup_kernels():
+    """
+    Canlı yoldaki JIT kernel'lerini önceden derle - ilk tick derleme beklemesin
+    
+    Import anında çalışmaz (script ve testler derleme maliyeti ödemesin); uygulama
+    başlangıcında bir kez çağrılır. AOT modülü yüklüyse çağrılar anında döner.
+    """
+    _vidya_kernel(np.ones(2), np.zeros(1), 0.5, 1, 1.0, np.empty(1))
+    _ema_kernel(np.ones(2), 1, np.empty(2))
+    _sliding_sum_kernel(np.ones(2), 1, np.empty(2))
+    _rsi_kernel(np.ones(2), np.zeros(2), 1)
+
+
 class TechnicalIndicators:
     """Teknik indikatör hesaplama sınıfı"""
     
+    MAX_CACHE_SIZE = 100
+    
     def __init__(self):
-        self.cache = {}
+        # LRU cache: (fiyat verisi parmak izi, period, opt) -> OTTResult
+        self.cache: "OrderedDict[tuple, OTTResult]" = OrderedDict()
+        # Yeniden kullanılabilir çıktı tamponları: (tür, seri uzunluğu, period) -> ndarray
+        self._buf_pool: Dict[Tuple[str, int, int], np.ndarray] = {}
+    
+    def _get_buffer(self, kind: str, n: int, period: int) -> np.ndarray:
+        """(tür, uzunluk, period) için havuzdan tampon al - yoksa ayır"""
+        key = (kind, n, period)
+        buf = self._buf_pool.get(key)
+        if buf is None:
+            # Büyüyen seriler (canlı bar akışı) havuzu şişirmesin
+            if len(self._buf_pool) >= self.MAX_CACHE_SIZE:
+                self._buf_pool.pop(next(iter(self._buf_pool)))
+            buf = np.empty(max(n - period + 1, 0))
+            self._buf_pool[key] = buf
+        return buf
+    
+    def get_ema(self, close_prices: List[float], period: int) -> np.ndarray:
+        """
+        Tampon havuzlu EMA - sık çağrılan iç hatlar için
+        
+        Dönen dizi havuzdaki tampondur; aynı (uzunluk, period) ile bir sonraki
+        çağrıda üzerine yazılır. Saklanacaksa kopyalanmalı.
+        """
+        p = _to_float64(close_prices)
+        if p.shape[0] < period or period <= 0:
+            return np.empty(0)
+        return _calculate_ema_arr(p, period, out=self._get_buffer("ema", p.shape[0], period))
+    
+    def get_sma(self, close_prices: List[float], period: int) -> np.ndarray:
+        """Tampon havuzlu SMA - get_ema ile aynı tampon sahipliği kuralları"""
+        p = _to_float64(close_prices)
+        if p.shape[0] < period or period <= 0:
+            return np.empty(0)
+        return _calculate_sma_arr(p, period, out=self._get_buffer("sma", p.shape[0], period))
     
     def get_ott(self, close_prices: List[float], period: int, opt: float, use_cache: bool = True) -> Optional[OTTResult]:
         """Cache'li OTT hesaplama"""
-        cache_key = f"ott_{len(close_prices)}_{period}_{opt}"
+        prices_array = _to_float64(close_prices)
+        
+        # Anahtar verinin kendisinden türetilir - aynı uzunlukta farklı seriler çakışmaz
+        cache_key = (hash(prices_array.tobytes()), period, opt)
         
-        if use_cache and cache_key in self.cache:
-            return self.cache[cache_key]
+        if use_cache:
+            result = self.cache.get(cache_key)
+            if result is not None:
+                self.cache.move_to_end(cache_key)
+                return result
         
-        result = calculate_ott(close_prices, period, opt, "Cached")
+        result = calculate_ott(prices_array, period, opt, "Cached")
         
         if use_cache and result:
-            # Cache'i temiz tut (en fazla 100 kayıt)
-            if len(self.cache) > 100:
-                # En eski kayıtları sil
-                old_keys = list(self.cache.keys())[:50]
-                for key in old_keys:
-                    del self.cache[key]
+            # En az kullanılan kaydı at - O(1)
+            if len(self.cache) >= self.MAX_CACHE_SIZE:
+                self.cache.popitem(last=False)
             
             self.cache[cache_key] = result
         
@@ -529,6 +1132,7 @@ class TechnicalIndicators:
     def clear_cache(self):
         """Cache'i temizle"""
         self.cache.clear()
+        self._buf_pool.clear()
 
 
 # Global indikatör instance
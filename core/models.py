@@ -2,6 +2,9 @@
 Pydantic modelleri - Trading bot için veri yapıları
 """
 
+import hashlib
+import sys
+from dataclasses import dataclass, field, asdict
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
@@ -94,6 +97,33 @@ class DCAPosition(BaseModel):
     order_id: Optional[str] = None
 
 
+class TradeStatsAggregate(BaseModel):
+    """
+    Trade istatistiklerinin kümülatif toplamları - StorageManager bellekte strateji başına tutar
+    ve her trade'de günceller. get_trade_statistics / calculate_realized_pnl bunları trades.csv'yi okumadan döndürür.
+    """
+    total_trades: int = 0
+    buy_count: int = 0
+    sell_count: int = 0
+    total_volume: float = 0.0
+    total_notional: float = 0.0
+    total_buy_value: float = 0.0   # Alım notional toplamı
+    total_sell_value: float = 0.0  # Satım notional toplamı
+    total_buy_cost: float = 0.0    # Alımların fiyat * miktar toplamı
+    total_buy_quantity: float = 0.0
+    first_trade: Optional[datetime] = None
+    last_trade: Optional[datetime] = None
+    
+    # FIFO alış-satış eşleştirmesinden gerçekleşen kar-zarar
+    realized_pnl: float = 0.0
+    total_profit: float = 0.0
+    total_loss: float = 0.0
+    profit_trades: int = 0
+    loss_trades: int = 0
+    # Eşleşmemiş alımlar: [fiyat, kalan_miktar, notional] (en eski başta)
+    buy_stack: List[List[float]] = Field(default_factory=list)
+
+
 class State(BaseModel):
     """Strateji durumu - state.json'da saklanır"""
     strategy_id: str
@@ -131,6 +161,8 @@ class State(BaseModel):
     total_buy_orders: int = 0
     total_sell_orders: int = 0
     last_update: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # State'e işlenmiş son trade'in history_hash'i - recovery'de hızlı tutarlılık kontrolü
+    trades_hash: Optional[str] = None
     
     # Strateji özel veriler
     custom_data: Dict[str, Any] = Field(default_factory=dict)
@@ -153,6 +185,20 @@ class Trade(BaseModel):
     strategy_specific_data: Dict[str, Any] = Field(default_factory=dict)  # Strategy özel verileri
     cycle_info: Optional[str] = None  # DCA döngü bilgisi (D1-1, D1-2 vb.)
 
+    @property
+    def signed_quantity(self) -> float:
+        """Yönlü miktar: BUY için +quantity, SELL için -quantity"""
+        return self.quantity if self.side is OrderSide.BUY else -self.quantity
+
+    @property
+    def history_hash(self) -> str:
+        """
+        Trade kimliğinin kalıcı özeti - State.trades_hash ile karşılaştırılır
+        Yalnızca trades.csv'ye yazılıp geri okunduğunda değişmeyen alanlar kullanılır.
+        """
+        key = f"{self.timestamp.isoformat()}|{self.order_id or ''}|{self.side.value}|{self.quantity!r}"
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
 
 class Strategy(BaseModel):
     """Ana strateji modeli - strategies.json'da saklanır"""
@@ -251,7 +297,13 @@ class DashboardStats(BaseModel):
     total_profit_today: float
 
 
-class GridSignal(BaseModel):
+# Sinyal nesneleri her tick'te üretilir: pydantic validasyonu yerine hafif
+# dataclass kullanılır (Python 3.10+ üzerinde __slots__ ile)
+_SIGNAL_DATACLASS_OPTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SIGNAL_DATACLASS_OPTS)
+class GridSignal:
     """Grid sinyal bilgisi"""
     should_trade: bool
     side: Optional[OrderSide] = None
@@ -260,16 +312,23 @@ class GridSignal(BaseModel):
     quantity: Optional[float] = None
     delta: Optional[float] = None
     reason: str = ""
+    
+    def dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 
-class TradingSignal(BaseModel):
+@dataclass(**_SIGNAL_DATACLASS_OPTS)
+class TradingSignal:
     """Genel trading sinyal bilgisi - tüm strateji türleri için"""
     should_trade: bool
     side: Optional[OrderSide] = None
     target_price: Optional[float] = None
     quantity: Optional[float] = None
     reason: str = ""
-    strategy_specific_data: Dict[str, Any] = Field(default_factory=dict)
+    strategy_specific_data: Dict[str, Any] = field(default_factory=dict)
+    
+    def dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 
 class OTTResult(BaseModel):
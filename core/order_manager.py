@@ -10,27 +10,91 @@
 # tutarlı ve güvenilir bir emir yönetimi sağlar.
 
 import asyncio
-from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, Optional, List
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+import time
+import traceback
 import uuid
 import os
 
 from .binance import BinanceClient, binance_client
-from .models import OrderSide, Trade, Strategy
+from .models import OrderSide, Trade, Strategy, State
 from .storage import StorageManager
+from .order_wal import PendingOrderWAL
+from .order_poller import OrderStatusPoller, order_status_poller
 from .utils import logger
-from .telegram import telegram_notifier
+from .telegram_queue import queue_notification
+
+# Borsa emir durumları
+_TERMINAL_FILLED = frozenset({'FILLED', 'CLOSED'})
+_TERMINAL_DEAD = frozenset({'CANCELED', 'EXPIRED', 'REJECTED'})
+_OPEN_STATUSES = frozenset({'NEW', 'PARTIALLY_FILLED'})
+# Yerel emir durumları: borsadan sorgulanacaklar / zaman aşımı kontrolüne girenler
+_CHECKABLE = frozenset({'SUBMITTED', 'PENDING_CANCEL'})
+_TIMEOUTABLE = frozenset({'SUBMITTED', 'PENDING_SUBMIT'})
+
+# Kayıtlarda yön ve emir tipi tamsayı kodla tutulur (snapshot/WAL boyutu küçülür)
+_SIDE_CODES = {OrderSide.BUY: 0, OrderSide.SELL: 1}
+_SIDE_BY_CODE = (OrderSide.BUY, OrderSide.SELL)
+_ORDER_TYPE_CODES = {"LIMIT": 0, "MARKET": 1}
+
+
+def _order_side(order: Dict[str, Any]) -> OrderSide:
+    """Kayıttaki emir yönü - eski kayıtlardaki 'side' metni de okunur"""
+    code = order.get('side_code')
+    if code is not None:
+        return _SIDE_BY_CODE[code]
+    return OrderSide(order['side'].lower())
+
+
+# strategy_engine bu modülü import ettiği için ilk kullanımda bir kez yüklenir (döngüsel import)
+_strategy_engine = None
+
+
+def _get_engine():
+    global _strategy_engine
+    if _strategy_engine is None:
+        from .strategy_engine import strategy_engine
+        _strategy_engine = strategy_engine
+    return _strategy_engine
 
 
 class OrderManager:
-    def __init__(self, storage: StorageManager, binance: BinanceClient, strategy_id: str):
+    # Bu kadar mutabakatta bir bellek ile snapshot+WAL karşılaştırılır (DEBUG)
+    DRIFT_CHECK_EVERY = 100
+
+    def __init__(self, storage: StorageManager, binance: BinanceClient, strategy_id: str,
+                 poller: Optional[OrderStatusPoller] = None):
         self.storage = storage
         self.binance = binance
+        # Durum sorguları tüm stratejilerle ortak, sembol başına tek istekle yapılır
+        self.poller = poller or order_status_poller
         self.strategy_id = strategy_id
         self.pending_orders: Dict[str, Any] = {}
         self.lock = asyncio.Lock()
+        # Yalnızca state okuma-güncelleme-yazma bölümünü sıralar; fill'lerin geri kalanı paralel ilerler
+        self._state_lock = asyncio.Lock()
+        # Paralel emir işleme sırasında checkpoint ertelenir (snapshot/truncate arasına kayıt girmesin)
+        self._applying_batch = False
         self.timeout_minutes = 5  # 3 dakika sonra zaman aşımı
         self.strategy: Optional[Strategy] = None # Strateji objesini tutmak için
+        # Emir durum değişiklikleri tam dosya yerine WAL'a tek satır olarak eklenir
+        self.wal = PendingOrderWAL(storage.get_pending_orders_wal_file(strategy_id))
+        # (order_type, side) -> emirden emire değişmeyen alanlar; create_order kopyalayıp doldurur
+        self._order_template_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # State önbelleği - state.json başka yazıcı tarafından değişmedikçe diskten okunmaz
+        self._state_cache: Optional[State] = None
+        self._state_cache_version: Optional[tuple] = None
+        # "D<cycle_number>-" ön eki - döngü numarası değişince yeniden kurulur
+        self._cycle_prefix = "D?-"
+        self._cycle_prefix_number: Optional[int] = None
+        # Bellekten çıkarılmış ama silme kaydı henüz WAL'a eklenmemiş emirler (toplu fsync için)
+        self._deferred_removals: List[str] = []
+        # Süren mutabakat / iptal işlemleri - eşzamanlı tetiklemeler aynı işi bekler (single-flight)
+        self._inflight: Dict[Tuple[str, ...], asyncio.Future] = {}
+        # Bellek/disk tutarlılık kontrolü için mutabakat sayacı (yalnızca DEBUG seviyesinde)
+        self._reconcile_count = 0
 
     async def initialize(self):
         """OrderManager'ı başlatır, bekleyen emirleri yükler ve onarma işlemini tetikler."""
@@ -42,16 +106,20 @@ class OrderManager:
                 logger.error(f"[{self.strategy_id}] OrderManager başlatılamadı: Strateji bulunamadı.")
                 return
 
-            self.pending_orders = await self.storage.load_pending_orders(self.strategy_id)
+            self.pending_orders = await self._load_pending_orders()
+            # Açılışta WAL'da kayıt varsa snapshot'a katla - sonraki açılışın replay süresi sınırlı kalır
+            if self.wal.records_since_checkpoint:
+                await self._checkpoint()
             logger.info(f"[{self.strategy_id}] OrderManager başlatıldı. {len(self.pending_orders)} bekleyen emir yüklendi.")
             logger.info(f"🔧 DEBUG: [{self.strategy_id}] Pending orders: {list(self.pending_orders.keys())}")
         
         # Başlangıçta onarma (reconciliation) işlemini tetikle
         await self.reconcile_orders()
 
-    async def create_order(self, side: OrderSide, quantity: float, price: Optional[float] = None, order_type: str = "LIMIT") -> Optional[Dict[str, Any]]:
+    async def create_order(self, side: OrderSide, quantity: float, price: Optional[float] = None, order_type: str = "LIMIT", z: int = 0) -> Optional[Dict[str, Any]]:
         """
         Yeni bir emir oluşturur. Emri önce diske 'PENDING_SUBMIT' olarak yazar, sonra borsaya gönderir.
+        z: Sinyal anında hesaplanan grid kademesi - fill sırasında trade'e taşınır.
         """
         if not self.strategy:
             logger.error(f"[{self.strategy_id}] Emir oluşturulamadı: Strateji yüklenmemiş.")
@@ -60,26 +128,25 @@ class OrderManager:
         internal_id = str(uuid.uuid4())
 
         # Mevcut state'ten döngü bilgisini al
-        state = await self.storage.load_state(self.strategy_id)
-        cycle_info = f"D{state.cycle_number}-{state.cycle_trade_count + 1}" if state else "D?-?"
+        state = await self._get_state()
+        cycle_info = f"{self._get_cycle_prefix(state)}{state.cycle_trade_count + 1}" if state else "D?-?"
 
-        order_data = {
+        now_ts, now_iso = self._now()
+        order_data = self._order_template(order_type, side).copy()
+        order_data.update({
             "internal_id": internal_id,
-            "strategy_id": self.strategy_id,
-            "order_id": None,
-            "side": side.value,
             "quantity": quantity,
             "price": price,
-            "order_type": order_type,
-            "status": "PENDING_SUBMIT",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": now_iso,
+            "updated_at": now_iso,
+            "created_at_ts": now_ts,  # Epoch saniye - timeout kontrolünde ISO parse yok
+            "updated_at_ts": now_ts,
             "cycle_info": cycle_info,  # DÖNGÜ BİLGİSİ EKLENDİ
-        }
+            "z": z,  # Grid kademesi (sinyalden)
+        })
 
         async with self.lock:
-            self.pending_orders[internal_id] = order_data
-            await self._save_pending_orders()
+            await self._log_transition(internal_id, order_data)
             logger.info(f"[{self.strategy_id}] Yeni emir diske kaydedildi (ID: {internal_id}). Borsaya gönderiliyor...")
 
         try:
@@ -105,25 +172,23 @@ class OrderManager:
 
             if order_result and 'id' in order_result:
                 async with self.lock:
-                    self.pending_orders[internal_id]['status'] = 'SUBMITTED'
-                    self.pending_orders[internal_id]['order_id'] = str(order_result['id'])
-                    self.pending_orders[internal_id]['updated_at'] = datetime.now(timezone.utc).isoformat()
-                    await self._save_pending_orders()
+                    await self._log_transition(internal_id, {
+                        'status': 'SUBMITTED',
+                        'order_id': str(order_result['id']),
+                        **self._updated_fields(),
+                    })
                     logger.info(f"[{self.strategy_id}] Emir borsaya başarıyla gönderildi. Order ID: {order_result['id']}")
                     
-                    # Telegram bildirimi gönder
-                    try:
-                        await telegram_notifier.send_trade_notification(
-                            strategy_name=self.strategy.name,
-                            symbol=self.strategy.symbol.value,
-                            side=side.value,
-                            quantity=quantity,
-                            price=price,
-                            order_id=str(order_result['id']),
-                            order_type=order_type
-                        )
-                    except Exception as e:
-                        logger.error(f"[{self.strategy_id}] Telegram bildirimi gönderilemedi: {e}")
+                    # Telegram bildirimi - arka planda gönderilir, kilidi bekletmez
+                    queue_notification('trade', dict(
+                        strategy_name=self.strategy.name,
+                        symbol=self.strategy.symbol.value,
+                        side=side.value,
+                        quantity=quantity,
+                        price=price,
+                        order_id=str(order_result['id']),
+                        order_type=order_type
+                    ))
                     
                 return self.pending_orders[internal_id]
             else:
@@ -132,21 +197,29 @@ class OrderManager:
         except Exception as e:
             logger.error(f"[{self.strategy_id}] Emir gönderme hatası (ID: {internal_id}): {e}")
             async with self.lock:
-                self.pending_orders[internal_id]['status'] = 'SUBMIT_FAILED'
-                self.pending_orders[internal_id]['updated_at'] = datetime.now(timezone.utc).isoformat()
-                await self._save_pending_orders()
+                await self._log_transition(internal_id, {
+                    'status': 'SUBMIT_FAILED',
+                    **self._updated_fields(),
+                })
             return self.pending_orders[internal_id]
 
     async def reconcile_orders(self):
         """
         Bekleyen tüm emirlerin durumunu borsa ile karşılaştırır ve yerel kaydı günceller.
         Bu fonksiyon periyodik olarak ve bot başladığında çalıştırılmalıdır.
+        Mutabakat zaten sürüyorsa yenisi başlatılmaz, süren turun bitmesi beklenir.
         """
+        await self._single_flight(('reconcile',), self._reconcile_orders)
+
+    async def _reconcile_orders(self):
         logger.info(f"🔧 DEBUG: [{self.strategy_id}] reconcile_orders() çağrıldı")
+        
+        # 1. Kilit altında: kontrol edilecek emirlerin anlık görüntüsünü al
         async with self.lock:
-            # ÖNEMLİ: Pending orders'ı her seferinde yeniden yükle
-            self.pending_orders = await self.storage.load_pending_orders(self.strategy_id)
-            logger.info(f"🔧 DEBUG: [{self.strategy_id}] Pending orders yeniden yüklendi: {len(self.pending_orders)} emir")
+            # Bekleyen emirlerin tek yazıcısı bu OrderManager: bellekteki kayıt esas alınır
+            self._reconcile_count += 1
+            if self._reconcile_count % self.DRIFT_CHECK_EVERY == 0 and logger.isEnabledFor(logging.DEBUG):
+                await self._check_disk_drift()
             
             if not self.pending_orders:
                 logger.info(f"🔧 DEBUG: [{self.strategy_id}] Pending orders boş, reconciliation atlanıyor")
@@ -154,69 +227,118 @@ class OrderManager:
 
             logger.info(f"[{self.strategy_id}] {len(self.pending_orders)} bekleyen emir için mutabakat başlatılıyor...")
             
-            # Durumu kontrol edilecek order_id'leri topla
-            orders_to_check = {
-                p['internal_id']: p['order_id'] 
-                for p in self.pending_orders.values() 
-                if p['status'] in ['SUBMITTED', 'PENDING_CANCEL'] and p['order_id']
-            }
-            
-            logger.info(f"🔧 DEBUG: [{self.strategy_id}] Orders to check: {orders_to_check}")
+            # Durumu kontrol edilecek (internal_id, order_id) çiftlerini topla
+            orders_to_check = [
+                (p['internal_id'], p['order_id'])
+                for p in self.pending_orders.values()
+                if p['status'] in _CHECKABLE and p['order_id']
+            ]
             
-            if not orders_to_check:
-                logger.info(f"[{self.strategy_id}] Durumu kontrol edilecek (SUBMITTED) emir bulunamadı.")
-                return
+        logger.info(f"🔧 DEBUG: [{self.strategy_id}] Orders to check: {orders_to_check}")
+        
+        if not orders_to_check:
+            logger.info(f"[{self.strategy_id}] Durumu kontrol edilecek (SUBMITTED) emir bulunamadı.")
+            return
 
-            try:
-                # Toplu olarak emir durumlarını Borsa'dan al
-                logger.info(f"🔧 DEBUG: [{self.strategy_id}] Binance'den emir durumları alınıyor...")
-                order_statuses = await self.binance.check_order_status_detailed(
-                    self.strategy.symbol.value, 
-                    list(orders_to_check.values())
-                )
-                
-                logger.info(f"🔧 DEBUG: [{self.strategy_id}] Binance'den gelen durumlar: {order_statuses}")
-                status_map = {str(s['order_id']): s for s in order_statuses}
-
-                # Her bir emri işle
-                for internal_id, order_id in orders_to_check.items():
-                    if order_id in status_map:
-                        await self.process_order_update(internal_id, status_map[order_id])
-                    else:
-                        # Borsa'da bulunamayan emirleri kontrol et (belki çoktan doldu ve aradan zaman geçti)
-                        logger.warning(f"[{self.strategy_id}] Emir {order_id} borsa durum sorgusunda bulunamadı. Zaman aşımı kontrolü yapılacak.")
-                        # ÖNEMLİ: Binance'te bulunamayan emirler için hayalet pozisyon oluşturma riski var
-                        # Bu emirleri hemen iptal et veya timeout kontrolüne bırak
-                        pending_order = self.pending_orders.get(internal_id)
-                        if pending_order:
-                            created_at = datetime.fromisoformat(pending_order['created_at'])
-                            age_minutes = (datetime.now(timezone.utc) - created_at).total_seconds() / 60
-                            if age_minutes > 5:  # 5 dakikadan eski emirler için
-                                logger.warning(f"[{self.strategy_id}] Emir {order_id} {age_minutes:.1f} dakikadır Binance'te bulunamıyor. Hayalet pozisyon riski! İptal ediliyor.")
-                                await self.cancel_order(internal_id, reason=f"not_found_on_binance_{age_minutes:.1f}min")
+        # 2. Kilit dışında: ağ isteği sürerken create_order çağrıları bekletilmez
+        order_statuses = None
+        try:
+            # Toplu olarak emir durumlarını Borsa'dan al (ortak sorgulayıcı üzerinden)
+            logger.info(f"🔧 DEBUG: [{self.strategy_id}] Binance'den emir durumları alınıyor...")
+            order_statuses = await self.poller.get_statuses(
+                self.strategy_id,
+                self.strategy.symbol.value, 
+                [order_id for _, order_id in orders_to_check]
+            )
+            logger.info(f"🔧 DEBUG: [{self.strategy_id}] Binance'den gelen durumlar: {order_statuses}")
+        except Exception as e:
+            logger.error(f"[{self.strategy_id}] Emir durumlarını kontrol ederken hata: {e}")
 
-            except Exception as e:
-                logger.error(f"[{self.strategy_id}] Emir durumlarını kontrol ederken hata: {e}")
+        # 3. Kilit altında: sonuçları uygula
+        orders_to_cancel = []
+        if order_statuses is not None:
+            async with self.lock:
+                try:
+                    # order_id -> durum; status burada bir kez büyük harfe çevrilir
+                    status_map = {
+                        (s['order_id'] if isinstance(s['order_id'], str) else str(s['order_id'])):
+                            {**s, 'status': (s.get('status') or '').upper()}
+                        for s in order_statuses
+                    }
+
+                    # Emirler birbirinden bağımsız: trade kaydı, WAL ve bildirim gecikmeleri örtüşsün
+                    self._applying_batch = True
+                    try:
+                        updates = [
+                            (internal_id, self.process_order_update(internal_id, status_map[order_id]))
+                            for internal_id, order_id in orders_to_check
+                            if order_id in status_map
+                        ]
+                        results = await asyncio.gather(*(coro for _, coro in updates), return_exceptions=True)
+                    finally:
+                        self._applying_batch = False
+                    for (internal_id, _), result in zip(updates, results):
+                        if isinstance(result, Exception):
+                            logger.error(f"[{self.strategy_id}] Emir {internal_id} işlenirken hata: {result}")
+
+                    for internal_id, order_id in orders_to_check:
+                        if order_id not in status_map:
+                            # Borsa'da bulunamayan emirleri kontrol et (belki çoktan doldu ve aradan zaman geçti)
+                            logger.warning(f"[{self.strategy_id}] Emir {order_id} borsa durum sorgusunda bulunamadı. Zaman aşımı kontrolü yapılacak.")
+                            # ÖNEMLİ: Binance'te bulunamayan emirler için hayalet pozisyon oluşturma riski var
+                            # Bu emirleri hemen iptal et veya timeout kontrolüne bırak
+                            pending_order = self.pending_orders.get(internal_id)
+                            if pending_order:
+                                age_minutes = (time.time() - self._created_ts(pending_order)) / 60
+                                if age_minutes > 5:  # 5 dakikadan eski emirler için
+                                    logger.warning(f"[{self.strategy_id}] Emir {order_id} {age_minutes:.1f} dakikadır Binance'te bulunamıyor. Hayalet pozisyon riski! İptal ediliyor.")
+                                    orders_to_cancel.append((internal_id, f"not_found_on_binance_{age_minutes:.1f}min"))
+                except Exception as e:
+                    logger.error(f"[{self.strategy_id}] Emir durumlarını işlerken hata: {e}")
+                finally:
+                    await self._flush_deferred_removals()
+                    await self._maybe_checkpoint()
 
-            # Zaman aşımı kontrolü (Borsa'da bulunamayan veya hala açık olanlar için)
-            await self._check_timeouts()
+        # 4. İptaller kilidi kendisi alır - kilit altında çağrılırsa kilitlenme olurdu
+        for internal_id, reason in orders_to_cancel:
+            await self.cancel_order(internal_id, reason=reason)
+
+        # Zaman aşımı kontrolü (Borsa'da bulunamayan veya hala açık olanlar için)
+        await self._check_timeouts()
+
+    async def _single_flight(self, key: Tuple[str, ...], factory):
+        """
+        key için süren işlem varsa onun sonucunu bekler, yoksa factory() ile başlatır.
+        İşlem ayrı bir görevde çalışır; bekleyenlerden birinin iptali işlemi yarıda kesmez.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
 
+            def _done(finished, key=key):
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
 
     async def process_order_update(self, internal_id: str, binance_order_status: Dict[str, Any]):
         """
         Borsadan gelen güncel emir durumunu işler ve gerekli aksiyonları alır.
         NOT: Bu fonksiyon zaten kilitli bir alandan (reconcile_orders) çağrıldığı için
-        tekrar kilit ALMAMALIDIR.
+        tekrar kilit ALMAMALIDIR. Aynı turdaki diğer emirlerle paralel çalışabilir;
+        state güncellemesi self._state_lock ile sıralanır.
+        binance_order_status['status'] çağıran tarafından büyük harfe çevrilmiş olmalıdır.
         """
         pending_order = self.pending_orders.get(internal_id)
         if not pending_order:
             return # Emir zaten işlenmiş olabilir
 
-        status = binance_order_status.get('status', '').upper()
+        status = binance_order_status.get('status', '')
         
         logger.info(f"🔧 DEBUG: [{self.strategy_id}] Processing order {internal_id} with status: {status}")
         
-        if status in ['FILLED', 'CLOSED']:
+        if status in _TERMINAL_FILLED:
             logger.info(f"✅ [{self.strategy_id}] Emir DOLDU: {pending_order['order_id']}")
             
             # ÖNEMLİ: Binance'ten gelen veriyi doğrula
@@ -226,8 +348,7 @@ class OrderManager:
             
             try:
                 # 1. Strateji handler'ını al
-                from .strategy_engine import strategy_engine
-                handler = strategy_engine.get_strategy_handler(self.strategy.strategy_type)
+                handler = _get_engine().get_strategy_handler(self.strategy.strategy_type)
                 if not handler:
                     logger.error(f"[{self.strategy_id}] Strateji handler bulunamadı: {self.strategy.strategy_type}")
                     return
@@ -236,54 +357,64 @@ class OrderManager:
                 trade = self._create_trade_from_fill(pending_order, binance_order_status)
                 logger.info(f"🔧 DEBUG: [{self.strategy_id}] Trade nesnesi oluşturuldu: {trade}")
 
-                # 3. State'i yükle ve güncelle
-                state = await self.storage.load_state(self.strategy_id)
-                logger.info(f"🔧 DEBUG: [{self.strategy_id}] State yüklendi, process_fill çağrılıyor...")
-                await handler.process_fill(self.strategy, state, trade)
-                logger.info(f"🔧 DEBUG: [{self.strategy_id}] process_fill tamamlandı")
-                
-                # 4. Güncellenmiş state'i ve trade'i kaydet
-                await self.storage.save_state(state)
-                await self.storage.save_trade(trade)
+                # 3-4. State'i yükle, güncelle ve kaydet - fill'ler state üzerinde sırayla uygulanır
+                # (save_trade de PnL için state.json'ı okuyup yazdığından aynı kilit altında)
+                async with self._state_lock:
+                    state = await self._get_state()
+                    logger.info(f"🔧 DEBUG: [{self.strategy_id}] State yüklendi, process_fill çağrılıyor...")
+                    try:
+                        await handler.process_fill(self.strategy, state, trade)
+                    except Exception:
+                        # Yarım güncellenmiş önbellek nesnesi bir sonraki fill'e taşınmasın
+                        self._state_cache = None
+                        raise
+                    logger.info(f"🔧 DEBUG: [{self.strategy_id}] process_fill tamamlandı")
+                    await self._save_state(state)
+                    await self.storage.save_trade(trade)
                 logger.info(f"🔧 DEBUG: [{self.strategy_id}] State ve trade kaydedildi")
                 
+                # Trade satırı ve fill'in güncellediği state arka plan yazıcısında bekliyor olabilir -
+                # WAL silme kaydı kalıcı olmadan önce diske yazılmalı (çökmede fill kaybolmasın).
+                # Yalnızca bar/tick kaynaklı state kayıtları ertelenmiş yazımda kalır.
+                await self.storage.flush_trades(self.strategy_id)
+                await self.storage.flush_state(self.strategy_id)
+                
                 # 5. Bekleyen emirlerden temizle
-                if internal_id in self.pending_orders:
-                    del self.pending_orders[internal_id]
-                await self._save_pending_orders()
+                await self._log_transition(internal_id, None)
                 logger.info(f"[{self.strategy_id}] State ve trade kaydedildi. Emir {internal_id} listeden kaldırıldı.")
                 
-                # 6. Telegram bildirimi gönder (emir gerçekleşti)
-                try:
-                    await telegram_notifier.send_fill_notification(
-                        strategy_name=self.strategy.name,
-                        symbol=self.strategy.symbol.value,
-                        side=pending_order['side'],
-                        quantity=trade.quantity,
-                        price=trade.price
-                    )
-                except Exception as e:
-                    logger.error(f"[{self.strategy_id}] Telegram fill bildirimi gönderilemedi: {e}")
+                # 6. Telegram bildirimi (emir gerçekleşti) - arka planda gönderilir
+                queue_notification('fill', dict(
+                    strategy_name=self.strategy.name,
+                    symbol=self.strategy.symbol.value,
+                    side=_order_side(pending_order).value,
+                    quantity=trade.quantity,
+                    price=trade.price
+                ))
                 
             except Exception as e:
                 logger.error(f"❌ [{self.strategy_id}] process_order_update hatası: {e}")
-                import traceback
                 logger.error(f"❌ [{self.strategy_id}] Traceback: {traceback.format_exc()}")
                 return
 
-        elif status in ['CANCELED', 'EXPIRED', 'REJECTED']:
+        elif status in _TERMINAL_DEAD:
             logger.info(f"❌ [{self.strategy_id}] Emir İPTAL EDİLDİ/GEÇERSİZ: {pending_order['order_id']} (Durum: {status})")
-            if internal_id in self.pending_orders:
-                del self.pending_orders[internal_id]
-            await self._save_pending_orders()
+            # İptal idempotent: silme kaydı mutabakat turunun sonunda toplu yazılır
+            self._defer_removal(internal_id)
 
-        elif status in ['NEW', 'PARTIALLY_FILLED']:
+        elif status in _OPEN_STATUSES:
             # Zaman aşımı bu durumları ayrıca ele alacak. Şimdilik sadece log.
             logger.debug(f"⏳ [{self.strategy_id}] Emir hala açık: {pending_order['order_id']} (Durum: {status})")
 
 
     async def cancel_order(self, internal_id: str, reason: str = "manual"):
-        """Bir emri iptal etmek için istek gönderir."""
+        """
+        Bir emri iptal etmek için istek gönderir.
+        Aynı emir için süren bir iptal varsa (ör. zaman aşımı ve mutabakat aynı anda) onu bekler.
+        """
+        await self._single_flight(('cancel', internal_id), lambda: self._cancel_order(internal_id, reason))
+
+    async def _cancel_order(self, internal_id: str, reason: str):
         async with self.lock:
             order = self.pending_orders.get(internal_id)
             if not order or not order.get("order_id"):
@@ -296,15 +427,102 @@ class OrderManager:
             logger.info(f"[{self.strategy_id}] Emir (ID: {order['order_id']}) için iptal isteği gönderiliyor... Sebep: {reason}")
             try:
                 await self.binance.cancel_order(self.strategy.symbol.value, order['order_id'])
-                order['status'] = 'PENDING_CANCEL'
-                order['updated_at'] = datetime.now(timezone.utc).isoformat()
-                await self._save_pending_orders()
+                await self._log_transition(internal_id, {
+                    'status': 'PENDING_CANCEL',
+                    **self._updated_fields(),
+                })
             except Exception as e:
                 logger.error(f"[{self.strategy_id}] Emir iptal edilirken hata oluştu: {e}")
             
-    async def _save_pending_orders(self):
-        """Bekleyen emirlerin güncel halini dosyaya kaydeder."""
-        await self.storage.save_pending_orders(self.strategy_id, self.pending_orders)
+    async def _get_state(self) -> Optional[State]:
+        """
+        Stratejinin state'ini önbellekten döndürür; state.json değişmişse (inode/mtime/boyut)
+        diskten yeniden yükler. Motorun kendi state kayıtları böylece kaçırılmaz.
+        """
+        version = self.storage.get_state_file_version(self.strategy_id)
+        if self._state_cache is None or version is None or version != self._state_cache_version:
+            self._state_cache = await self.storage.load_state(self.strategy_id)
+            self._state_cache_version = version
+        return self._state_cache
+
+    def _get_cycle_prefix(self, state: State) -> str:
+        """Döngü ön ekini döndürür; fill'ler state'i yerinde değiştirebildiği için numara her seferinde karşılaştırılır."""
+        if state.cycle_number != self._cycle_prefix_number:
+            self._cycle_prefix = f"D{state.cycle_number}-"
+            self._cycle_prefix_number = state.cycle_number
+        return self._cycle_prefix
+
+    async def _save_state(self, state: State):
+        """State'i diske yazar ve önbelleği yazılan sürümle günceller."""
+        await self.storage.save_state(state)
+        self._state_cache = state
+        self._state_cache_version = self.storage.get_state_file_version(self.strategy_id)
+
+    async def _load_pending_orders(self) -> Dict[str, Any]:
+        """Snapshot'ı (pending_orders.json) yükler ve WAL kayıtlarını üzerine uygular."""
+        snapshot = await self.storage.load_pending_orders(self.strategy_id)
+        return await self.wal.replay(snapshot)
+
+    async def _check_disk_drift(self):
+        """Diskteki snapshot+WAL ile bellekteki emirleri karşılaştırır; fark varsa uyarır. Kilit altında çağrılmalıdır."""
+        on_disk = await self._load_pending_orders()
+        if on_disk != self.pending_orders:
+            logger.warning(
+                f"[{self.strategy_id}] Bekleyen emirler bellek/disk uyuşmazlığı: "
+                f"bellek={sorted(self.pending_orders)} disk={sorted(on_disk)}"
+            )
+
+    async def _log_transition(self, internal_id: str, fields_changed: Optional[Dict[str, Any]]):
+        """
+        Emir durum geçişini bellekteki kayda uygular ve WAL'a yalnızca değişen alanları ekler.
+        fields_changed None ise emir listeden çıkarılır (silme kaydı).
+        Kilit altında çağrılmalıdır; fsync tamamlanınca döner.
+        """
+        await self._flush_deferred_removals()
+        if fields_changed is None:
+            self.pending_orders.pop(internal_id, None)
+            record = {"op": "delete", "id": internal_id}
+        else:
+            self.pending_orders.setdefault(internal_id, {}).update(fields_changed)
+            record = {"op": "upsert", "id": internal_id, "fields": fields_changed}
+        await self.wal.append(record)
+        await self._maybe_checkpoint()
+
+    def _defer_removal(self, internal_id: str):
+        """
+        Emri bellekten hemen çıkarır, silme kaydını bir sonraki toplu yazıma bırakır.
+        Yalnızca tekrar işlenmesi zararsız geçişler (iptal/süre dolumu) için kullanılır;
+        FILLED silmesi state kaydıyla birlikte hemen kalıcı olmalıdır.
+        """
+        self.pending_orders.pop(internal_id, None)
+        self._deferred_removals.append(internal_id)
+
+    async def _flush_deferred_removals(self):
+        """Biriken silme kayıtlarını tek WAL yazımı / tek fsync ile ekler."""
+        if not self._deferred_removals:
+            return
+        removals, self._deferred_removals = self._deferred_removals, []
+        await self.wal.append_many([{"op": "delete", "id": internal_id} for internal_id in removals])
+        await self._maybe_checkpoint()
+
+    async def _maybe_checkpoint(self):
+        """WAL eşiği aşıldıysa checkpoint al - paralel emir işleme sürerken bekletilir."""
+        if self.wal.needs_checkpoint() and not self._applying_batch:
+            await self._checkpoint()
+
+    async def _checkpoint(self):
+        """Tam snapshot'ı yaz ve WAL'ı sıfırla - snapshot yazılamazsa WAL korunur."""
+        if await self.storage.save_pending_orders(self.strategy_id, self.pending_orders):
+            await self.wal.truncate()
+            logger.info(f"[{self.strategy_id}] Pending orders checkpoint alındı ({len(self.pending_orders)} emir).")
+
+    async def close(self):
+        """Kapanışta bekleyen kayıtları yaz, checkpoint al ve WAL dosyasını kapat."""
+        async with self.lock:
+            await self._flush_deferred_removals()
+            if self.wal.records_since_checkpoint:
+                await self._checkpoint()
+            self.wal.close()
 
     def has_pending_orders(self) -> bool:
         """Bekleyen emir olup olmadığını kontrol eder."""
@@ -335,28 +553,73 @@ class OrderManager:
         return Trade(
             timestamp=binance_fill.get('timestamp', datetime.now(timezone.utc)),
             strategy_id=self.strategy_id,
-            side=OrderSide(pending_order['side'].lower()),
+            side=_order_side(pending_order),
             price=price,
             quantity=filled_qty,
             notional=filled_qty * price,
             order_id=pending_order['order_id'],
             commission=commission_value,
             cycle_info=pending_order.get('cycle_info'),  # None olarak bırak, strateji tipine göre doldurulacak
-            z=0,  # process_fill içinde doldurulacak
+            z=pending_order.get('z') or 0,  # Sinyalden taşınan kademe, yoksa process_fill hesaplar
             gf_before=0.0,  # process_fill içinde doldurulacak
             gf_after=0.0  # process_fill içinde doldurulacak
         )
 
     async def _check_timeouts(self):
         """Zaman aşımına uğramış emirleri kontrol eder ve iptal eder."""
-        now = datetime.now(timezone.utc)
+        now_ts = time.time()
+        timeout_sec = self.timeout_minutes * 60
         orders_to_cancel = []
         for internal_id, order in self.pending_orders.items():
-            if order['status'] in ['SUBMITTED', 'PENDING_SUBMIT']:
-                created_at = datetime.fromisoformat(order['created_at'])
-                age = now - created_at
-                if age > timedelta(minutes=self.timeout_minutes):
-                    orders_to_cancel.append((internal_id, f"timeout_{age.total_seconds()/60:.1f}dk"))
+            if order['status'] in _TIMEOUTABLE:
+                age_sec = now_ts - self._created_ts(order)
+                if age_sec > timeout_sec:
+                    orders_to_cancel.append((internal_id, age_sec))
         
-        for internal_id, reason in orders_to_cancel:
-            await self.cancel_order(internal_id, reason=reason)
+        for internal_id, age_sec in orders_to_cancel:
+            await self.cancel_order(internal_id, reason=f"timeout_{age_sec/60:.1f}dk")
+
+    def _order_template(self, order_type: str, side: OrderSide) -> Dict[str, Any]:
+        """Strateji, emir tipi ve yöne göre sabit emir alanları - ilk kullanımda bir kez kurulur."""
+        key = (order_type, side.value)
+        template = self._order_template_cache.get(key)
+        if template is None:
+            # Bilinen tipler büyük/küçük harften bağımsız kodlanır; bilinmeyen tip metin olarak saklanır
+            type_code = _ORDER_TYPE_CODES.get(order_type.upper())
+            if type_code is not None:
+                type_field = ("order_type_code", type_code)
+            else:
+                type_field = ("order_type", order_type)
+            # Anahtar sırası eski kayıt formatıyla aynı kalsın diye değişken alanlar None ile açılır
+            template = {
+                "internal_id": None,
+                "strategy_id": self.strategy_id,
+                "order_id": None,
+                "side_code": _SIDE_CODES[side],
+                "quantity": None,
+                "price": None,
+                type_field[0]: type_field[1],
+                "status": "PENDING_SUBMIT",
+            }
+            self._order_template_cache[key] = template
+        return template
+
+    @staticmethod
+    def _now() -> Tuple[float, str]:
+        """Tek saat okumasından epoch saniye ve ISO string üret."""
+        now_ts = time.time()
+        return now_ts, datetime.fromtimestamp(now_ts, timezone.utc).isoformat()
+
+    def _updated_fields(self) -> Dict[str, Any]:
+        """Durum geçişlerinde yazılan updated_at / updated_at_ts alanları."""
+        now_ts, now_iso = self._now()
+        return {'updated_at': now_iso, 'updated_at_ts': now_ts}
+
+    @staticmethod
+    def _created_ts(order: Dict[str, Any]) -> float:
+        """Emrin oluşturulma epoch zamanı - eski kayıtlarda ISO'dan bir kez parse edilip saklanır."""
+        created_ts = order.get('created_at_ts')
+        if created_ts is None:
+            created_ts = datetime.fromisoformat(order['created_at']).timestamp()
+            order['created_at_ts'] = created_ts
+        return created_ts
@@ -0,0 +1,81 @@
+"""
+Süreç genelinde emir durum sorgulayıcı
+
+Her OrderManager kendi emirlerini ayrı ayrı sorgularsa aynı sembolde K strateji
+için her mutabakat turunda K ayrı Binance isteği gider. OrderStatusPoller tüm
+stratejilerin bekleyen order_id'lerini sembole göre toplar; tek arka plan
+görevi her turda sembol başına bir openOrders çağrısı yapar
+(BinanceClient.fetch_order_statuses) ve sonuçları emir başına Future'larla
+ilgili OrderManager'lara dağıtır.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from .binance import BinanceClient, binance_client
+from .utils import logger
+
+
+class OrderStatusPoller:
+    """Emir durum sorgularını sembol bazında toplayıp tek istekle cevaplar"""
+
+    def __init__(self, binance: BinanceClient, poll_interval: float = 1.0):
+        self.binance = binance
+        # Aynı turda gelen kayıtların birikmesi için bekleme süresi (saniye)
+        self.poll_interval = poll_interval
+        # symbol -> order_id -> bekleyen Future'lar
+        self._pending: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, strategy_id: str, symbol: str, order_ids: List[str]) -> Dict[str, asyncio.Future]:
+        """Emirleri bir sonraki sorgu turuna ekle - order_id başına Future döner"""
+        loop = asyncio.get_running_loop()
+        by_id = self._pending.setdefault(symbol, {})
+        futures: Dict[str, asyncio.Future] = {}
+        for order_id in order_ids:
+            future = loop.create_future()
+            by_id.setdefault(order_id, []).append(future)
+            futures[order_id] = future
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        logger.debug(f"[{strategy_id}] {len(order_ids)} emir {symbol} durum sorgusuna eklendi")
+        return futures
+
+    async def get_statuses(self, strategy_id: str, symbol: str, order_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Emirlerin detaylı durumlarını al - check_order_status_detailed ile aynı format
+        Borsada bulunamayan emirler listede yer almaz.
+        """
+        if not order_ids:
+            return []
+        futures = self.register(strategy_id, symbol, order_ids)
+        results = await asyncio.gather(*futures.values())
+        return [result for result in results if result is not None]
+
+    async def _run(self):
+        """Bekleyen kayıt kalmayana kadar sembol başına toplu sorgu turları çalıştır"""
+        while self._pending:
+            await asyncio.sleep(self.poll_interval)
+
+            batch, self._pending = self._pending, {}
+            for symbol, by_id in batch.items():
+                try:
+                    statuses = await self.binance.fetch_order_statuses(symbol, list(by_id.keys()))
+                except Exception as e:
+                    logger.error(f"{symbol} emir durumları alınamadı: {e}")
+                    for futures in by_id.values():
+                        for future in futures:
+                            if not future.done():
+                                future.set_exception(e)
+                    continue
+
+                for order_id, futures in by_id.items():
+                    status = statuses.get(order_id)
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(status)
+
+
+# Global emir durum sorgulayıcı
+order_status_poller = OrderStatusPoller(binance_client)
@@ -0,0 +1,189 @@
+"""
+Bekleyen emirler için append-only Write-Ahead Log
+
+Her emir durumu değişikliği, tüm pending_orders.json dosyasını yeniden yazmak
+yerine strateji dizinindeki pending_orders.wal dosyasına tek satırlık bir kayıt
+olarak eklenir:
+
+    {"op": "upsert", "id": <internal_id>, "fields": {...}}
+    {"op": "delete", "id": <internal_id>}
+
+Tüm stratejilerin kayıtları süreç genelindeki tek bir yazıcıdan (wal_writer)
+geçer. Yazıcı kuyruğu boşaltır, her dosyaya biriken kayıtları tek os.write ile
+ekler ve dosya başına bir kez fsync yapar (group commit). Bekleyenlerin hepsi
+aynı fsync ile onaylanır.
+
+Kurtarma: pending_orders.json (snapshot) yüklenir, WAL kayıtları sırayla üzerine
+uygulanır. Checkpoint snapshot'ı yeniden yazıp WAL'ı sıfırlar.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import aiofiles
+except ImportError:
+    print("aiofiles not installed. Install with: pip install aiofiles")
+    aiofiles = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson yoksa stdlib json ile aynı satır formatı üretilir
+    orjson = None
+
+from .utils import logger
+
+
+def _dumps_record(record: Dict[str, Any]) -> bytes:
+    """WAL kaydını tek satırlık UTF-8 JSON'a çevir"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+
+def _loads_record(line: str) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+class PendingOrderWAL:
+    """Tek stratejinin pending-orders WAL dosyası"""
+
+    # Bu kadar kayıttan sonra snapshot yazılıp WAL sıfırlanır
+    CHECKPOINT_EVERY = 500
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self.records_since_checkpoint = 0
+
+    def _ensure_open(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(str(self.path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    async def replay(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Snapshot üzerine WAL kayıtlarını uygula ve sonucu döndür"""
+        if not self.path.exists():
+            self.records_since_checkpoint = 0
+            return snapshot
+
+        async with aiofiles.open(self.path, 'r', encoding='utf-8') as f:
+            content = await f.read()
+
+        count = 0
+        for line in content.splitlines():
+            if not line:
+                continue
+            try:
+                record = _loads_record(line)
+            except ValueError:
+                # Çökme anında yarım kalmış son satır - onaylanmamış kayıt, yok say
+                logger.warning(f"WAL kaydı okunamadı, sonrası atlanıyor: {self.path}")
+                break
+
+            internal_id = record.get("id")
+            if record.get("op") == "delete":
+                snapshot.pop(internal_id, None)
+            else:
+                snapshot.setdefault(internal_id, {}).update(record.get("fields") or {})
+            count += 1
+
+        self.records_since_checkpoint = count
+        return snapshot
+
+    async def append(self, record: Dict[str, Any]):
+        """Kaydı WAL'a ekle - fsync ile kalıcı olana kadar bekler"""
+        await wal_writer.submit(self, _dumps_record(record))
+        self.records_since_checkpoint += 1
+
+    async def append_many(self, records: List[Dict[str, Any]]):
+        """Birden çok kaydı tek parça olarak ekle - tek write, tek fsync"""
+        await wal_writer.submit(self, b"".join(_dumps_record(record) for record in records))
+        self.records_since_checkpoint += len(records)
+
+    def needs_checkpoint(self) -> bool:
+        return self.records_since_checkpoint >= self.CHECKPOINT_EVERY
+
+    async def truncate(self):
+        """Checkpoint sonrası WAL'ı sıfırla - snapshot zaten kalıcı olmalı"""
+        fd = self._ensure_open()
+        await asyncio.to_thread(self._truncate_sync, fd)
+        self.records_since_checkpoint = 0
+
+    @staticmethod
+    def _truncate_sync(fd: int):
+        os.ftruncate(fd, 0)
+        os.fsync(fd)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class WALWriter:
+    """Süreç genelinde tek WAL yazıcısı - kayıtları toplayıp dosya başına tek fsync yapar"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._flusher())
+
+    async def submit(self, wal: PendingOrderWAL, data: bytes):
+        """Kaydı kuyruğa koy ve ait olduğu grup fsync'lenene kadar bekle"""
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((wal, data, future))
+        await future
+
+    async def _flusher(self):
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # Dosya bazında grupla: her WAL'a tek write + tek fsync
+            groups: Dict[int, Tuple[PendingOrderWAL, List[bytes]]] = {}
+            for wal, data, _ in batch:
+                groups.setdefault(id(wal), (wal, []))[1].append(data)
+
+            error: Optional[Exception] = None
+            try:
+                writes = [(wal._ensure_open(), b"".join(chunks)) for wal, chunks in groups.values()]
+                await asyncio.to_thread(self._write_and_sync, writes)
+            except Exception as e:
+                logger.error(f"WAL yazma hatası: {e}")
+                error = e
+
+            for _, _, future in batch:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    @staticmethod
+    def _write_and_sync(writes: List[Tuple[int, bytes]]):
+        for fd, data in writes:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        for fd, _ in writes:
+            os.fsync(fd)
+
+
+# Global WAL yazıcısı
+wal_writer = WALWriter()
@@ -4,12 +4,14 @@
 
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
 
 def is_frozen():
     """PyInstaller ile paketlenmiş mi kontrol et"""
     return getattr(sys, 'frozen', False)
 
+@lru_cache(maxsize=1)
 def get_base_path():
     """Ana dizin yolunu al"""
     if is_frozen():
@@ -19,18 +21,21 @@ def get_base_path():
         # Normal Python'dan çalışıyorsa, proje ana dizini
         return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+@lru_cache(maxsize=1)
 def get_logs_dir():
-    """Logs dizini yolunu al"""
+    """Logs dizini yolunu al - dizin ilk çağrıda bir kez oluşturulur"""
     logs_path = os.path.join(get_base_path(), "logs")
     Path(logs_path).mkdir(exist_ok=True)  # Yoksa oluştur
     return logs_path
 
+@lru_cache(maxsize=1)
 def get_data_dir():
-    """Data dizini yolunu al"""
+    """Data dizini yolunu al - dizin ilk çağrıda bir kez oluşturulur"""
     data_path = os.path.join(get_base_path(), "data")
     Path(data_path).mkdir(exist_ok=True)  # Yoksa oluştur
     return data_path
 
+@lru_cache(maxsize=1)
 def get_templates_dir():
     """Templates dizini yolunu al"""
     if is_frozen():
@@ -40,6 +45,7 @@ def get_templates_dir():
         # Normal çalışma için mevcut templates dizini
         return os.path.join(get_base_path(), "templates")
 
+@lru_cache(maxsize=1)
 def get_static_dir():
     """Static dizini yolunu al"""
     if is_frozen():
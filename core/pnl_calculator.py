@@ -13,12 +13,155 @@
 # ÇÖZÜM: Short pozisyon formülünde abs() kullanarak doğru işaret elde ettik
 # Short pozisyonda: fiyat artarsa zarar (-), fiyat düşerse kar (+)
 
-from typing import Dict, Optional, Tuple
-from .models import State, Trade, OrderSide
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .models import State, Trade
 # from .utils import logger
 import logging
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+except ImportError:
+    # numba yoksa kernel saf Python olarak çalışır
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# initialize_state_pnl için PnL alanları ve varsayılanları (State'te de aynı varsayılanlar tanımlı)
+_PNL_DEFAULTS = (
+    ('initial_balance', 1000.0),
+    ('cash_balance', 1000.0),
+    ('realized_pnl', 0.0),
+    ('position_quantity', 0.0),
+    ('position_avg_cost', None),
+    ('position_side', None),
+)
+_MISSING = object()
+
+# Kernel'de None ortalama maliyet NaN ile, "yön değişmedi" NaN yön koduyla taşınır
+_SIDE_BY_CODE = {1.0: "long", -1.0: "short", 0.0: None}
+
+
+@njit('UniTuple(float64, 4)(float64, float64, float64, float64)', cache=True)
+def _fill_kernel(old_qty, old_avg, trade_qty, trade_price):
+    """
+    Fill sonrası pozisyon aritmetiği (State'ten bağımsız)
+    
+    old_avg: NaN = ortalama maliyet yok (None)
+    Returns: (yeni_miktar, yeni_ortalama_maliyet, realized_pnl_değişimi, yön_kodu)
+             yön_kodu: 1 long, -1 short, 0 pozisyon yok, NaN değişmedi
+    """
+    nan = np.nan
+    has_avg = old_avg == old_avg and old_avg != 0.0
+    # Büyüklükler bir kez hesaplanır
+    abs_old = abs(old_qty)
+    abs_trade = abs(trade_qty)
+    
+    if old_qty == 0.0:
+        # Yeni pozisyon açılıyor
+        return trade_qty, trade_price, 0.0, 1.0 if trade_qty > 0 else -1.0
+    
+    if (old_qty > 0 and trade_qty > 0) or (old_qty < 0 and trade_qty < 0):
+        # Pozisyon büyütülüyor (aynı yön) - ağırlıklı ortalama maliyet
+        new_qty = old_qty + trade_qty
+        if has_avg:
+            # Artımlı güncelleme: toplam maliyetler biriktirilmez, uzun DCA
+            # geçmişinde yuvarlama hatası büyümez
+            # (aynı yönde |yeni_miktar| = |eski| + |trade|)
+            new_avg = old_avg + (trade_price - old_avg) * abs_trade / (abs_old + abs_trade)
+        else:
+            new_avg = trade_price
+        return new_qty, new_avg, 0.0, nan
+    
+    # Pozisyon kapatılıyor (ters yön) - PnL gerçekleşiyor
+    close_quantity = min(abs_trade, abs_old)
+    realized = 0.0
+    if has_avg:
+        # Long kapanışta (fiyat - maliyet), short kapanışta (maliyet - fiyat): eski yönün işaretiyle çarp
+        sign = 1.0 if old_qty > 0 else -1.0
+        realized = (trade_price - old_avg) * sign * close_quantity
+    
+    remaining_old = abs_old - close_quantity
+    remaining_new = abs_trade - close_quantity
+    if remaining_old > 0:
+        # Kısmi kapatma - ortalama maliyet ve yön değişmez
+        return (remaining_old if old_qty > 0 else -remaining_old), old_avg, realized, nan
+    if remaining_new > 0:
+        # Pozisyon tersine döndü - yeni pozisyonun maliyeti trade fiyatı
+        new_qty = remaining_new if trade_qty > 0 else -remaining_new
+        return new_qty, trade_price, realized, 1.0 if new_qty > 0 else -1.0
+    # Pozisyon tamamen kapandı
+    return 0.0, nan, realized, 0.0
+
+
+# calculate_unrealized_pnl sınır değerleri
+_MAX_SAFE_VALUE = 1e15  # 1 katrilyon - çok büyük değerler için limit
+_MIN_SAFE_VALUE = 1e-15  # Çok küçük değerler için limit
+_MAX_PNL_PCT = 10000.0  # %10000'den fazla mantıksız
+
+# _unrealized_kernel kırpma bayrakları (uyarı logları Python tarafında yazılır)
+_CLAMP_POSITION_VALUE = 1
+_CLAMP_UNREALIZED = 2
+_CLAMP_PCT = 4
+_CLAMP_TOTAL = 8
+
+
+@njit('UniTuple(float64, 5)(float64, float64, float64, float64)', cache=True)
+def _unrealized_kernel(position_qty, avg_cost, current_price, cash_balance):
+    """
+    Gerçekleşmemiş kar/zarar aritmetiği (State'ten bağımsız)
+    
+    Girdilerin sonlu ve _MAX_SAFE_VALUE içinde olduğu çağıran tarafta kontrol edilir.
+    Returns: (unrealized_pnl, unrealized_pnl_pct, position_value, total_balance, kırpma_bayrakları)
+    """
+    clamped = 0
+    abs_qty = abs(position_qty)
+    
+    # Pozisyon değeri (her zaman pozitif) - float çarpımı taşmaz, sınırla kırpılır
+    position_value = abs_qty * current_price
+    if position_value > _MAX_SAFE_VALUE:
+        position_value = _MAX_SAFE_VALUE
+        clamped |= _CLAMP_POSITION_VALUE
+    
+    # Gerçekleşmemiş kar/zarar - işaretli miktar yönü taşır:
+    # short'ta (fiyat - maliyet) * (-|miktar|) = (maliyet - fiyat) * |miktar|
+    unrealized_pnl = (current_price - avg_cost) * position_qty
+    if abs(unrealized_pnl) > _MAX_SAFE_VALUE:
+        unrealized_pnl = _MAX_SAFE_VALUE if unrealized_pnl > 0 else -_MAX_SAFE_VALUE
+        clamped |= _CLAMP_UNREALIZED
+    
+    # Yüzdelik hesaplama (yatırım tutarına göre)
+    invested_amount = abs_qty * avg_cost
+    if invested_amount > _MIN_SAFE_VALUE:  # Sıfıra bölme önleme
+        unrealized_pnl_pct = unrealized_pnl / invested_amount * 100
+        if abs(unrealized_pnl_pct) > _MAX_PNL_PCT:
+            unrealized_pnl_pct = _MAX_PNL_PCT if unrealized_pnl_pct > 0 else -_MAX_PNL_PCT
+            clamped |= _CLAMP_PCT
+    else:
+        unrealized_pnl_pct = 0.0
+    
+    # Toplam bakiye = Nakit bakiye + Gerçekleşmemiş kar/zarar
+    total_balance = cash_balance + unrealized_pnl
+    if abs(total_balance) > _MAX_SAFE_VALUE:
+        total_balance = _MAX_SAFE_VALUE if total_balance > 0 else -_MAX_SAFE_VALUE
+        clamped |= _CLAMP_TOTAL
+    
+    return unrealized_pnl, unrealized_pnl_pct, position_value, total_balance, float(clamped)
+
+
+# build_pnl_kernels.py ile AOT derlenmiş kernel'ler varsa JIT sürümlerinin yerine geçer
+try:
+    from ._pnl_kernels_aot import (
+        fill_kernel as _fill_kernel,
+        unrealized_kernel as _unrealized_kernel,
+    )
+except ImportError:
+    pass
+
 
 class PnLCalculator:
     """
@@ -46,18 +189,9 @@ class PnLCalculator:
         Mevcut state'ler için migration yapılır
         """
         # Yeni alanları initialize et
-        if not hasattr(state, 'initial_balance'):
-            state.initial_balance = 1000.0
-        if not hasattr(state, 'cash_balance'):
-            state.cash_balance = 1000.0
-        if not hasattr(state, 'realized_pnl'):
-            state.realized_pnl = 0.0
-        if not hasattr(state, 'position_quantity'):
-            state.position_quantity = 0.0
-        if not hasattr(state, 'position_avg_cost'):
-            state.position_avg_cost = None
-        if not hasattr(state, 'position_side'):
-            state.position_side = None
+        for name, default in _PNL_DEFAULTS:
+            if getattr(state, name, _MISSING) is _MISSING:
+                setattr(state, name, default)
             
         # Legacy alanlardan migration yap
         if hasattr(state, 'total_quantity') and state.total_quantity > 0:
@@ -77,193 +211,107 @@ class PnLCalculator:
         Returns:
             Dict with 'realized_pnl_change', 'cash_balance_change', 'new_avg_cost'
         """
-        old_position_quantity = state.position_quantity
-        old_position_avg_cost = state.position_avg_cost
+        old_avg_cost = state.position_avg_cost
         
         # Trade miktarını belirle (BUY = +, SELL = -)
-        trade_quantity = trade.quantity if trade.side == OrderSide.BUY else -trade.quantity
+        trade_quantity = trade.signed_quantity
         
-        realized_pnl_change = 0.0
-        cash_balance_change = 0.0  # YENİ MANTIK: Sadece realized PnL'de değişir
+        new_quantity, new_avg_cost, realized_pnl_change, side_code = _fill_kernel(
+            float(state.position_quantity),
+            np.nan if old_avg_cost is None else float(old_avg_cost),
+            float(trade_quantity),
+            float(trade.price),
+        )
         
-        # Pozisyon durumuna göre işlem yap
-        if old_position_quantity == 0:
-            # Yeni pozisyon açılıyor
-            state.position_quantity = trade_quantity
-            state.position_avg_cost = trade.price
-            state.position_side = "long" if trade_quantity > 0 else "short"
-            
-            # YENİ MANTIK: Pozisyon açarken bakiye değişmez
-            cash_balance_change = 0.0
-            
-        elif (old_position_quantity > 0 and trade_quantity > 0) or (old_position_quantity < 0 and trade_quantity < 0):
-            # Pozisyon büyütülüyor (aynı yön) - POZISYON ARTIRIMI
-            new_total_quantity = old_position_quantity + trade_quantity
-            
-            if old_position_avg_cost:
-                # Ağırlıklı ortalama maliyet hesapla
-                old_total_cost = abs(old_position_quantity) * old_position_avg_cost
-                new_trade_cost = abs(trade_quantity) * trade.price
-                new_total_cost = old_total_cost + new_trade_cost
-                state.position_avg_cost = new_total_cost / abs(new_total_quantity)
-            else:
-                state.position_avg_cost = trade.price
-            
-            state.position_quantity = new_total_quantity
-            
-            # YENİ MANTIK: Pozisyon artırımında bakiye değişmez
-            cash_balance_change = 0.0
-            
-        else:
-            # Pozisyon kapatılıyor (ters yön) - POZISYON AZALTIMI - PnL gerçekleşiyor
-            close_quantity = min(abs(trade_quantity), abs(old_position_quantity))
-            
-            if old_position_avg_cost:
-                # Gerçekleşen kar/zarar hesapla
-                if old_position_quantity > 0:  # Long pozisyon kapatılıyor
-                    realized_pnl_change = (trade.price - old_position_avg_cost) * close_quantity
-                else:  # Short pozisyon kapatılıyor
-                    realized_pnl_change = (old_position_avg_cost - trade.price) * close_quantity
-            
-            # Pozisyon miktarını güncelle
-            remaining_old_position = abs(old_position_quantity) - close_quantity
-            remaining_new_position = abs(trade_quantity) - close_quantity
-            
-            if remaining_old_position > 0:
-                # Kısmi kapatma - eski pozisyon devam ediyor
-                state.position_quantity = remaining_old_position if old_position_quantity > 0 else -remaining_old_position
-                # YENİ MANTIK: Ortalama maliyet DEĞİŞMEZ (aynı kalır)
-            elif remaining_new_position > 0:
-                # Pozisyon tersine döndü - bu durumda yeni pozisyon açılıyor
-                state.position_quantity = remaining_new_position if trade_quantity > 0 else -remaining_new_position
-                state.position_avg_cost = trade.price  # Yeni pozisyon için yeni ortalama maliyet
-                state.position_side = "long" if state.position_quantity > 0 else "short"
-            else:
-                # Pozisyon tamamen kapandı
-                state.position_quantity = 0.0
-                state.position_avg_cost = None
-                state.position_side = None
-            
-            # YENİ MANTIK: Realized PnL bakiyeye eklenir
-            cash_balance_change = realized_pnl_change
+        state.position_quantity = new_quantity
+        # Kısmi kapatmada ortalama maliyet olduğu gibi (None dahil) korunur
+        position_avg_cost = None if new_avg_cost != new_avg_cost else new_avg_cost
+        state.position_avg_cost = position_avg_cost
+        if side_code == side_code:
+            state.position_side = _SIDE_BY_CODE[side_code]
+        
+        # YENİ MANTIK: Bakiye sadece gerçekleşen kar/zarar ile değişir
+        # (pozisyon açma/artırmada realized 0 olduğundan değişim de 0)
+        cash_balance_change = realized_pnl_change
         
         # State'i güncelle
         state.realized_pnl += realized_pnl_change
-        state.cash_balance += cash_balance_change
-        
-        # Güvenli side değeri al
-        side_value = trade.side.value if hasattr(trade.side, 'value') else str(trade.side)
-        
-        # Güvenli position_avg_cost değeri al
-        avg_cost_value = state.position_avg_cost if state.position_avg_cost is not None else 0.0
+        cash_balance = state.cash_balance + cash_balance_change
+        state.cash_balance = cash_balance
+        # Recovery hızlı yolu: state'in hangi trade'e kadar güncel olduğunu işaretle
+        state.trades_hash = trade.history_hash
         
-        logger.info(f"PnL güncellendi - Strategy: {state.strategy_id}, "
-                   f"Trade: {side_value} {trade.quantity:.6f} @ ${trade.price:.6f}, "
-                   f"Realized PnL change: ${realized_pnl_change:.2f}, "
-                   f"New balance: ${state.cash_balance:.2f}, "
-                   f"New position: {state.position_quantity:.6f} @ ${avg_cost_value:.6f}")
+        if logger.isEnabledFor(logging.INFO):
+            # Güvenli position_avg_cost değeri al
+            avg_cost_value = position_avg_cost if position_avg_cost is not None else 0.0
+            # Biçimlendirme logging'e bırakılır - yalnızca bir handler kaydı işlerse yapılır
+            logger.info("PnL güncellendi - Strategy: %s, Trade: %s %.6f @ $%.6f, "
+                        "Realized PnL change: $%.2f, New balance: $%.2f, New position: %.6f @ $%.6f",
+                        state.strategy_id, trade.side.value, trade.quantity, trade.price,
+                        realized_pnl_change, cash_balance, new_quantity, avg_cost_value)
         
         return {
             'realized_pnl_change': realized_pnl_change,
             'cash_balance_change': cash_balance_change,
-            'new_avg_cost': state.position_avg_cost
+            'new_avg_cost': position_avg_cost
         }
     
     def calculate_unrealized_pnl(self, state: State, current_price: float) -> Dict[str, float]:
         """
         Gerçekleşmemiş kar/zarar hesapla - OVERFLOW KORUMALI VERSİYON
         
-        FORMÜL:
-        - Long pozisyon: (şimdiki_fiyat - ortalama_maliyet) * pozisyon_miktarı
-        - Short pozisyon: (ortalama_maliyet - şimdiki_fiyat) * pozisyon_miktarı
+        FORMÜL: (şimdiki_fiyat - ortalama_maliyet) * işaretli_pozisyon_miktarı
+        - Long pozisyon (+miktar): fiyat artarsa kar
+        - Short pozisyon (-miktar): fiyat artarsa zarar
         
         Returns:
             Dict with 'unrealized_pnl', 'unrealized_pnl_pct', 'position_value', 'total_balance'
         """
+        # State alanları bir kez okunur
+        position_quantity = state.position_quantity
+        position_avg_cost = state.position_avg_cost
+        cash_balance = state.cash_balance
         try:
             # Güvenlik kontrolleri - overflow önleme
-            if state.position_quantity == 0 or not state.position_avg_cost:
+            if position_quantity == 0 or not position_avg_cost:
                 return {
                     'unrealized_pnl': 0.0,
                     'unrealized_pnl_pct': 0.0,
                     'position_value': 0.0,
-                    'total_balance': state.cash_balance
+                    'total_balance': cash_balance
                 }
             
-            # Değerleri güvenli aralıklarda kontrol et
-            max_safe_value = 1e15  # 1 katrilyon - çok büyük değerler için limit
-            min_safe_value = 1e-15  # Çok küçük değerler için limit
-            
             # Pozisyon miktarı ve fiyat kontrolleri
-            position_qty = float(state.position_quantity)
-            avg_cost = float(state.position_avg_cost)
+            position_qty = float(position_quantity)
+            avg_cost = float(position_avg_cost)
             current_price_float = float(current_price)
             
-            # Overflow kontrolü
-            if (abs(position_qty) > max_safe_value or 
-                abs(avg_cost) > max_safe_value or 
-                abs(current_price_float) > max_safe_value):
+            # Overflow / NaN kontrolü - sonraki aritmetik bu aralıkta taşamaz
+            if not (math.isfinite(position_qty) and math.isfinite(avg_cost) and math.isfinite(current_price_float)) or (
+                    abs(position_qty) > _MAX_SAFE_VALUE or
+                    abs(avg_cost) > _MAX_SAFE_VALUE or
+                    abs(current_price_float) > _MAX_SAFE_VALUE):
                 logger.warning(f"Overflow riski: position_qty={position_qty}, avg_cost={avg_cost}, current_price={current_price_float}")
                 return {
                     'unrealized_pnl': 0.0,
                     'unrealized_pnl_pct': 0.0,
                     'position_value': 0.0,
-                    'total_balance': state.cash_balance
+                    'total_balance': cash_balance
                 }
             
-            # Pozisyon değeri (her zaman pozitif) - overflow korumalı
-            try:
-                position_value = abs(position_qty) * current_price_float
-                if position_value > max_safe_value:
-                    position_value = max_safe_value
-                    logger.warning(f"Position value overflow korundu: {position_value}")
-            except (OverflowError, ValueError):
-                position_value = 0.0
-                logger.error("Position value hesaplama hatası")
+            unrealized_pnl, unrealized_pnl_pct, position_value, total_balance, clamped = _unrealized_kernel(
+                position_qty, avg_cost, current_price_float, float(cash_balance))
             
-            # Gerçekleşmemiş kar/zarar - overflow korumalı
-            try:
-                if position_qty > 0:  # Long pozisyon
-                    unrealized_pnl = (current_price_float - avg_cost) * position_qty
-                elif position_qty < 0:  # Short pozisyon (negatif quantity)
-                    # Short için: (ortalama_maliyet - şimdiki_fiyat) * mutlak_pozisyon_miktarı
-                    unrealized_pnl = (avg_cost - current_price_float) * abs(position_qty)
-                else:
-                    unrealized_pnl = 0.0
-                
-                # Overflow kontrolü
-                if abs(unrealized_pnl) > max_safe_value:
-                    unrealized_pnl = max_safe_value if unrealized_pnl > 0 else -max_safe_value
+            if clamped:
+                flags = int(clamped)
+                if flags & _CLAMP_POSITION_VALUE:
+                    logger.warning(f"Position value overflow korundu: {position_value}")
+                if flags & _CLAMP_UNREALIZED:
                     logger.warning(f"Unrealized PnL overflow korundu: {unrealized_pnl}")
-                    
-            except (OverflowError, ValueError):
-                unrealized_pnl = 0.0
-                logger.error("Unrealized PnL hesaplama hatası")
-            
-            # Yüzdelik hesaplama (yatırım tutarına göre) - overflow korumalı
-            try:
-                invested_amount = abs(position_qty) * avg_cost
-                if invested_amount > min_safe_value:  # Sıfıra bölme önleme
-                    unrealized_pnl_pct = (unrealized_pnl / invested_amount * 100)
-                    # Yüzde değeri makul aralıkta tut
-                    if abs(unrealized_pnl_pct) > 10000:  # %10000'den fazla mantıksız
-                        unrealized_pnl_pct = 10000 if unrealized_pnl_pct > 0 else -10000
-                        logger.warning(f"Unrealized PnL % overflow korundu: {unrealized_pnl_pct}")
-                else:
-                    unrealized_pnl_pct = 0.0
-            except (OverflowError, ValueError, ZeroDivisionError):
-                unrealized_pnl_pct = 0.0
-                logger.error("Unrealized PnL % hesaplama hatası")
-            
-            # Toplam bakiye = Nakit bakiye + Gerçekleşmemiş kar/zarar - overflow korumalı
-            try:
-                total_balance = state.cash_balance + unrealized_pnl
-                if abs(total_balance) > max_safe_value:
-                    total_balance = max_safe_value if total_balance > 0 else -max_safe_value
+                if flags & _CLAMP_PCT:
+                    logger.warning(f"Unrealized PnL % overflow korundu: {unrealized_pnl_pct}")
+                if flags & _CLAMP_TOTAL:
                     logger.warning(f"Total balance overflow korundu: {total_balance}")
-            except (OverflowError, ValueError):
-                total_balance = state.cash_balance
-                logger.error("Total balance hesaplama hatası")
             
             return {
                 'unrealized_pnl': unrealized_pnl,
@@ -278,9 +326,90 @@ class PnLCalculator:
                 'unrealized_pnl': 0.0,
                 'unrealized_pnl_pct': 0.0,
                 'position_value': 0.0,
-                'total_balance': state.cash_balance
+                'total_balance': cash_balance
             }
     
+    def calculate_unrealized_pnl_batch(self, qty: np.ndarray, avg_cost: np.ndarray,
+                                       price: np.ndarray, cash: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Birden çok strateji için gerçekleşmemiş kar/zarar - calculate_unrealized_pnl ile aynı kurallar
+        
+        Girdiler strateji başına bir eleman içeren float64 dizileridir (alan başına bir dizi).
+        Pozisyonu olmayan stratejiler için avg_cost 0 veya NaN verilebilir.
+        
+        Returns:
+            Dict with 'unrealized_pnl', 'unrealized_pnl_pct', 'position_value', 'total_balance' (diziler)
+        """
+        qty = np.asarray(qty, dtype=np.float64)
+        avg_cost = np.asarray(avg_cost, dtype=np.float64)
+        price = np.asarray(price, dtype=np.float64)
+        cash = np.asarray(cash, dtype=np.float64)
+        
+        abs_qty = np.abs(qty)
+        # Pozisyonu olmayan veya overflow / NaN riski taşıyan satırlar sıfır döner
+        with np.errstate(invalid='ignore'):
+            active = (
+                (qty != 0) & (avg_cost != 0)
+                & np.isfinite(qty) & np.isfinite(avg_cost) & np.isfinite(price)
+                & (abs_qty <= _MAX_SAFE_VALUE) & (np.abs(avg_cost) <= _MAX_SAFE_VALUE)
+                & (np.abs(price) <= _MAX_SAFE_VALUE)
+            )
+        safe_avg = np.where(active, avg_cost, 0.0)
+        safe_price = np.where(active, price, 0.0)
+        safe_qty = np.where(active, qty, 0.0)
+        abs_safe_qty = np.abs(safe_qty)
+        
+        position_value = np.minimum(abs_safe_qty * safe_price, _MAX_SAFE_VALUE)
+        # İşaretli miktar yönü taşır: short için (fiyat - maliyet) * (-miktar)
+        unrealized_pnl = np.clip((safe_price - safe_avg) * safe_qty, -_MAX_SAFE_VALUE, _MAX_SAFE_VALUE)
+        
+        invested = abs_safe_qty * safe_avg
+        unrealized_pnl_pct = np.zeros_like(unrealized_pnl)
+        np.divide(unrealized_pnl, invested, out=unrealized_pnl_pct, where=invested > _MIN_SAFE_VALUE)
+        unrealized_pnl_pct = np.clip(unrealized_pnl_pct * 100, -_MAX_PNL_PCT, _MAX_PNL_PCT)
+        
+        total_balance = np.clip(cash + unrealized_pnl, -_MAX_SAFE_VALUE, _MAX_SAFE_VALUE)
+        total_balance = np.where(active, total_balance, cash)
+        
+        return {
+            'unrealized_pnl': unrealized_pnl,
+            'unrealized_pnl_pct': unrealized_pnl_pct,
+            'position_value': position_value,
+            'total_balance': total_balance
+        }
+    
+    def calculate_unrealized_pnl_many(self, states: Sequence[State],
+                                      current_prices: Sequence[float]) -> List[Dict[str, float]]:
+        """Durum listesi için calculate_unrealized_pnl - hesap tek vektörel geçişte yapılır"""
+        n = len(states)
+        qty = np.empty(n)
+        avg_cost = np.empty(n)
+        cash = np.empty(n)
+        for i, state in enumerate(states):
+            qty[i] = state.position_quantity
+            avg_cost[i] = state.position_avg_cost if state.position_avg_cost else 0.0
+            cash[i] = state.cash_balance
+        
+        result = self.calculate_unrealized_pnl_batch(qty, avg_cost, np.asarray(current_prices, dtype=np.float64), cash)
+        columns = [result[key].tolist() for key in ('unrealized_pnl', 'unrealized_pnl_pct', 'position_value', 'total_balance')]
+        return [
+            {
+                'unrealized_pnl': u,
+                'unrealized_pnl_pct': pct,
+                'position_value': value,
+                'total_balance': total
+            }
+            for u, pct, value, total in zip(*columns)
+        ]
+    
+    def get_pnl_summaries(self, states: Sequence[State], current_prices: Sequence[float]) -> List[Dict[str, any]]:
+        """Birden çok strateji için get_pnl_summary - gerçekleşmemiş PnL tek vektörel geçişte"""
+        unrealized = self.calculate_unrealized_pnl_many(states, current_prices)
+        return [
+            self._build_pnl_summary(state, current_price, unrealized_data)
+            for state, current_price, unrealized_data in zip(states, current_prices, unrealized)
+        ]
+    
     def get_pnl_summary(self, state: State, current_price: float) -> Dict[str, any]:
         """
         Tam PnL özeti al
@@ -288,28 +417,37 @@ class PnLCalculator:
         Returns:
             Complete PnL summary with all metrics
         """
-        unrealized_data = self.calculate_unrealized_pnl(state, current_price)
+        return self._build_pnl_summary(state, current_price, self.calculate_unrealized_pnl(state, current_price))
+    
+    @staticmethod
+    def _build_pnl_summary(state: State, current_price: float, unrealized_data: Dict[str, float]) -> Dict[str, any]:
+        """State ve gerçekleşmemiş PnL sonuçlarından özet dict'i oluştur"""
+        # State alanları ve unrealized sonuçları bir kez okunur; özet tek dict literal'i ile kurulur
+        initial_balance = state.initial_balance
+        realized_pnl = state.realized_pnl
+        position_quantity = state.position_quantity
+        unrealized_pnl = unrealized_data['unrealized_pnl']
         
         # Toplam kar/zarar (gerçekleşen + gerçekleşmeyen)
-        total_pnl = state.realized_pnl + unrealized_data['unrealized_pnl']
+        total_pnl = realized_pnl + unrealized_pnl
         
         # Toplam getiri yüzdesi (başlangıç sermayesine göre)
-        total_return_pct = (total_pnl / state.initial_balance * 100) if state.initial_balance > 0 else 0.0
+        total_return_pct = (total_pnl / initial_balance * 100) if initial_balance > 0 else 0.0
         
         return {
             # Temel bilgiler
-            'initial_balance': state.initial_balance,
+            'initial_balance': initial_balance,
             'cash_balance': state.cash_balance,
-            'realized_pnl': state.realized_pnl,
+            'realized_pnl': realized_pnl,
             
             # Pozisyon bilgileri
-            'position_quantity': state.position_quantity,
+            'position_quantity': position_quantity,
             'position_avg_cost': state.position_avg_cost,
             'position_side': state.position_side,
             'position_value': unrealized_data['position_value'],
             
             # Gerçekleşmemiş kar/zarar
-            'unrealized_pnl': unrealized_data['unrealized_pnl'],
+            'unrealized_pnl': unrealized_pnl,
             'unrealized_pnl_pct': unrealized_data['unrealized_pnl_pct'],
             
             # Toplam değerler
@@ -320,9 +458,8 @@ class PnLCalculator:
             # Ekstra metrikler
             'current_price': current_price,
             'is_profitable': total_pnl > 0,
-            'has_position': state.position_quantity != 0
+            'has_position': position_quantity != 0
         }
 
-
 # Global instance
 pnl_calculator = PnLCalculator()
@@ -18,12 +18,21 @@ class StateRecoveryManager:
     State corruption durumlarında trade history'den state'leri yeniden inşa eden sistem
     """
     
+    # Toplu recovery'de aynı anda işlenen strateji sayısı (storage I/O sınırı)
+    MAX_CONCURRENT_RECOVERIES = 16
+    
     def __init__(self):
         self.recovery_log = []
     
-    async def validate_and_recover_strategy_state(self, strategy: Strategy) -> Dict[str, any]:
+    async def validate_and_recover_strategy_state(
+        self,
+        strategy: Strategy,
+        current_state: Optional[State] = None,
+        trades: Optional[List[Trade]] = None
+    ) -> Dict[str, any]:
         """
         Strateji state'ini validate et ve gerekirse recover et
+        current_state / trades önceden (toplu) yüklendiyse verilir, verilmezse storage'dan okunur
         """
         strategy_id = strategy.id
         recovery_report = {
@@ -39,17 +48,25 @@ class StateRecoveryManager:
         
         try:
             # Mevcut state'i yükle
-            current_state = await storage.load_state(strategy_id)
+            if current_state is None:
+                current_state = await storage.load_state(strategy_id)
             if not current_state:
                 recovery_report['validation_status'] = 'state_not_found'
                 return recovery_report
             
             # Trade history'yi yükle
-            trades = await storage.load_trades(strategy_id, limit=50)
+            if trades is None:
+                trades = await storage.load_trades(strategy_id, limit=50)
             if not trades:
                 recovery_report['validation_status'] = 'no_trades'
                 return recovery_report
             
+            # Hızlı yol: state son trade'i zaten işlemişse history'den yeniden inşa gereksiz
+            # (trades.csv dosya sırasıyla yazıldığından son satır son işlenen trade'dir)
+            if current_state.trades_hash is not None and current_state.trades_hash == trades[-1].history_hash:
+                recovery_report['validation_status'] = 'ok_fastpath'
+                return recovery_report
+            
             # Strateji tipine göre validation
             if strategy.strategy_type == StrategyType.DCA_OTT:
                 return await self._validate_and_recover_dca_state(strategy, current_state, trades, recovery_report)
@@ -84,7 +101,7 @@ class StateRecoveryManager:
             sell_trades = []
             
             for trade in sorted_trades:
-                if trade.side == OrderSide.BUY:
+                if trade.side is OrderSide.BUY:
                     buy_trades.append(trade)
                     expected_positions.append({
                         'buy_price': trade.price,
@@ -92,31 +109,22 @@ class StateRecoveryManager:
                         'timestamp': trade.timestamp,
                         'order_id': trade.order_id
                     })
-                elif trade.side == OrderSide.SELL:
+                else:
                     sell_trades.append(trade)
                     # Satış trade'lerinde hangi pozisyonların satıldığını belirlemek karmaşık
                     # Şimdilik basit mantık: LIFO (Last In First Out)
+                    # expected_positions yığın olarak kullanılır: satış sondan tüketir, pop() O(1)
                     remaining_qty = trade.quantity
-                    positions_to_remove = []
-                    
-                    # Sondan başlayarak pozisyonları sat
-                    for j in range(len(expected_positions) - 1, -1, -1):
-                        if remaining_qty <= 0:
-                            break
-                        
-                        pos = expected_positions[j]
+                    while remaining_qty > 0 and expected_positions:
+                        pos = expected_positions[-1]
                         if pos['quantity'] <= remaining_qty:
                             # Tüm pozisyonu sat
                             remaining_qty -= pos['quantity']
-                            positions_to_remove.append(j)
+                            expected_positions.pop()
                         else:
                             # Kısmi satış
                             pos['quantity'] -= remaining_qty
                             remaining_qty = 0
-                    
-                    # Satılan pozisyonları kaldır
-                    for idx in positions_to_remove:
-                        expected_positions.pop(idx)
             
             # Mevcut state ile karşılaştır
             current_positions = current_state.dca_positions
@@ -165,8 +173,12 @@ class StateRecoveryManager:
                 
                 # Ortalama maliyet ve toplam miktar hesapla
                 if new_dca_positions:
-                    total_quantity = sum(pos.quantity for pos in new_dca_positions)
-                    total_cost = sum(pos.buy_price * pos.quantity for pos in new_dca_positions)
+                    # Miktar ve maliyet toplamları tek geçişte
+                    total_quantity = 0.0
+                    total_cost = 0.0
+                    for pos in new_dca_positions:
+                        total_quantity += pos.quantity
+                        total_cost += pos.buy_price * pos.quantity
                     current_state.avg_cost = total_cost / total_quantity if total_quantity > 0 else 0
                     current_state.total_quantity = total_quantity
                 else:
@@ -237,8 +249,25 @@ class StateRecoveryManager:
                 'results': {}
             }
             
-            for strategy in strategies:
-                recovery_report = await self.validate_and_recover_strategy_state(strategy)
+            # State ve trade dosyaları tür başına tek toplu okumayla yüklenir
+            strategy_ids = [strategy.id for strategy in strategies]
+            states = await storage.load_states_bulk(strategy_ids)
+            trades_by_strategy = await storage.load_trades_bulk(strategy_ids, limit=50)
+            
+            # Stratejiler birbirinden bağımsız: I/O beklemeleri örtüşsün, eşzamanlılık sınırlı kalsın
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_RECOVERIES)
+            
+            async def _recover_one(strategy: Strategy) -> Dict[str, any]:
+                async with semaphore:
+                    return await self.validate_and_recover_strategy_state(
+                        strategy,
+                        current_state=states.get(strategy.id),
+                        trades=trades_by_strategy.get(strategy.id)
+                    )
+            
+            recovery_reports = await asyncio.gather(*(_recover_one(strategy) for strategy in strategies))
+            
+            for strategy, recovery_report in zip(strategies, recovery_reports):
                 recovery_summary['results'][strategy.id] = recovery_report
                 recovery_summary['strategies_checked'] += 1
                 
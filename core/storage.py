@@ -6,11 +6,18 @@ import json
 import csv
 import os
 import asyncio
+import shutil
 import time
+from collections import defaultdict, deque
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional, Any
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from pathlib import Path
 
+import numpy as np
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import PydanticSerializationError
+
 try:
     import aiofiles
     import aiofiles.os
@@ -18,14 +25,156 @@ except ImportError:
     print("aiofiles not installed. Install with: pip install aiofiles")
     aiofiles = None
 
-from .models import Strategy, State, Trade, OpenOrder, OrderSide, PartialFillRecord
+try:
+    import orjson
+except ImportError:
+    # orjson yoksa stdlib json ile aynı JSON üretilir
+    orjson = None
+
+from .models import Strategy, State, Trade, TradeStatsAggregate, OpenOrder, OrderSide, PartialFillRecord
 from .utils import logger
 from .pnl_calculator import pnl_calculator
 
 
+# Tek writev çağrısındaki en fazla parça sayısı (POSIX IOV_MAX, genellikle 1024)
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+except (ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+# FIFO eşleştirmede bu miktarın altındaki kalıntılar float artığı sayılır
+_QTY_EPSILON = 1e-12
+
+# strategies.json listesini tek seferde doğrulayan adaptör
+_STRATEGY_LIST_ADAPTER = TypeAdapter(List[Strategy])
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON'un doğrudan desteklemediği tipler - datetime ISO string, Decimal float olarak yazılır"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _dumps_json(data: Any, indent: bool = True) -> str:
+    """
+    Veriyi JSON string'e çevir (datetime'lar ISO formatında)
+    indent=False: girintisiz kompakt çıktı - sık yazılan dosyalar için
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option, default=_json_default).decode('utf-8')
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=_json_default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def _model_to_json_dict(model: BaseModel) -> Dict[str, Any]:
+    """
+    Modeli JSON uyumlu dict'e çevir - dönüşüm Pydantic'in Rust çekirdeğinde yapılır
+    Any alanlarda Pydantic'in tanımadığı tip varsa (örn. numpy) .dict() + _json_default'a düşer.
+    """
+    try:
+        return model.model_dump(mode='json')
+    except PydanticSerializationError:
+        return model.dict()
+
+
+def _strategies_json_chunks(strategies_data: List[Dict[str, Any]], last_update: datetime) -> List[str]:
+    """
+    strategies.json içeriğini strateji başına bir parça olarak üret (girdi: _model_to_json_dict çıktıları)
+    Çıktı, {'strategies': [...], 'last_update': ...} dict'inin indent=2 ile yazılmış hâliyle aynıdır.
+    """
+    chunks = ['{\n  "strategies": [']
+    separator = '\n    '
+    for strategy_data in strategies_data:
+        record = _dumps_json(strategy_data)
+        chunks.append(separator + record.replace('\n', '\n    '))
+        separator = ',\n    '
+    chunks.append('\n  ],' if strategies_data else '],')
+    chunks.append(f'\n  "last_update": {_dumps_json(last_update)}\n}}')
+    return chunks
+
+
+def _read_text_sync(path: Path) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _dumps_json_bytes(data: Any) -> bytes:
+    """Veriyi kompakt UTF-8 JSON byte'larına çevir - orjson çıktısı decode/encode edilmeden yazılır"""
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=_json_default
+        )
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _loads_json(content: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# trades.csv satır şablonları - strateji tipine göre hangi alanların yazılacağı
+_TRADE_CSV_DEFAULT_TEMPLATE = (
+    "{timestamp},{strategy_id},{side},{price},{quantity},{z},{notional},"
+    "{gf_before},{gf_after},{commission},{order_id},{limit_price},{cycle_info}\n"
+)
+_TRADE_CSV_TEMPLATES = {
+    # Grid+OTT için z değeri kullan, cycle_info boş bırak
+    "grid_ott": (
+        "{timestamp},{strategy_id},{side},{price},{quantity},{z},{notional},"
+        "{gf_before},{gf_after},{commission},{order_id},{limit_price},\n"
+    ),
+    # DCA+OTT için cycle_info kullan, z değeri 0
+    "dca_ott": (
+        "{timestamp},{strategy_id},{side},{price},{quantity},0,{notional},"
+        "{gf_before},{gf_after},{commission},{order_id},{limit_price},{cycle_info}\n"
+    ),
+}
+
+
+def _format_trade_csv_line(trade: Trade, strategy_type: str) -> str:
+    """Trade'i strateji tipinin şablonuyla tek CSV satırına çevir (None alanlar boş yazılır)"""
+    template = _TRADE_CSV_TEMPLATES.get(strategy_type, _TRADE_CSV_DEFAULT_TEMPLATE)
+    commission = trade.commission
+    order_id = trade.order_id
+    limit_price = trade.limit_price
+    cycle_info = trade.cycle_info
+    return template.format(
+        timestamp=trade.timestamp.isoformat(),
+        strategy_id=trade.strategy_id,
+        side=trade.side.value,
+        price=trade.price,
+        quantity=trade.quantity,
+        z=trade.z,
+        notional=trade.notional,
+        gf_before=trade.gf_before,
+        gf_after=trade.gf_after,
+        commission='' if commission is None else commission,
+        order_id='' if order_id is None else order_id,
+        limit_price='' if limit_price is None else limit_price,
+        cycle_info='' if cycle_info is None else cycle_info,
+    )
+
+
 class StorageManager:
     """Storage işlemlerini yöneten sınıf"""
     
+    # save_state / strateji kayıtları bu süre içinde birikip tek yazımla diske iner (saniye)
+    FLUSH_DELAY = 0.1
+    # Var olduğu doğrulanan dosya/dizinler bu süre boyunca tekrar kontrol edilmez (saniye)
+    EXISTS_CACHE_TTL = 60.0
+    
     def __init__(self, base_path: str = None):
         # VPS deployment için paths helper kullan
         if base_path is None:
@@ -36,7 +185,41 @@ class StorageManager:
             
         self.strategies_file = self.base_path / "strategies.json"
         self.position_limits_file = self.base_path / "position_limits.json"
+        # Yalnızca global dosyalar (strategies.json, position_limits.json) için
         self.lock = asyncio.Lock()
+        # Strateji başına kilitler - farklı stratejilerin dosya işlemleri birbirini beklemez
+        self._strategy_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Var olduğu bilinen yollar -> geçerlilik bitiş zamanı (time.monotonic)
+        self._existing_paths: Dict[Path, float] = {}
+        
+        # strategies.json bellek kopyası (id -> Strategy, dosya sırasıyla) ve okunduğu
+        # andaki dosya sürümü - dosya dışarıdan değişmedikçe yeniden parse edilmez
+        self._strategies_cache: Optional[Dict[str, Strategy]] = None
+        self._strategies_file_version: Optional[tuple] = None
+        # Bellekteki strateji listesi henüz diske yazılmadı
+        self._strategies_dirty = False
+        # strategy_id -> strateji tipi (save_trade her trade'de stratejiyi aramasın)
+        self._strategy_type_cache: Dict[str, str] = {}
+        
+        # Ertelenmiş state yazımları: strategy_id -> serileştirilmiş state.json içeriği.
+        # Aynı stratejinin art arda kayıtlarından yalnızca sonuncusu diske yazılır.
+        self._dirty_states: Dict[str, str] = {}
+        # Strateji başına save_state sayacı - get_state_file_version'a katılır
+        self._state_save_seq: Dict[str, int] = {}
+        # Başlatılan save_state çağrılarına verilen sıra numarası (serileştirme thread'de biter)
+        self._state_save_ticket: Dict[str, int] = {}
+        # Henüz trades.csv'ye eklenmemiş trade satırları: strategy_id -> CSV satırları (sırayla)
+        self._trade_buffers: Dict[str, List[str]] = {}
+        # Henüz pnl_history.csv'ye eklenmemiş PnL geçmiş satırları: strategy_id -> CSV satırları
+        self._pnl_history_buffers: Dict[str, List[str]] = {}
+        # strategy_id -> kümülatif trade istatistikleri. State'te tutulmaz - state'i okuyup
+        # sonra kaydeden diğer yazıcılar aradaki trade'leri toplamdan düşürmesin.
+        # İlk kullanımda trades.csv'den oluşturulur.
+        self._trade_stats: Dict[str, TradeStatsAggregate] = {}
+        # Event ve kilit çalışan event loop içinde ilk kullanımda oluşturulur
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
         
         # Dizinleri sync olarak oluştur
         try:
@@ -44,50 +227,272 @@ class StorageManager:
         except Exception as e:
             print(f"Storage dizini oluşturma hatası: {e}")
     
-    async def _safe_write_file(self, file_path: str, content: str, max_retries: int = 5):
-        """Windows permission sorunları için güvenli dosya yazma"""
-        for attempt in range(max_retries):
+    async def _safe_write_file(self, file_path: str, content: Union[str, bytes, List[str]], max_retries: int = 5,
+                               durable: bool = False):
+        """
+        Atomik dosya yazma: geçici dosya -> os.replace (POSIX ve Windows'ta atomik)
+        Hedef dosya hiçbir anda silinmez; okuyucular ya eski ya yeni içeriği görür.
+        Windows'ta hedef kısa süre kilitli olabilir (antivirüs vb.) - PermissionError'da
+        Fibonacci artan beklemeyle tekrar denenir.
+        durable=True: içerik ve rename fsync ile diske indirilir (çökmeye dayanıklı)
+        content parça listesi olabilir - parçalar birleştirilmeden sırayla yazılır;
+        bytes ise encode edilmeden olduğu gibi yazılır
+        """
+        temp_file = f"{file_path}.tmp"
+        try:
+            await asyncio.to_thread(self._write_temp_file_sync, temp_file, content, durable)
+            
+            delay, next_delay = 0.05, 0.1
+            for attempt in range(max_retries):
+                try:
+                    await asyncio.to_thread(os.replace, temp_file, file_path)
+                    break
+                except PermissionError as e:
+                    logger.warning(f"Dosya yazma izin hatası (deneme {attempt + 1}/{max_retries}): {e}")
+                    if attempt == max_retries - 1:
+                        raise
+                    await asyncio.sleep(delay)
+                    delay, next_delay = next_delay, delay + next_delay
+            
+            if durable:
+                await asyncio.to_thread(self._fsync_dir_sync, os.path.dirname(file_path))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Dosya yazma hatası: {e}")
+            # Geçici dosyayı temizle
             try:
-                temp_file = f"{file_path}.tmp_{attempt}"
-                
-                # Geçici dosyaya yaz
-                async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
-                    await f.write(content)
-                
-                # Windows için daha uzun bekleme
-                await asyncio.sleep(0.05)
-                
-                # Hedef dosya varsa önce sil (Windows için gerekli)
-                if await aiofiles.os.path.exists(file_path):
-                    try:
-                        await aiofiles.os.remove(file_path)
-                        await asyncio.sleep(0.02)  # Silme sonrası kısa bekleme
-                    except PermissionError:
-                        # Dosya hala kullanımda, daha uzun bekle
-                        await asyncio.sleep(0.2)
-                        await aiofiles.os.remove(file_path)
-                
-                # Dosyayı taşı
-                await aiofiles.os.rename(temp_file, file_path)
-                return True
-                
-            except PermissionError as e:
-                logger.warning(f"Dosya yazma izin hatası (deneme {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(0.5 * (attempt + 1))  # Daha uzun exponential backoff
-                else:
-                    raise
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+    
+    @classmethod
+    def _write_files_batch_sync(cls, items: List[tuple]) -> List[Optional[Exception]]:
+        """
+        (dosya, içerik) çiftlerini sırayla atomik yaz - her dosya için hata ya da None döner
+        Bir dosyadaki hata diğerlerinin yazımını engellemez.
+        """
+        errors: List[Optional[Exception]] = []
+        for file_path, content in items:
+            temp_file = f"{file_path}.tmp"
+            try:
+                cls._write_temp_file_sync(temp_file, content, False)
+                os.replace(temp_file, file_path)
+                errors.append(None)
             except Exception as e:
-                logger.error(f"Dosya yazma hatası: {e}")
-                # Geçici dosyayı temizle
                 try:
-                    temp_file = f"{file_path}.tmp"
-                    if await aiofiles.os.path.exists(temp_file):
-                        await aiofiles.os.remove(temp_file)
-                except:
+                    os.remove(temp_file)
+                except OSError:
                     pass
-                raise
-        return False
+                errors.append(e)
+        return errors
+    
+    @staticmethod
+    def _write_temp_file_sync(temp_file: str, content: Union[str, bytes, List[str]], durable: bool):
+        if isinstance(content, bytes):
+            f = open(temp_file, 'wb')
+        else:
+            f = open(temp_file, 'w', encoding='utf-8')
+        with f:
+            if isinstance(content, (str, bytes)):
+                f.write(content)
+            else:
+                f.writelines(content)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+    
+    @staticmethod
+    def _fsync_dir_sync(dir_path: str):
+        """Rename'in kalıcı olması için dizin girdisini diske yaz (Windows'ta dizin açılamaz)"""
+        if os.name == 'nt':
+            return
+        dir_fd = os.open(dir_path or '.', os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    
+    # ============= ERTELENMİŞ YAZIM =============
+    
+    def _schedule_flush(self):
+        """Arka plan yazıcısını gerekirse başlat ve bekleyen yazım olduğunu bildir"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_event = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        self._flush_event.set()
+    
+    async def _flush_loop(self):
+        while True:
+            await self._flush_event.wait()
+            # Kısa süre bekle - bu arada gelen kayıtlar aynı yazıma katılır
+            await asyncio.sleep(self.FLUSH_DELAY)
+            self._flush_event.clear()
+            try:
+                await self.flush_now()
+            except Exception as e:
+                logger.error(f"Ertelenmiş yazım hatası: {e}")
+    
+    async def flush_now(self):
+        """Bekleyen trade, state ve strateji yazımlarını hemen diske indir (kapanışta çağrılır)"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            # Trade'ler state'ten önce yazılır - çökmede state trade geçmişinin önüne geçmez
+            await self._flush_trade_buffers(list(self._trade_buffers))
+            await self._flush_line_buffers(
+                self._pnl_history_buffers, list(self._pnl_history_buffers), self._get_pnl_history_file, "PnL geçmiş"
+            )
+            
+            # Kayıt yazım bitene kadar bekleyenler arasında kalır - okuyucular yarım dosya görmez
+            pending = list(self._dirty_states.items())
+            if pending:
+                # Tüm state dosyaları tek worker thread geçişinde yazılır (dosya başına thread hop yok)
+                errors = await asyncio.to_thread(
+                    self._write_files_batch_sync,
+                    [(str(self._get_state_file(strategy_id)), content) for strategy_id, content in pending]
+                )
+                for (strategy_id, content), error in zip(pending, errors):
+                    if error is not None:
+                        # Kayıt bekleyenler arasında kalır, bir sonraki yazımda tekrar denenir
+                        logger.error(f"State kaydetme hatası {strategy_id}: {error}")
+                        continue
+                    # Yazım sırasında daha yeni kayıt geldiyse o bekleyenlerde kalır
+                    if self._dirty_states.get(strategy_id) is content:
+                        del self._dirty_states[strategy_id]
+            
+            if self._strategies_dirty:
+                async with self.lock:
+                    await self._flush_strategies()
+    
+    async def flush_state(self, strategy_id: str) -> bool:
+        """
+        Stratejinin bekleyen state kaydını hemen ve kalıcı (fsync) olarak yaz
+        Başka bir kalıcı kayıt (ör. WAL'da FILLED emrin silinmesi) state'e bağlıysa önce bu çağrılır.
+        Yazılacak kayıt yoksa veya yazım başarılıysa True döner.
+        """
+        if strategy_id not in self._dirty_states:
+            return True
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            content = self._dirty_states.get(strategy_id)
+            if content is None:
+                return True
+            try:
+                await self._safe_write_file(str(self._get_state_file(strategy_id)), content, durable=True)
+            except Exception as e:
+                # Kayıt bekleyenler arasında kalır, arka plan yazıcısı tekrar dener
+                logger.error(f"State kaydetme hatası {strategy_id}: {e}")
+                return False
+            if self._dirty_states.get(strategy_id) is content:
+                del self._dirty_states[strategy_id]
+            return True
+    
+    async def flush_trades(self, strategy_id: Optional[str] = None):
+        """
+        Tamponlanmış trade satırlarını trades.csv'ye ekle - strategy_id verilmezse tümü
+        trades.csv'yi okuyan metodlar okumadan önce bunu çağırır.
+        """
+        strategy_ids = list(self._trade_buffers) if strategy_id is None else [strategy_id]
+        if not any(sid in self._trade_buffers for sid in strategy_ids):
+            return
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            await self._flush_trade_buffers(strategy_ids)
+    
+    async def _flush_trade_buffers(self, strategy_ids: List[str]):
+        """Verilen stratejilerin trade tamponlarını dosya başına tek write ile ekle - _flush_lock altında çağrılmalı"""
+        await self._flush_line_buffers(self._trade_buffers, strategy_ids, self._get_trades_file, "Trade")
+    
+    @staticmethod
+    async def _flush_line_buffers(buffers: Dict[str, List[str]], strategy_ids: List[str], get_file, label: str):
+        """
+        Satır tamponlarını strateji dosyalarına ekle - _flush_lock altında çağrılmalı
+        POSIX'te tüm dosyalar tek worker thread geçişinde O_APPEND + writev ile yazılır
+        (dosya başına tek sistem çağrısı, satırlar birleştirilmez). writev olmayan
+        platformlarda (Windows) dosya başına tek aiofiles write kullanılır.
+        """
+        pending = []
+        for strategy_id in strategy_ids:
+            lines = buffers.pop(strategy_id, None)
+            if lines:
+                pending.append((strategy_id, lines))
+        if not pending:
+            return
+        
+        if hasattr(os, 'writev'):
+            try:
+                results = await asyncio.to_thread(
+                    StorageManager._append_lines_batch_sync,
+                    [(get_file(strategy_id), lines) for strategy_id, lines in pending]
+                )
+            except Exception as e:
+                results = [(e, lines) for _, lines in pending]
+        else:
+            results = []
+            for strategy_id, lines in pending:
+                try:
+                    async with aiofiles.open(get_file(strategy_id), 'a', encoding='utf-8') as f:
+                        await f.write("".join(lines))
+                    results.append((None, []))
+                except Exception as e:
+                    results.append((e, lines))
+        
+        for (strategy_id, _), (error, unwritten) in zip(pending, results):
+            if error is not None:
+                logger.error(f"{label} kaydetme hatası {strategy_id}: {error}")
+                # Yalnızca yazılamayan kısım sırasını koruyarak tampona geri konur (yazılmış
+                # satırlar tekrar eklenmez), bir sonraki yazımda tekrar denenir
+                if unwritten:
+                    buffers[strategy_id] = unwritten + buffers.get(strategy_id, [])
+    
+    @staticmethod
+    def _append_lines_batch_sync(items: List[tuple]) -> List[Tuple[Optional[Exception], List[str]]]:
+        """
+        (dosya, satırlar) çiftlerini O_APPEND + writev ile ekle
+        Her dosya için (hata ya da None, yazılamayan satırlar) döner. Hata yazım ortasında
+        olursa yazılamayan kısım yalnızca diske ulaşmamış satırları (ve yarım kalan satırın
+        kalanını) içerir.
+        """
+        results: List[Tuple[Optional[Exception], List[str]]] = []
+        for file_path, lines in items:
+            # surrogateescape: yarım kalan satırın kalanı çok baytlı bir karakterin ortasından
+            # başlasa da str'ye çevrilip bir sonraki yazımda aynı baytlarla yazılabilir
+            buffers = [line.encode('utf-8', 'surrogateescape') for line in lines]
+            try:
+                fd = os.open(str(file_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    # writev çağrı başına IOV_MAX parçayla sınırlı; kısmi yazımda kalan kısımdan devam edilir
+                    while buffers:
+                        batch = buffers[:_IOV_MAX]
+                        written = os.writev(fd, batch)
+                        index = 0
+                        while index < len(batch) and written >= len(batch[index]):
+                            written -= len(batch[index])
+                            index += 1
+                        buffers = buffers[index:]
+                        if written:
+                            buffers[0] = buffers[0][written:]
+                finally:
+                    os.close(fd)
+                results.append((None, []))
+            except Exception as e:
+                results.append((e, [b.decode('utf-8', 'surrogateescape') for b in buffers]))
+        return results
+    
+    async def _read_bytes(self, path: Path) -> bytes:
+        """Dosyanın tamamını byte olarak oku - dosya yoksa FileNotFoundError yükseltir"""
+        return await asyncio.to_thread(path.read_bytes)
+    
+    async def _read_text(self, path: Path) -> str:
+        """
+        Dosyanın tamamını oku - tek thread geçişi (aiofiles her çağrıyı ayrı ayrı thread'e taşır)
+        Dosya yoksa FileNotFoundError yükseltir.
+        """
+        return await asyncio.to_thread(_read_text_sync, path)
     
     async def _ensure_directories(self):
         """Gerekli dizinleri oluştur"""
@@ -97,111 +502,189 @@ class StorageManager:
         except Exception as e:
             logger.error(f"Storage dizini oluşturma hatası: {e}")
     
+    def _is_known_path(self, path: Path) -> bool:
+        """Yol kısa süre önce var olarak doğrulandıysa True - dosya sistemine gidilmez"""
+        expires = self._existing_paths.get(path)
+        return expires is not None and expires > time.monotonic()
+    
+    def _remember_path(self, path: Path):
+        self._existing_paths[path] = time.monotonic() + self.EXISTS_CACHE_TTL
+    
+    def _forget_strategy_paths(self, strategy_id: str):
+        """Strateji dizini ve altındaki yolların önbellek kayıtlarını sil"""
+        strategy_dir = self.base_path / strategy_id
+        for path in [p for p in self._existing_paths if p == strategy_dir or strategy_dir in p.parents]:
+            del self._existing_paths[path]
+    
     async def _ensure_strategy_directory(self, strategy_id: str):
         """Strateji dizinini oluştur"""
         strategy_dir = self.base_path / strategy_id
+        if self._is_known_path(strategy_dir):
+            return
         try:
             await aiofiles.os.makedirs(strategy_dir, exist_ok=True)
+            self._remember_path(strategy_dir)
         except Exception as e:
             logger.error(f"Strateji dizini oluşturma hatası {strategy_id}: {e}")
     
     # ============= STRATEGIES =============
     
+    async def _get_strategies_file_version(self) -> Optional[tuple]:
+        """strategies.json sürüm parmak izi (inode, mtime_ns, boyut) - dosya yoksa None"""
+        try:
+            st = await aiofiles.os.stat(self.strategies_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    async def _load_strategies_cache(self) -> Dict[str, Strategy]:
+        """
+        Strateji önbelleğini döndür - dosya dışarıdan değiştiyse yeniden yükler
+        self.lock altında çağrılmalı
+        """
+        if self._strategies_dirty:
+            # Diske henüz yazılmamış değişiklikler dosyadakinden yenidir
+            return self._strategies_cache
+        
+        version = await self._get_strategies_file_version()
+        if self._strategies_cache is not None and version == self._strategies_file_version:
+            return self._strategies_cache
+        
+        if version is None:
+            logger.info("strategies.json bulunamadı, boş liste döndürülüyor")
+            self._strategies_cache = {}
+            self._strategies_file_version = None
+            return self._strategies_cache
+        
+        data = _loads_json(await self._read_text(self.strategies_file))
+        
+        strategies_data = data.get('strategies', [])
+        try:
+            # Tüm liste tek çağrıda doğrulanır
+            parsed = _STRATEGY_LIST_ADAPTER.validate_python(strategies_data)
+        except ValidationError:
+            # Hatalı kayıtları atlayıp diğerlerini yüklemek için tek tek parse et
+            parsed = []
+            for strategy_data in strategies_data:
+                try:
+                    parsed.append(Strategy(**strategy_data))
+                except Exception as e:
+                    logger.error(f"Strateji parse hatası: {e}, data: {strategy_data}")
+        
+        strategies = {strategy.id: strategy for strategy in parsed}
+        
+        logger.debug(f"{len(strategies)} strateji yüklendi")
+        self._strategies_cache = strategies
+        self._update_strategy_type_cache(strategies)
+        self._strategies_file_version = version
+        return strategies
+    
     async def load_strategies(self) -> List[Strategy]:
         """Tüm stratejileri yükle"""
         async with self.lock:
             try:
-                if not await aiofiles.os.path.exists(self.strategies_file):
-                    logger.info("strategies.json bulunamadı, boş liste döndürülüyor")
-                    return []
-                
-                async with aiofiles.open(self.strategies_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-                    
-                    strategies = []
-                    for strategy_data in data.get('strategies', []):
-                        try:
-                            strategy = Strategy(**strategy_data)
-                            strategies.append(strategy)
-                        except Exception as e:
-                            logger.error(f"Strateji parse hatası: {e}, data: {strategy_data}")
-                    
-                    logger.debug(f"{len(strategies)} strateji yüklendi")
-                    return strategies
-                    
+                return list((await self._load_strategies_cache()).values())
             except Exception as e:
                 logger.error(f"Stratejiler yükleme hatası: {e}")
                 return []
     
+    async def _write_strategies(self, strategies: List[Strategy]):
+        """
+        Strateji listesini önbelleğe al ve diske yazımı planla - self.lock altında çağrılmalı
+        Art arda gelen değişiklikler arka plan yazıcısında tek strategies.json yazımına katlanır.
+        """
+        self._strategies_cache = {strategy.id: strategy for strategy in strategies}
+        self._update_strategy_type_cache(self._strategies_cache)
+        self._strategies_dirty = True
+        self._schedule_flush()
+    
+    def _update_strategy_type_cache(self, strategies: Dict[str, Strategy]):
+        for strategy_id, strategy in strategies.items():
+            self._strategy_type_cache[strategy_id] = strategy.strategy_type.value
+    
+    async def _flush_strategies(self):
+        """Önbellekteki stratejileri strategies.json'a yaz - self.lock altında çağrılmalı"""
+        strategies = list(self._strategies_cache.values())
+        try:
+            # Model -> dict kopyası event loop'ta alınır (nesneler bu arada değişebilir);
+            # JSON'a çevirme worker thread'de yapılır. Her strateji ayrı serileştirilir.
+            strategies_data = [_model_to_json_dict(strategy) for strategy in strategies]
+            chunks = await asyncio.to_thread(_strategies_json_chunks, strategies_data, datetime.now())
+            
+            # Güvenli dosya yazma kullan
+            await self._safe_write_file(str(self.strategies_file), chunks)
+            self._strategies_dirty = False
+            self._strategies_file_version = await self._get_strategies_file_version()
+            logger.info(f"{len(strategies)} strateji kaydedildi")
+            
+        except Exception as e:
+            # Önbellek kirli kalır - bir sonraki yazımda tekrar denenir
+            logger.error(f"Stratejiler kaydetme hatası: {e}")
+    
     async def save_strategies(self, strategies: List[Strategy]):
         """Tüm stratejileri kaydet"""
         async with self.lock:
-            try:
-                # Strategy objelerini dict'e çevir
-                strategies_data = []
-                for strategy in strategies:
-                    strategy_dict = strategy.dict()
-                    # Datetime objelerini ISO string'e çevir
-                    strategy_dict['created_at'] = strategy.created_at.isoformat()
-                    strategy_dict['updated_at'] = strategy.updated_at.isoformat()
-                    strategies_data.append(strategy_dict)
-                
-                data = {
-                    'strategies': strategies_data,
-                    'last_update': datetime.now().isoformat()
-                }
-                
-                # Güvenli dosya yazma kullan
-                json_content = json.dumps(data, indent=2, ensure_ascii=False)
-                await self._safe_write_file(str(self.strategies_file), json_content)
-                logger.info(f"{len(strategies)} strateji kaydedildi")
-                
-            except Exception as e:
-                logger.error(f"Stratejiler kaydetme hatası: {e}")
+            await self._write_strategies(strategies)
     
     async def get_strategy(self, strategy_id: str) -> Optional[Strategy]:
         """Tek strateji al"""
-        strategies = await self.load_strategies()
-        for strategy in strategies:
-            if strategy.id == strategy_id:
-                return strategy
-        return None
+        async with self.lock:
+            try:
+                return (await self._load_strategies_cache()).get(strategy_id)
+            except Exception as e:
+                logger.error(f"Stratejiler yükleme hatası: {e}")
+                return None
     
     async def save_strategy(self, strategy: Strategy):
         """Tek strateji kaydet/güncelle"""
-        strategies = await self.load_strategies()
-        
-        # Mevcut stratejiyi bul ve güncelle
-        found = False
-        for i, existing in enumerate(strategies):
-            if existing.id == strategy.id:
+        async with self.lock:
+            try:
+                strategies = dict(await self._load_strategies_cache())
+            except Exception as e:
+                logger.error(f"Stratejiler yükleme hatası: {e}")
+                strategies = {}
+            
+            if strategy.id in strategies:
+                # Mevcut strateji yerinde güncellenir (dosyadaki sırası korunur)
                 strategy.updated_at = datetime.now()
-                strategies[i] = strategy
-                found = True
-                break
-        
-        # Yoksa ekle
-        if not found:
-            strategies.append(strategy)
-            await self._ensure_strategy_directory(strategy.id)
-        
-        await self.save_strategies(strategies)
+            else:
+                # Yoksa sona eklenir
+                await self._ensure_strategy_directory(strategy.id)
+            strategies[strategy.id] = strategy
+            
+            await self._write_strategies(list(strategies.values()))
+    
+    def _evict_strategy_caches(self, strategy_id: str):
+        """Silinen stratejinin önbellek ve bekleyen yazım kayıtlarını temizle"""
+        self._strategy_type_cache.pop(strategy_id, None)
+        self._dirty_states.pop(strategy_id, None)
+        self._trade_buffers.pop(strategy_id, None)
+        self._pnl_history_buffers.pop(strategy_id, None)
+        self._trade_stats.pop(strategy_id, None)
+        self._strategy_locks.pop(strategy_id, None)
+        self._forget_strategy_paths(strategy_id)
     
     async def delete_strategy(self, strategy_id: str) -> bool:
         """Strateji sil"""
-        strategies = await self.load_strategies()
+        async with self.lock:
+            try:
+                strategies = dict(await self._load_strategies_cache())
+            except Exception as e:
+                logger.error(f"Stratejiler yükleme hatası: {e}")
+                strategies = {}
+            
+            # Stratejiyi listeden çıkar
+            strategies.pop(strategy_id, None)
+            await self._write_strategies(list(strategies.values()))
         
-        # Stratejiyi listeden çıkar
-        strategies = [s for s in strategies if s.id != strategy_id]
-        await self.save_strategies(strategies)
+        # Dizin silinecek - bekleyen state/trade yazımları onu yeniden oluşturmasın
+        self._evict_strategy_caches(strategy_id)
         
-        # Strateji dizinini sil
+        # Strateji dizinini sil - çok dosyalı dizinlerde event loop'u bloklamasın
         try:
             strategy_dir = self.base_path / strategy_id
             if await aiofiles.os.path.exists(strategy_dir):
-                import shutil
-                shutil.rmtree(strategy_dir)
+                await asyncio.to_thread(shutil.rmtree, strategy_dir, ignore_errors=True)
                 logger.info(f"Strateji dizini silindi: {strategy_id}")
         except Exception as e:
             logger.error(f"Strateji dizini silme hatası {strategy_id}: {e}")
@@ -214,108 +697,139 @@ class StorageManager:
         """State dosya yolunu al"""
         return self.base_path / strategy_id / "state.json"
     
+    def get_state_file_version(self, strategy_id: str) -> Optional[tuple]:
+        """
+        State sürüm parmak izi (kayıt sayacı, inode, mtime_ns, boyut) - dosya yoksa None.
+        Önbellekleyen çağıranlar yeniden okumaya gerek olup olmadığını tek stat ile anlar.
+        Kayıt sayacı, henüz diske inmemiş save_state çağrılarını da yansıtır.
+        """
+        try:
+            st = os.stat(self._get_state_file(strategy_id))
+        except OSError:
+            return None
+        return (self._state_save_seq.get(strategy_id, 0), st.st_ino, st.st_mtime_ns, st.st_size)
+    
     async def load_state(self, strategy_id: str) -> Optional[State]:
         """Strateji durumunu yükle"""
         state_file = self._get_state_file(strategy_id)
         
-        try:
-            if not await aiofiles.os.path.exists(state_file):
-                # Yeni state oluştur
-                logger.info(f"State dosyası bulunamadı, yeni oluşturuluyor: {strategy_id}")
+        # Diske henüz yazılmamış kayıt varsa o en güncel içeriktir
+        pending_content = self._dirty_states.get(strategy_id)
+        if pending_content is not None:
+            try:
+                return self._state_from_json(pending_content)
+            except Exception as e:
+                logger.error(f"State yükleme hatası {strategy_id}: {e}")
                 return State(strategy_id=strategy_id, gf=0.0)
-            
-            async with aiofiles.open(state_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                data = json.loads(content)
-                
-                # OpenOrder objelerini düzelt
-                if 'open_orders' in data:
-                    open_orders = []
-                    for order_data in data['open_orders']:
-                        try:
-                            # Datetime string'i parse et
-                            if isinstance(order_data.get('timestamp'), str):
-                                order_data['timestamp'] = datetime.fromisoformat(order_data['timestamp'])
-                            
-                            order = OpenOrder(**order_data)
-                            open_orders.append(order)
-                        except Exception as e:
-                            logger.warning(f"OpenOrder parse hatası: {e}")
-                    
-                    data['open_orders'] = open_orders
-                
-                # Datetime string'lerini parse et ve naive ise UTC olarak ayarla
-                if isinstance(data.get('last_bar_timestamp'), str):
-                    dt = datetime.fromisoformat(data['last_bar_timestamp'])
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    data['last_bar_timestamp'] = dt
-                
-                if isinstance(data.get('last_update'), str):
-                    dt = datetime.fromisoformat(data['last_update'])
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    data['last_update'] = dt
-                
-                state = State(**data)
-                return state
+        
+        try:
+            content = await self._read_text(state_file)
+            return self._state_from_json(content)
                 
         except FileNotFoundError:
-            logger.warning(f"State dosyası bulunamadı {strategy_id}, yeni state oluşturuluyor")
-            # Yeni state oluştur ve kaydet
-            new_state = State(strategy_id=strategy_id, gf=0.0)
-            await self.save_state(new_state)
-            return new_state
+            # Yeni state oluştur
+            logger.info(f"State dosyası bulunamadı, yeni oluşturuluyor: {strategy_id}")
+            return State(strategy_id=strategy_id, gf=0.0)
         except Exception as e:
             logger.error(f"State yükleme hatası {strategy_id}: {e}")
             # Hata durumunda yeni state döndür
             return State(strategy_id=strategy_id, gf=0.0)
     
+    @staticmethod
+    def _state_from_json(content: str) -> State:
+        """state.json içeriğini State nesnesine çevir"""
+        data = _loads_json(content)
+        
+        # OpenOrder objelerini düzelt
+        if 'open_orders' in data:
+            open_orders = []
+            for order_data in data['open_orders']:
+                try:
+                    # ISO datetime string'leri ('Z' soneki dahil) Pydantic tarafından parse edilir
+                    order = OpenOrder(**order_data)
+                    open_orders.append(order)
+                except Exception as e:
+                    logger.warning(f"OpenOrder parse hatası: {e}")
+            
+            data['open_orders'] = open_orders
+        
+        state = State(**data)
+        
+        # Eski kayıtlardaki naive datetime'ları UTC olarak ayarla
+        if state.last_bar_timestamp is not None and state.last_bar_timestamp.tzinfo is None:
+            state.last_bar_timestamp = state.last_bar_timestamp.replace(tzinfo=timezone.utc)
+        if state.last_update is not None and state.last_update.tzinfo is None:
+            state.last_update = state.last_update.replace(tzinfo=timezone.utc)
+        
+        return state
+    
+    @staticmethod
+    def _read_files_sync(paths: List[Path]) -> List[Optional[str]]:
+        """Dosyaları tek thread geçişinde oku - olmayanlar için None"""
+        contents = []
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    contents.append(f.read())
+            except FileNotFoundError:
+                contents.append(None)
+        return contents
+    
+    async def load_states_bulk(self, strategy_ids: List[str]) -> Dict[str, State]:
+        """
+        Birden çok stratejinin state'ini yükle - tüm dosyalar tek thread geçişinde okunur
+        load_state ile aynı kurallar: dosya yoksa veya okunamazsa yeni state döner
+        """
+        try:
+            contents = await asyncio.to_thread(
+                self._read_files_sync, [self._get_state_file(strategy_id) for strategy_id in strategy_ids]
+            )
+        except Exception as e:
+            logger.error(f"Toplu state okuma hatası: {e}")
+            return {strategy_id: await self.load_state(strategy_id) for strategy_id in strategy_ids}
+        
+        states = {}
+        for strategy_id, content in zip(strategy_ids, contents):
+            # Diske henüz yazılmamış kayıt varsa o en güncel içeriktir
+            content = self._dirty_states.get(strategy_id, content)
+            if content is None:
+                logger.info(f"State dosyası bulunamadı, yeni oluşturuluyor: {strategy_id}")
+                states[strategy_id] = State(strategy_id=strategy_id, gf=0.0)
+                continue
+            try:
+                states[strategy_id] = self._state_from_json(content)
+            except Exception as e:
+                logger.error(f"State yükleme hatası {strategy_id}: {e}")
+                states[strategy_id] = State(strategy_id=strategy_id, gf=0.0)
+        return states
+    
     async def save_state(self, state: State):
-        """Strateji durumunu kaydet"""
+        """
+        Strateji durumunu kaydet
+        İçerik hemen serileştirilir (sonraki değişiklikler kaydı etkilemez); diske yazım
+        arka planda yapılır ve aynı stratejinin art arda kayıtları tek yazıma katlanır.
+        """
         await self._ensure_strategy_directory(state.strategy_id)
-        state_file = self._get_state_file(state.strategy_id)
+        strategy_id = state.strategy_id
         
         try:
-            # State'i dict'e çevir
-            state_dict = state.dict()
-            
-            # Datetime objelerini ISO string'e çevir
-            if state_dict.get('last_bar_timestamp'):
-                state_dict['last_bar_timestamp'] = state.last_bar_timestamp.isoformat()
-            if state_dict.get('last_update'):
-                state_dict['last_update'] = state.last_update.isoformat()
-            
-            # OpenOrder objelerini dict'e çevir
-            if state_dict.get('open_orders'):
-                orders_data = []
-                for order in state.open_orders:
-                    order_dict = order.dict()
-                    order_dict['timestamp'] = order.timestamp.isoformat()
-                    orders_data.append(order_dict)
-                state_dict['open_orders'] = orders_data
-            
-            # Custom data içindeki datetime objelerini kontrol et
-            if state_dict.get('custom_data'):
-                custom_data = state_dict['custom_data']
-                if isinstance(custom_data, dict):
-                    for key, value in custom_data.items():
-                        if isinstance(value, datetime):
-                            custom_data[key] = value.isoformat()
-            
-            # DCA pozisyonlarındaki datetime objelerini kontrol et
-            if state_dict.get('dca_positions'):
-                positions_data = []
-                for position in state.dca_positions:
-                    position_dict = position.dict()
-                    if position_dict.get('timestamp'):
-                        position_dict['timestamp'] = position.timestamp.isoformat()
-                    positions_data.append(position_dict)
-                state_dict['dca_positions'] = positions_data
-            
-            # Güvenli dosya yazma kullan
-            json_content = json.dumps(state_dict, indent=2, ensure_ascii=False)
-            await self._safe_write_file(str(state_file), json_content)
+            # State'i JSON uyumlu dict'e çevir - datetime alanları (open_orders, dca_positions ve
+            # custom_data içindekiler dahil) Pydantic tarafından ISO string'e çevrilir.
+            # Bu kopya event loop'ta alınır; çağıran state'i sonradan değiştirse de kayıt etkilenmez.
+            state_dict = _model_to_json_dict(state)
+            seq = self._state_save_ticket.get(strategy_id, 0) + 1
+            self._state_save_ticket[strategy_id] = seq
+            
+            # Büyük state'lerde JSON'a çevirme event loop'u bloklamasın - worker thread'de yapılır.
+            # Her trade/bar'da yazılır - kompakt JSON
+            json_content = await asyncio.to_thread(_dumps_json, state_dict, False)
+            
+            # Eşzamanlı kayıtlar thread'den farklı sırada dönebilir - eski kayıt yenisini ezmesin
+            if seq < self._state_save_seq.get(strategy_id, 0):
+                return
+            self._state_save_seq[strategy_id] = seq
+            self._dirty_states[strategy_id] = json_content
+            self._schedule_flush()
             
         except Exception as e:
             logger.error(f"State kaydetme hatası {state.strategy_id}: {e}")
@@ -326,28 +840,35 @@ class StorageManager:
         """Bekleyen emirler dosyasının yolunu döndürür."""
         return self.base_path / strategy_id / "pending_orders.json"
 
+    def get_pending_orders_wal_file(self, strategy_id: str) -> Path:
+        """Bekleyen emirler WAL dosyasının yolunu döndürür (snapshot'ın yanında)."""
+        return self.base_path / strategy_id / "pending_orders.wal"
+
     async def load_pending_orders(self, strategy_id: str) -> Dict[str, Any]:
         """Bekleyen emirleri dosyadan yükler."""
         pending_orders_file = self._get_pending_orders_file(strategy_id)
-        if not await aiofiles.os.path.exists(pending_orders_file):
-            return {}
         try:
-            async with aiofiles.open(pending_orders_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                return json.loads(content)
+            return _loads_json(await self._read_bytes(pending_orders_file))
+        except FileNotFoundError:
+            return {}
         except Exception as e:
             logger.error(f"[{strategy_id}] Bekleyen emirler yüklenemedi: {e}")
             return {}
 
-    async def save_pending_orders(self, strategy_id: str, pending_orders: Dict[str, Any]):
-        """Bekleyen emirleri dosyaya kaydeder."""
+    async def save_pending_orders(self, strategy_id: str, pending_orders: Dict[str, Any]) -> bool:
+        """Bekleyen emirleri dosyaya kaydeder. Başarılıysa True döner (WAL checkpoint'i buna bakar)."""
         await self._ensure_strategy_directory(strategy_id)
         pending_orders_file = self._get_pending_orders_file(strategy_id)
         try:
-            json_content = json.dumps(pending_orders, indent=2, ensure_ascii=False)
-            await self._safe_write_file(str(pending_orders_file), json_content)
+            json_content = _dumps_json_bytes(pending_orders)
+            # WAL bu dosya kalıcı olduktan sonra sıfırlanır - içerik ve rename diske inmeli
+            # (aynı stratejinin eşzamanlı kayıtları aynı .tmp dosyasını paylaşır - sırayla yazılır)
+            async with self._strategy_locks[strategy_id]:
+                await self._safe_write_file(str(pending_orders_file), json_content, durable=True)
+            return True
         except Exception as e:
             logger.error(f"[{strategy_id}] Bekleyen emirler kaydedilemedi: {e}")
+            return False
 
     # ============= TRADES =============
     
@@ -358,6 +879,8 @@ class StorageManager:
     async def _ensure_trades_csv_header(self, strategy_id: str):
         """CSV header'ını kontrol et ve yoksa ekle"""
         trades_file = self._get_trades_file(strategy_id)
+        if self._is_known_path(trades_file):
+            return
         
         if not await aiofiles.os.path.exists(trades_file):
             await self._ensure_strategy_directory(strategy_id)
@@ -365,31 +888,37 @@ class StorageManager:
             header = "timestamp,strategy_id,side,price,quantity,z,notional,gf_before,gf_after,commission,order_id,limit_price,cycle_info\n"
             async with aiofiles.open(trades_file, 'w', encoding='utf-8') as f:
                 await f.write(header)
+        self._remember_path(trades_file)
     
     async def save_trade(self, trade: Trade):
         """Tek trade kaydı ekle ve PnL güncelle"""
         await self._ensure_trades_csv_header(trade.strategy_id)
-        trades_file = self._get_trades_file(trade.strategy_id)
         
+        # State oku-değiştir-yaz aynı stratejinin eşzamanlı trade'leriyle iç içe geçmemeli
+        async with self._strategy_locks[trade.strategy_id]:
+            await self._save_trade_locked(trade)
+    
+    async def _save_trade_locked(self, trade: Trade):
         try:
-            # Strateji tipini al
-            strategy = await self.get_strategy(trade.strategy_id)
-            strategy_type = strategy.strategy_type if strategy else "grid_ott"
-            
-            # Strateji tipine göre doğru alanları kullan
-            if strategy_type == "grid_ott":
-                # Grid+OTT için z değeri kullan, cycle_info boş bırak
-                csv_line = f"{trade.timestamp.isoformat()},{trade.strategy_id},{trade.side.value},{trade.price},{trade.quantity},{trade.z},{trade.notional},{trade.gf_before},{trade.gf_after},{trade.commission or ''},{trade.order_id or ''},{trade.limit_price or ''},\n"
-            elif strategy_type == "dca_ott":
-                # DCA+OTT için cycle_info kullan, z değeri 0
-                csv_line = f"{trade.timestamp.isoformat()},{trade.strategy_id},{trade.side.value},{trade.price},{trade.quantity},0,{trade.notional},{trade.gf_before},{trade.gf_after},{trade.commission or ''},{trade.order_id or ''},{trade.limit_price or ''},{trade.cycle_info or ''}\n"
+            # Strateji tipini al - önbellekte yoksa strateji listesi bir kez yüklenir
+            strategy_type = self._strategy_type_cache.get(trade.strategy_id)
+            if strategy_type is None:
+                strategy = await self.get_strategy(trade.strategy_id)
+                strategy_type = strategy.strategy_type.value if strategy else "grid_ott"
+            
+            csv_line = _format_trade_csv_line(trade, strategy_type)
+            
+            # Tampona ekle - arka plan yazıcısı strateji başına tek write ile dosyaya ekler
+            self._trade_buffers.setdefault(trade.strategy_id, []).append(csv_line)
+            self._schedule_flush()
+            
+            # Kümülatif trade istatistiklerini güncelle (ilk seferde trades.csv'den oluşturulur -
+            # trade zaten tampona eklendiğinden yeniden oluşturma onu da içerir)
+            stats = self._trade_stats.get(trade.strategy_id)
+            if stats is None:
+                self._trade_stats[trade.strategy_id] = await self.rebuild_stats_from_csv(trade.strategy_id)
             else:
-                # Diğer stratejiler için varsayılan
-                csv_line = f"{trade.timestamp.isoformat()},{trade.strategy_id},{trade.side.value},{trade.price},{trade.quantity},{trade.z},{trade.notional},{trade.gf_before},{trade.gf_after},{trade.commission or ''},{trade.order_id or ''},{trade.limit_price or ''},{trade.cycle_info or ''}\n"
-            
-            # Dosyaya append et
-            async with aiofiles.open(trades_file, 'a', encoding='utf-8') as f:
-                await f.write(csv_line)
+                self._apply_trade_to_stats(stats, trade)
             
             # YENİ PnL SİSTEMİ: Trade gerçekleştiğinde state'i güncelle
             await self._update_pnl_on_trade(trade)
@@ -422,7 +951,8 @@ class StorageManager:
                 pnl_record = await self.create_pnl_history_record(
                     strategy_id=trade.strategy_id,
                     current_price=trade.price,  # Trade fiyatını güncel fiyat olarak kullan
-                    trade=trade
+                    trade=trade,
+                    state=state  # Az önce güncellenen state - yeniden yüklenmez
                 )
                 await self.save_pnl_history(pnl_record)
             except Exception as pnl_hist_error:
@@ -437,85 +967,274 @@ class StorageManager:
     
     async def load_trades(self, strategy_id: str, limit: Optional[int] = None) -> List[Trade]:
         """Strateji trade'lerini yükle"""
+        await self.flush_trades(strategy_id)
         trades_file = self._get_trades_file(strategy_id)
         
-        if not await aiofiles.os.path.exists(trades_file):
-            return []
-        
-        trades = []
         try:
-            async with aiofiles.open(trades_file, 'r', encoding='utf-8') as f:
-                # İlk satırı atla (header)
-                await f.readline()
-                
-                lines = []
-                async for line in f:
-                    lines.append(line.strip())
-                
-                # Limit varsa son N satırı al
-                if limit and len(lines) > limit:
-                    lines = lines[-limit:]
-                
-                # Her satırı parse et
-                for line in lines:
-                    if not line:
-                        continue
-                    
-                    try:
-                        parts = line.split(',')
-                        if len(parts) >= 9:
-                            # Cycle info alanını kontrol et (yeni alan)
-                            cycle_info = parts[12] if len(parts) > 12 and parts[12] else None
-                            
-                            trade = Trade(
-                                timestamp=datetime.fromisoformat(parts[0]),
-                                strategy_id=parts[1],
-                                side=OrderSide(parts[2].lower()),  # Küçük harfe çevir
-                                price=float(parts[3]),
-                                quantity=float(parts[4]),
-                                z=int(parts[5]),
-                                notional=float(parts[6]),
-                                gf_before=float(parts[7]),
-                                gf_after=float(parts[8]),
-                                commission=float(parts[9]) if parts[9] else None,
-                                order_id=parts[10] if len(parts) > 10 and parts[10] else None,
-                                limit_price=float(parts[11]) if len(parts) > 11 and parts[11] else None,
-                                cycle_info=cycle_info
-                            )
-                            trades.append(trade)
-                    except Exception as e:
-                        logger.warning(f"Trade parse hatası: {e}, line: {line}")
+            # Okuma ve parse tek thread geçişinde - event loop satır başına beklemez
+            trades = await asyncio.to_thread(self._load_trades_sync, trades_file, limit)
             
             logger.debug(f"{len(trades)} trade yüklendi: {strategy_id}")
             return trades
             
+        except FileNotFoundError:
+            return []
         except Exception as e:
             logger.error(f"Trades yükleme hatası {strategy_id}: {e}")
             return []
     
+    @classmethod
+    def _load_trades_sync(cls, trades_file: Path, limit: Optional[int] = None) -> List[Trade]:
+        with open(trades_file, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            # İlk satırı atla (header)
+            next(reader, None)
+            return cls._parse_trade_rows(reader, limit)
+    
+    @staticmethod
+    def _parse_trade_rows(rows: Iterable[List[str]], limit: Optional[int] = None) -> List[Trade]:
+        """trades.csv satırlarını (header hariç, csv.reader çıktısı) Trade listesine çevir"""
+        # Limit varsa dosya akarken yalnızca son N dolu satır tutulur
+        if limit:
+            rows = deque((row for row in rows if row), maxlen=limit)
+        
+        # Döngüde tekrar tekrar aranan isimler yerel değişkenlere bağlanır
+        fromisoformat = datetime.fromisoformat
+        order_side = OrderSide
+        to_float = float
+        
+        trades = []
+        # Her satırı parse et
+        for parts in rows:
+            if not parts:
+                continue
+            
+            try:
+                n_parts = len(parts)
+                if n_parts >= 9:
+                    # Cycle info alanını kontrol et (yeni alan)
+                    cycle_info = parts[12] if n_parts > 12 and parts[12] else None
+                    
+                    trade = Trade(
+                        timestamp=fromisoformat(parts[0]),
+                        strategy_id=parts[1],
+                        side=order_side(parts[2].lower()),  # Küçük harfe çevir
+                        price=to_float(parts[3]),
+                        quantity=to_float(parts[4]),
+                        z=int(parts[5]),
+                        notional=to_float(parts[6]),
+                        gf_before=to_float(parts[7]),
+                        gf_after=to_float(parts[8]),
+                        commission=to_float(parts[9]) if parts[9] else None,
+                        order_id=parts[10] if n_parts > 10 and parts[10] else None,
+                        limit_price=to_float(parts[11]) if n_parts > 11 and parts[11] else None,
+                        cycle_info=cycle_info
+                    )
+                    trades.append(trade)
+            except Exception as e:
+                logger.warning(f"Trade parse hatası: {e}, line: {','.join(parts)}")
+        return trades
+    
+    async def load_trades_bulk(self, strategy_ids: List[str], limit: Optional[int] = None) -> Dict[str, List[Trade]]:
+        """
+        Birden çok stratejinin trade'lerini yükle - tüm CSV'ler tek thread geçişinde okunur
+        load_trades ile aynı kurallar: dosya yoksa veya okunamazsa boş liste
+        """
+        await self.flush_trades()
+        try:
+            contents = await asyncio.to_thread(
+                self._read_files_sync, [self._get_trades_file(strategy_id) for strategy_id in strategy_ids]
+            )
+        except Exception as e:
+            logger.error(f"Toplu trade okuma hatası: {e}")
+            return {strategy_id: await self.load_trades(strategy_id, limit=limit) for strategy_id in strategy_ids}
+        
+        trades = {}
+        for strategy_id, content in zip(strategy_ids, contents):
+            if content is None:
+                trades[strategy_id] = []
+                continue
+            # İlk satırı atla (header)
+            trades[strategy_id] = self._parse_trade_rows(csv.reader(content.splitlines()[1:]), limit)
+        return trades
+    
     async def get_trades_csv_content(self, strategy_id: str) -> Optional[str]:
         """Raw CSV içeriğini al"""
+        await self.flush_trades(strategy_id)
         trades_file = self._get_trades_file(strategy_id)
         
         try:
-            if not await aiofiles.os.path.exists(trades_file):
-                return None
-            
-            async with aiofiles.open(trades_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                return content
-                
+            return await self._read_text(trades_file)
+        except FileNotFoundError:
+            return None
         except Exception as e:
             logger.error(f"CSV içerik okuma hatası {strategy_id}: {e}")
             return None
     
     # ============= STATISTICS =============
     
+    @staticmethod
+    def _apply_trade_to_stats(stats: TradeStatsAggregate, trade: Trade):
+        """
+        Trade'i kümülatif istatistiklere işle
+        Kar-zarar: satımlar açık alımlarla FIFO eşleştirilir, yalnızca tamamlanan çiftler sayılır
+        """
+        stats.total_trades += 1
+        stats.total_volume += trade.quantity
+        stats.total_notional += trade.notional
+        if stats.first_trade is None:
+            stats.first_trade = trade.timestamp
+        stats.last_trade = trade.timestamp
+        
+        if trade.side is OrderSide.BUY:
+            stats.buy_count += 1
+            stats.total_buy_value += trade.notional
+            stats.total_buy_cost += trade.price * trade.quantity
+            stats.total_buy_quantity += trade.quantity
+            # Alım işlemi - stack'e ekle
+            stats.buy_stack.append([trade.price, trade.quantity, trade.notional])
+            return
+        
+        stats.sell_count += 1
+        stats.total_sell_value += trade.notional
+        
+        # Satım işlemi - FIFO ile eşleştir
+        buy_stack = stats.buy_stack
+        sell_qty = trade.quantity
+        sell_price = trade.price
+        matched = 0
+        while sell_qty > _QTY_EPSILON and matched < len(buy_stack):
+            buy = buy_stack[matched]
+            
+            # Eşleştirilebilecek miktar
+            match_qty = min(sell_qty, buy[1])
+            
+            # Kar-zarar hesapla
+            pair_pnl = sell_price * match_qty - buy[0] * match_qty
+            stats.realized_pnl += pair_pnl
+            if pair_pnl > 0:
+                stats.profit_trades += 1
+                stats.total_profit += pair_pnl
+            else:
+                stats.loss_trades += 1
+                stats.total_loss += abs(pair_pnl)
+            
+            # Miktarları güncelle
+            buy[1] -= match_qty
+            sell_qty -= match_qty
+            
+            # Alım tamamen eşleştiyse stack'ten çıkar (float artığı kalmış olabilir)
+            if buy[1] <= _QTY_EPSILON:
+                matched += 1
+        if matched:
+            del buy_stack[:matched]
+    
+    async def rebuild_stats_from_csv(self, strategy_id: str) -> TradeStatsAggregate:
+        """Kümülatif istatistikleri trades.csv'nin tamamından yeniden oluştur"""
+        trades = await self.load_trades(strategy_id)
+        
+        # Tarihe göre sırala (FIFO için)
+        trades.sort(key=lambda x: x.timestamp)
+        
+        return self._stats_from_trades(trades)
+    
+    @staticmethod
+    def _stats_from_trades(trades: List[Trade]) -> TradeStatsAggregate:
+        """
+        Zaman sıralı trade listesinden kümülatif istatistikleri toplu hesapla
+        _apply_trade_to_stats'ın trade trade uygulanmasıyla aynı sonucu verir; FIFO eşleştirme
+        alım/satım miktarlarının kümülatif toplamları üzerinde vektörel yapılır.
+        """
+        stats = TradeStatsAggregate()
+        n = len(trades)
+        if n == 0:
+            return stats
+        
+        is_buy = np.fromiter((trade.side is OrderSide.BUY for trade in trades), dtype=bool, count=n)
+        price = np.fromiter((trade.price for trade in trades), dtype=np.float64, count=n)
+        qty = np.fromiter((trade.quantity for trade in trades), dtype=np.float64, count=n)
+        notional = np.fromiter((trade.notional for trade in trades), dtype=np.float64, count=n)
+        buy_idx = np.flatnonzero(is_buy)
+        sell_idx = np.flatnonzero(~is_buy)
+        
+        buy_price, buy_qty = price[buy_idx], qty[buy_idx]
+        stats.total_trades = n
+        stats.buy_count = len(buy_idx)
+        stats.sell_count = len(sell_idx)
+        stats.total_volume = float(qty.sum())
+        stats.total_notional = float(notional.sum())
+        stats.total_buy_value = float(notional[buy_idx].sum())
+        stats.total_sell_value = float(notional[sell_idx].sum())
+        stats.total_buy_cost = float((buy_price * buy_qty).sum())
+        stats.total_buy_quantity = float(buy_qty.sum())
+        stats.first_trade = trades[0].timestamp
+        stats.last_trade = trades[-1].timestamp
+        
+        # Alımlar kümülatif miktar ekseninde [buy_start, buy_end) aralıklarını kaplar
+        buy_end = np.cumsum(buy_qty)
+        buy_start = buy_end - buy_qty
+        
+        # Satımların tükettiği eksen: o ana kadarki alım miktarını aşan kısım eşleşmeden düşer
+        # consumed_i = min(consumed_{i-1} + q_i, alınan_i) -> kapalı formda kümülatif minimum
+        sell_qty = qty[sell_idx]
+        bought_before = np.cumsum(np.where(is_buy, qty, 0.0))[sell_idx]
+        sold = np.cumsum(sell_qty)
+        consumed_end = sold + np.minimum(0.0, np.minimum.accumulate(bought_before - sold))
+        consumed_start = np.concatenate(([0.0], consumed_end[:-1]))
+        
+        # Her satımın örtüştüğü alım aralıkları [first, last)
+        first = np.searchsorted(buy_end, consumed_start, side='right')
+        last = np.searchsorted(buy_start, consumed_end, side='left')
+        counts = np.where(consumed_end > consumed_start, np.maximum(last - first, 0), 0)
+        
+        total_pairs = int(counts.sum())
+        if total_pairs:
+            pair_sell = np.repeat(np.arange(len(sell_idx)), counts)
+            offsets = np.cumsum(counts) - counts
+            pair_buy = np.arange(total_pairs) - np.repeat(offsets, counts) + np.repeat(first, counts)
+            match_qty = (np.minimum(consumed_end[pair_sell], buy_end[pair_buy])
+                         - np.maximum(consumed_start[pair_sell], buy_start[pair_buy]))
+            valid = match_qty > _QTY_EPSILON
+            match_qty = match_qty[valid]
+            pair_pnl = price[sell_idx][pair_sell[valid]] * match_qty - buy_price[pair_buy[valid]] * match_qty
+            
+            profitable = pair_pnl > 0
+            stats.realized_pnl = float(pair_pnl.sum())
+            stats.profit_trades = int(profitable.sum())
+            stats.loss_trades = int(len(pair_pnl) - stats.profit_trades)
+            stats.total_profit = float(pair_pnl[profitable].sum())
+            stats.total_loss = float(np.abs(pair_pnl[~profitable]).sum())
+        
+        # Tamamen tüketilmemiş alımlar açık stack'te kalır (ilki kısmen tüketilmiş olabilir)
+        consumed_total = float(consumed_end[-1]) if len(sell_idx) else 0.0
+        remaining = buy_end - np.maximum(buy_start, consumed_total)
+        open_buys = np.flatnonzero(remaining > _QTY_EPSILON)
+        remaining = remaining[open_buys]
+        stats.buy_stack = [
+            [p, r, v] for p, r, v in zip(
+                buy_price[open_buys].tolist(), remaining.tolist(), notional[buy_idx][open_buys].tolist()
+            )
+        ]
+        return stats
+    
+    async def _get_trade_stats(self, strategy_id: str) -> TradeStatsAggregate:
+        """Bellekteki kümülatif istatistikler - henüz oluşturulmadıysa trades.csv'den hesaplanır"""
+        stats = self._trade_stats.get(strategy_id)
+        if stats is not None:
+            return stats
+        # Oluşturma sırasında gelen trade'ler ya CSV'de ya da sonraki artımlı güncellemede olsun
+        async with self._strategy_locks[strategy_id]:
+            stats = self._trade_stats.get(strategy_id)
+            if stats is None:
+                stats = await self.rebuild_stats_from_csv(strategy_id)
+                self._trade_stats[strategy_id] = stats
+        return stats
+    
     async def get_trade_statistics(self, strategy_id: str) -> Dict:
         """Trade istatistiklerini hesapla"""
-        trades = await self.load_trades(strategy_id)
+        stats = await self._get_trade_stats(strategy_id)
         
-        if not trades:
+        if not stats.total_trades:
             return {
                 'total_trades': 0,
                 'buy_trades': 0,
@@ -534,35 +1253,29 @@ class StorageManager:
                 'open_buy_value': 0.0
             }
         
-        buy_trades = [t for t in trades if t.side == OrderSide.BUY]
-        sell_trades = [t for t in trades if t.side == OrderSide.SELL]
-        
-        total_volume = sum(t.quantity for t in trades)
-        total_notional = sum(t.notional for t in trades)
-        avg_price = total_notional / total_volume if total_volume > 0 else 0.0
+        total_volume = stats.total_volume
+        avg_price = stats.total_notional / total_volume if total_volume > 0 else 0.0
         
         # Kar-zarar hesaplama
-        pnl_data = await self.calculate_realized_pnl(strategy_id)
+        pnl_data = self._realized_pnl_from_stats(stats)
         
         # DCA+OTT için ortalama maliyet hesaplama
         open_buy_value = 0.0
-        if buy_trades and not sell_trades:  # Sadece alım işlemleri varsa
+        if stats.buy_count and not stats.sell_count:  # Sadece alım işlemleri varsa
             # Tüm alım işlemlerinin ağırlıklı ortalaması
-            total_buy_cost = sum(t.price * t.quantity for t in buy_trades)
-            total_buy_quantity = sum(t.quantity for t in buy_trades)
-            if total_buy_quantity > 0:
-                avg_cost = total_buy_cost / total_buy_quantity
-                open_buy_value = avg_cost * total_buy_quantity
+            if stats.total_buy_quantity > 0:
+                avg_cost = stats.total_buy_cost / stats.total_buy_quantity
+                open_buy_value = avg_cost * stats.total_buy_quantity
         
         return {
-            'total_trades': len(trades),
-            'buy_trades': len(buy_trades),
-            'sell_trades': len(sell_trades),
+            'total_trades': stats.total_trades,
+            'buy_trades': stats.buy_count,
+            'sell_trades': stats.sell_count,
             'total_volume': total_volume,
-            'total_notional': total_notional,
+            'total_notional': stats.total_notional,
             'avg_price': avg_price,
-            'first_trade': trades[0].timestamp.isoformat() if trades else None,
-            'last_trade': trades[-1].timestamp.isoformat() if trades else None,
+            'first_trade': stats.first_trade.isoformat() if stats.first_trade else None,
+            'last_trade': stats.last_trade.isoformat() if stats.last_trade else None,
             'realized_pnl': pnl_data['realized_pnl'],
             'total_profit': pnl_data['total_profit'],
             'total_loss': pnl_data['total_loss'],
@@ -578,105 +1291,26 @@ class StorageManager:
         Sadece tamamlanan alış-satış çiftleri (realized PnL)
         Açık pozisyonlar dahil edilmez
         """
-        trades = await self.load_trades(strategy_id)
-        
-        if not trades:
-            return {
-                'realized_pnl': 0.0,
-                'total_profit': 0.0,
-                'total_loss': 0.0,
-                'win_rate': 0.0,
-                'profit_trades': 0,
-                'loss_trades': 0,
-                'total_buy_value': 0.0,
-                'total_sell_value': 0.0,
-                'trade_pairs': [],
-                'open_buy_value': 0.0,
-                'open_sell_value': 0.0
-            }
-        
-        # Tarihe göre sırala (FIFO için)
-        trades.sort(key=lambda x: x.timestamp)
-        
-        # Tüm işlemleri kronolojik olarak eşleştir (FIFO)
-        buy_stack = []  # Açık alım pozisyonları
-        trade_pairs = []
-        
-        for trade in trades:
-            if trade.side == OrderSide.BUY:
-                # Alım işlemi - stack'e ekle
-                buy_stack.append({
-                    'price': trade.price,
-                    'quantity': trade.quantity,
-                    'timestamp': trade.timestamp,
-                    'z': trade.z,
-                    'notional': trade.notional
-                })
-            else:  # SELL
-                # Satım işlemi - FIFO ile eşleştir
-                sell_qty = trade.quantity
-                sell_price = trade.price
-                
-                while sell_qty > 0 and buy_stack:
-                    buy = buy_stack[0]
-                    
-                    # Eşleştirilebilecek miktar
-                    match_qty = min(sell_qty, buy['quantity'])
-                    
-                    # Kar-zarar hesapla
-                    buy_cost = buy['price'] * match_qty
-                    sell_revenue = sell_price * match_qty
-                    pair_pnl = sell_revenue - buy_cost
-                    
-                    trade_pairs.append({
-                        'buy_price': buy['price'],
-                        'sell_price': sell_price,
-                        'quantity': match_qty,
-                        'pnl': pair_pnl,
-                        'buy_time': buy['timestamp'],
-                        'sell_time': trade.timestamp,
-                        'buy_z': buy['z'],
-                        'sell_z': trade.z
-                    })
-                    
-                    # Miktarları güncelle
-                    buy['quantity'] -= match_qty
-                    sell_qty -= match_qty
-                    
-                    # Alım tamamen eşleştiyse stack'ten çıkar
-                    if buy['quantity'] <= 0:
-                        buy_stack.pop(0)
-        
-        # İstatistikleri hesapla
-        profitable_pairs = sum(1 for pair in trade_pairs if pair['pnl'] > 0)
-        losing_pairs = sum(1 for pair in trade_pairs if pair['pnl'] <= 0)
-        total_profit = sum(pair['pnl'] for pair in trade_pairs if pair['pnl'] > 0)
-        total_loss = sum(abs(pair['pnl']) for pair in trade_pairs if pair['pnl'] <= 0)
-        
-        # Gerçekleşen kar-zarar (sadece tamamlanan işlemler)
-        realized_pnl = sum(pair['pnl'] for pair in trade_pairs)
-        
+        return self._realized_pnl_from_stats(await self._get_trade_stats(strategy_id))
+    
+    @staticmethod
+    def _realized_pnl_from_stats(stats: TradeStatsAggregate) -> Dict:
         # Win rate
-        total_pairs = len(trade_pairs)
-        win_rate = (profitable_pairs / total_pairs * 100) if total_pairs > 0 else 0.0
+        total_pairs = stats.profit_trades + stats.loss_trades
+        win_rate = (stats.profit_trades / total_pairs * 100) if total_pairs > 0 else 0.0
         
         # Açık pozisyon değerleri
-        open_buy_value = sum(buy['notional'] for buy in buy_stack)
-        
-        # Toplam alım/satım tutarları
-        total_buy_value = sum(t.notional for t in trades if t.side == OrderSide.BUY)
-        total_sell_value = sum(t.notional for t in trades if t.side == OrderSide.SELL)
+        open_buy_value = sum(buy[2] for buy in stats.buy_stack)
         
         return {
-            'realized_pnl': realized_pnl,
-            'total_profit': total_profit,
-            'total_loss': total_loss,
+            'realized_pnl': stats.realized_pnl,
+            'total_profit': stats.total_profit,
+            'total_loss': stats.total_loss,
             'win_rate': win_rate,
-            'profit_trades': profitable_pairs,
-            'loss_trades': losing_pairs,
-            'total_buy_value': total_buy_value,
-            'total_sell_value': total_sell_value,
-            'trade_pairs': trade_pairs,
+            'profit_trades': stats.profit_trades,
+            'loss_trades': stats.loss_trades,
+            'total_buy_value': stats.total_buy_value,
+            'total_sell_value': stats.total_sell_value,
             'open_buy_value': open_buy_value,
             'open_sell_value': 0.0  # Satım stack'i yok, hep eşleştiriliyor
         }
@@ -713,6 +1347,22 @@ class StorageManager:
         
         return pnl_summary
     
+    async def calculate_new_pnl_many(self, current_prices: Dict[str, float]) -> Dict[str, Dict]:
+        """
+        Birden çok strateji için calculate_new_pnl (strategy_id -> güncel fiyat)
+        State'ler tek thread geçişinde okunur, gerçekleşmemiş PnL tek vektörel geçişte hesaplanır.
+        """
+        strategy_ids = list(current_prices)
+        states = await self.load_states_bulk(strategy_ids)
+        ordered_states = [states[strategy_id] for strategy_id in strategy_ids]
+        for state in ordered_states:
+            pnl_calculator.initialize_state_pnl(state)
+        
+        summaries = pnl_calculator.get_pnl_summaries(
+            ordered_states, [current_prices[strategy_id] for strategy_id in strategy_ids]
+        )
+        return dict(zip(strategy_ids, summaries))
+    
     # ============= PnL GEÇMİŞİ SİSTEMİ =============
     
     def _get_pnl_history_file(self, strategy_id: str) -> Path:
@@ -721,39 +1371,43 @@ class StorageManager:
     
     async def _ensure_pnl_history_header(self, strategy_id: str):
         """PnL geçmiş dosyası header'ını oluştur"""
-        await self._ensure_strategy_directory(strategy_id)
         pnl_file = self._get_pnl_history_file(strategy_id)
+        if self._is_known_path(pnl_file):
+            return
+        await self._ensure_strategy_directory(strategy_id)
         
         if not await aiofiles.os.path.exists(pnl_file):
             header = "timestamp,strategy_id,current_price,total_balance,cash_balance,position_value,realized_pnl,unrealized_pnl,total_pnl,total_return_pct,position_quantity,position_avg_cost,position_side,trigger_trade_id,trigger_side,trigger_price,trigger_quantity\n"
             async with aiofiles.open(pnl_file, 'w', encoding='utf-8') as f:
                 await f.write(header)
+        self._remember_path(pnl_file)
     
     async def save_pnl_history(self, pnl_record: 'PnLHistory'):
         """PnL geçmiş kaydı ekle"""
         await self._ensure_pnl_history_header(pnl_record.strategy_id)
-        pnl_file = self._get_pnl_history_file(pnl_record.strategy_id)
         
         try:
             # CSV satırı oluştur
             csv_line = f"{pnl_record.timestamp.isoformat()},{pnl_record.strategy_id},{pnl_record.current_price},{pnl_record.total_balance},{pnl_record.cash_balance},{pnl_record.position_value},{pnl_record.realized_pnl},{pnl_record.unrealized_pnl},{pnl_record.total_pnl},{pnl_record.total_return_pct},{pnl_record.position_quantity},{pnl_record.position_avg_cost or ''},{pnl_record.position_side or ''},{pnl_record.trigger_trade_id or ''},{pnl_record.trigger_side.value if pnl_record.trigger_side else ''},{pnl_record.trigger_price or ''},{pnl_record.trigger_quantity or ''}\n"
             
-            # Dosyaya append et
-            async with aiofiles.open(pnl_file, 'a', encoding='utf-8') as f:
-                await f.write(csv_line)
+            # Tampona ekle - arka plan yazıcısı trade satırlarıyla birlikte tek write ile ekler
+            self._pnl_history_buffers.setdefault(pnl_record.strategy_id, []).append(csv_line)
+            self._schedule_flush()
             
             logger.info(f"PnL geçmişi kaydedildi: {pnl_record.strategy_id} - Balance: ${pnl_record.total_balance:.2f}, PnL: ${pnl_record.total_pnl:.2f}")
             
         except Exception as e:
             logger.error(f"PnL geçmiş kaydetme hatası {pnl_record.strategy_id}: {e}")
     
-    async def create_pnl_history_record(self, strategy_id: str, current_price: float, trade: Optional['Trade'] = None) -> 'PnLHistory':
-        """Trade sonrası PnL geçmiş kaydı oluştur"""
+    async def create_pnl_history_record(self, strategy_id: str, current_price: float, trade: Optional['Trade'] = None,
+                                        state: Optional[State] = None) -> 'PnLHistory':
+        """Trade sonrası PnL geçmiş kaydı oluştur - state verilmezse yüklenir"""
         from .pnl_calculator import pnl_calculator
         from .models import PnLHistory
         
         # State'i yükle
-        state = await self.load_state(strategy_id)
+        if state is None:
+            state = await self.load_state(strategy_id)
         if not state:
             raise ValueError(f"State bulunamadı: {strategy_id}")
         
@@ -789,7 +1443,8 @@ class StorageManager:
     async def backup_strategy_data(self, strategy_id: str, backup_path: str):
         """Strateji verilerini yedekle"""
         try:
-            import shutil
+            # Bekleyen yazımlar yedeğe dahil olsun
+            await self.flush_now()
             source_dir = self.base_path / strategy_id
             if await aiofiles.os.path.exists(source_dir):
                 shutil.copytree(source_dir, backup_path)
@@ -864,6 +1519,8 @@ class StorageManager:
         seen_trades = set()  # Duplicate kontrolü için
         
         try:
+            await self.flush_trades()
+            
             # Tüm strateji klasörlerini tara
             if not await aiofiles.os.path.exists(self.base_path):
                 return []
@@ -70,6 +70,14 @@ class StrategyEngine:
                 strategy_id=strategy_id
             )
         return self.order_managers[strategy_id]
+
+    async def close_order_managers(self):
+        """Kapanışta tüm OrderManager'ların WAL'ını snapshot'a katla"""
+        for strategy_id, order_manager in self.order_managers.items():
+            try:
+                await order_manager.close()
+            except Exception as e:
+                logger.error(f"OrderManager kapatma hatası {strategy_id}: {e}")
     
     def _can_send_risk_message(self, strategy_id: str) -> bool:
         """
@@ -324,7 +332,8 @@ class StrategyEngine:
                 side=signal.side,
                 quantity=signal.quantity,
                 price=signal.target_price if signal.target_price else None,
-                order_type="MARKET" if not signal.target_price else "LIMIT"
+                order_type="MARKET" if not signal.target_price else "LIMIT",
+                z=signal.strategy_specific_data.get("z") or 0
             )
             
             if order_data:
@@ -0,0 +1,62 @@
+"""
+Telegram bildirimleri için arka plan gönderim kuyruğu
+
+Bildirim gönderimi (HTTP + hata durumunda 30 sn'lik yeniden denemeler) emir
+oluşturma ve fill işleme yolunu bekletmemeli. queue_notification bildirimi
+kuyruğa koyup hemen döner; tek arka plan görevi kuyruğu sırayla boşaltır.
+Gönderim hataları sadece loglanır.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from .telegram import TelegramNotifier, telegram_notifier
+from .utils import logger
+
+
+class TelegramQueue:
+    """Bildirimleri sıraya alıp arka planda gönderen kuyruk"""
+
+    def __init__(self, notifier: TelegramNotifier):
+        self.notifier = notifier
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._worker())
+
+    def put_nowait(self, kind: str, payload: Dict[str, Any]):
+        """
+        Bildirimi kuyruğa ekle - beklemeden döner
+        kind: 'trade' -> send_trade_notification, 'fill' -> send_fill_notification, ...
+        """
+        self._ensure_running()
+        self._queue.put_nowait((kind, payload))
+
+    async def _worker(self):
+        while True:
+            kind, payload = await self._queue.get()
+            try:
+                await self._send(kind, payload)
+            except Exception as e:
+                logger.error(f"Telegram {kind} bildirimi gönderilemedi: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, kind: str, payload: Dict[str, Any]):
+        sender = getattr(self.notifier, f"send_{kind}_notification", None)
+        if sender is None:
+            logger.error(f"Bilinmeyen Telegram bildirim tipi: {kind}")
+            return
+        await sender(**payload)
+
+
+# Global bildirim kuyruğu
+telegram_queue = TelegramQueue(telegram_notifier)
+
+
+def queue_notification(kind: str, payload: Dict[str, Any]):
+    """Bildirimi arka plan kuyruğuna ekle"""
+    telegram_queue.put_nowait(kind, payload)